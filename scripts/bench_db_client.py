@@ -0,0 +1,56 @@
+"""Compare a fresh Supabase client per call with the shared pooled client.
+
+Runs the db helpers against the local PostgREST stand-in from
+bench_db_writes.py and reports requests, new connections and wall time.
+
+    python scripts/bench_db_client.py --calls 20 --latency-ms 5
+"""
+import argparse
+import sys
+import os
+import threading
+import time
+from datetime import date
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supabase import create_client
+
+import src.db as db
+from scripts.bench_db_writes import FAKE_KEY, PostgrestStub
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20, help="db helper calls per mode")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="simulated per-request latency")
+    args = parser.parse_args()
+
+    server = PostgrestStub(args.latency_ms / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def fresh_client():
+        # The previous get_client(): a new client, session and connection per call
+        client = create_client(server.url, FAKE_KEY)
+        client.postgrest.session.event_hooks["request"].append(db._count_request)
+        return client
+
+    settings = type("Settings", (), {"supabase_url": server.url, "supabase_service_role_key": FAKE_KEY})()
+    print(f"{'mode':>7} {'requests':>9} {'connections':>12} {'seconds':>8}")
+    with patch.object(db, "get_settings", lambda: settings):
+        for name, factory in [("fresh", fresh_client), ("shared", db.get_client)]:
+            db.reset_connection_stats()
+            start = time.perf_counter()
+            with patch.object(db, "get_client", factory):
+                for _ in range(args.calls):
+                    db.get_daily_cost(date.today())
+            elapsed = time.perf_counter() - start
+            stats = db.get_connection_stats()
+            print(f"{name:>7} {stats.requests:>9} {stats.connections:>12} {elapsed:>8.3f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark mark_items_emailed against a local PostgREST stand-in.
+
+Starts a tiny HTTP server that answers every PostgREST request with `[]`
+after a simulated network delay and counts round trips, then runs the real
+supabase client through both the old per-row update loop and the batched
+`mark_items_emailed`.
+
+    python scripts/bench_db_writes.py --items 50 200 --latency-ms 40
+"""
+import argparse
+import sys
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supabase import create_client
+
+from src.db import mark_items_emailed
+
+# Any JWT-shaped string passes the client's key check
+FAKE_KEY = "stub.stub.stub"
+
+
+class PostgrestStub(ThreadingHTTPServer):
+    # Room for bursts of concurrent connections from the async load test
+    request_queue_size = 1024
+
+    def __init__(self, latency_s: float):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.latency_s = latency_s
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self):
+        length = int(self.headers.get("content-length") or 0)
+        if length:
+            self.rfile.read(length)
+        with self.server.lock:
+            self.server.requests += 1
+        time.sleep(self.server.latency_s)
+        body = b"[]"
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PATCH = do_DELETE = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+def per_row_update(item_ids, client):
+    """The previous implementation: one PATCH per item."""
+    for item_id in item_ids:
+        client.table("digest_items").update({"included_in_email": True}).eq("id", item_id).execute()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="simulated per-request latency")
+    args = parser.parse_args()
+
+    server = PostgrestStub(args.latency_ms / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = create_client(server.url, FAKE_KEY)
+
+    print(f"{'items':>6} {'impl':>9} {'requests':>9} {'seconds':>8}")
+    for n in args.items:
+        ids = [str(uuid.uuid4()) for _ in range(n)]
+        for name, fn in [("per-row", per_row_update), ("batched", mark_items_emailed)]:
+            server.requests = 0
+            start = time.perf_counter()
+            fn(ids, client=client)
+            elapsed = time.perf_counter() - start
+            print(f"{n:>6} {name:>9} {server.requests:>9} {elapsed:>8.3f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
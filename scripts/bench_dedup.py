@@ -0,0 +1,91 @@
+"""Benchmark URL canonicalization + MinHash near-duplicate dedup as the pipeline runs it.
+
+Generates synthetic items with injected duplicates (UTM-tagged links,
+twitter.com/x.com variants and lightly edited cross-posts), streams them
+through `dedup_stream` (the path `run_pipeline` uses) and reports
+throughput and how many injected duplicates were collapsed.
+
+    python scripts/bench_dedup.py --sizes 1000 10000 50000
+"""
+import argparse
+import random
+import sys
+import os
+import time
+from dataclasses import replace
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.dedup.near_dup import dedup_stream
+from src.models import ContentItem, ContentSource
+
+TOPIC_WORDS = (
+    "agent model inference latency python rust tokenizer embedding retrieval vector database "
+    "prompt eval benchmark gpu cuda kernel cache scheduler batch stream pipeline deploy "
+    "observability tracing cost budget fine-tune dataset quantization distillation context "
+    "window memory tool planner compiler runtime async server client protocol schema"
+).split()
+
+
+def _vocabulary(rng: random.Random, size: int = 20000) -> list[str]:
+    # Pseudo-words give a realistic long-tail vocabulary around a shared topic core
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return TOPIC_WORDS + ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(size)]
+
+
+def synthetic_items(n: int, dup_rate: float, seed: int = 0) -> tuple[list[ContentItem], int]:
+    rng = random.Random(seed)
+    words_pool = _vocabulary(rng)
+    items: list[ContentItem] = []
+    injected = 0
+    while len(items) < n:
+        if items and rng.random() < dup_rate:
+            original = rng.choice(items)
+            kind = rng.randrange(3)
+            if kind == 0:
+                url = original.url + ("&" if "?" in original.url else "?") + "utm_source=newsletter&utm_medium=email"
+                items.append(replace(original, url=url))
+            elif kind == 1 and "x.com" in original.url:
+                items.append(replace(original, url=original.url.replace("https://x.com", "https://twitter.com")))
+            else:
+                words = original.content_snippet.split()
+                words[rng.randrange(len(words))] = rng.choice(words_pool)
+                items.append(replace(
+                    original,
+                    url=f"https://mirror.example.com/{len(items)}",
+                    content_snippet=" ".join(words),
+                ))
+            injected += 1
+            continue
+        idx = len(items)
+        snippet = " ".join(
+            rng.choice(TOPIC_WORDS) if rng.random() < 0.3 else rng.choice(words_pool)
+            for _ in range(rng.randint(25, 70))
+        )
+        if rng.random() < 0.4:
+            source, url = ContentSource.TWITTER, f"https://x.com/user{idx % 97}/status/{10**15 + idx}"
+        else:
+            source, url = ContentSource.NEWSLETTER, f"https://blog{idx % 53}.example.com/post/{idx}"
+        items.append(ContentItem(source=source, title=" ".join(snippet.split()[:8]), url=url, content_snippet=snippet))
+    return items, injected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--dup-rate", type=float, default=0.15)
+    args = parser.parse_args()
+
+    print(f"{'items':>7} {'seconds':>8} {'items/s':>9} {'injected':>9} {'removed':>8}")
+    for n in args.sizes:
+        items, injected = synthetic_items(n, args.dup_rate)
+        start = time.perf_counter()
+        kept = sum(1 for _ in dedup_stream(items))
+        elapsed = time.perf_counter() - start
+        removed = len(items) - kept
+        print(f"{n:>7} {elapsed:>8.2f} {n / elapsed:>9.0f} {injected:>9} {removed:>8}")
+
+
+if __name__ == "__main__":
+    main()
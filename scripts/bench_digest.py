@@ -0,0 +1,49 @@
+"""Benchmark digest rendering with the cached Jinja environment.
+
+Renders `build_digest` repeatedly for digests of each size and reports
+renders per second (the first render, which compiles the template, is not
+timed).
+
+    python scripts/bench_digest.py --sizes 10 100 1000
+"""
+import argparse
+import sys
+import os
+import time
+from datetime import date
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.digest.builder import build_digest
+
+
+def digest_items(n: int) -> list[dict]:
+    return [
+        {"id": str(i), "source": "newsletter", "title": f"Article {i}", "url": f"https://a.com/{i}",
+         "score": 5.0 + (i % 50) / 10, "justification": "Relevant to your current project", "author": "Author"}
+        for i in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--seconds", type=float, default=1.0, help="Time spent rendering each size")
+    args = parser.parse_args()
+
+    today = date.today()
+    print(f"{'items':>7} {'renders/s':>10} {'ms/render':>10}")
+    for n in args.sizes:
+        items = digest_items(n)
+        build_digest(items, today)  # warm the template cache
+        renders, start = 0, time.perf_counter()
+        while renders < 5 or time.perf_counter() - start < args.seconds:
+            build_digest(items, today)
+            renders += 1
+        elapsed = time.perf_counter() - start
+        print(f"{n:>7} {renders / elapsed:>10.0f} {elapsed / renders * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
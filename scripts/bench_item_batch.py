@@ -0,0 +1,87 @@
+"""Benchmark columnar ItemBatch operations against the per-object Python they replaced.
+
+Times digest selection (score threshold + ranking over `digest_items` rows)
+and per-source stats over scored items, the two places a pipeline run uses
+ItemBatch, each as plain Python loops and through ItemBatch. Dedup in the
+pipeline streams item by item; see scripts/bench_dedup.py.
+
+    python scripts/bench_item_batch.py --sizes 1000 10000 100000
+"""
+import argparse
+import random
+import sys
+import os
+import time
+from collections import defaultdict
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.digest.builder import MIN_SCORE_FOR_EMAIL
+from src.item_batch import ItemBatch
+from src.models import ContentSource, ScoredItem
+
+
+def digest_rows(n: int, rng: random.Random) -> list[dict]:
+    return [
+        {"id": str(i), "source": rng.choice(list(ContentSource)).value, "url": f"https://example.com/{i}",
+         "title": f"Item {i}", "score": round(rng.uniform(0, 10), 1), "content_snippet": "x" * 200}
+        for i in range(n)
+    ]
+
+
+def python_select(rows: list[dict]) -> list[dict]:
+    eligible = [i for i in rows if float(i.get("score", 0)) >= MIN_SCORE_FOR_EMAIL]
+    eligible.sort(key=lambda x: float(x.get("score", 0)), reverse=True)
+    return eligible
+
+
+def batch_select(rows: list[dict]) -> list[dict]:
+    batch = ItemBatch.from_rows(rows)
+    return batch.take(batch.score >= MIN_SCORE_FOR_EMAIL).by_score().rows
+
+
+def python_stats(items: list[ScoredItem]) -> dict:
+    counts, totals = defaultdict(int), defaultdict(float)
+    for item in items:
+        counts[item.source.value] += 1
+        totals[item.source.value] += item.score
+    return {source: (counts[source], totals[source] / counts[source]) for source in counts}
+
+
+def batch_stats(items: list[ScoredItem]) -> dict:
+    return ItemBatch.from_items(items).source_stats()
+
+
+def best_of(fn, arg, seconds: float = 0.5) -> float:
+    best, start, runs = float("inf"), time.perf_counter(), 0
+    while runs < 3 or (time.perf_counter() - start < seconds and runs < 50):
+        t = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - t)
+        runs += 1
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'items':>7} {'operation':>14} {'python ms':>10} {'batch ms':>9} {'speedup':>8}")
+    for n in args.sizes:
+        rows = digest_rows(n, rng)
+        assert python_select(rows) == batch_select(rows)
+        items = [ScoredItem(source=ContentSource(r["source"]), title=r["title"], url=r["url"], score=r["score"]) for r in rows]
+
+        for name, py, col, arg in (
+            ("digest select", python_select, batch_select, rows),
+            ("source stats", python_stats, batch_stats, items),
+        ):
+            py_s, col_s = best_of(py, arg), best_of(col, arg)
+            print(f"{n:>7} {name:>14} {py_s * 1000:>10.2f} {col_s * 1000:>9.2f} {py_s / col_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Benchmark the slotted item dataclasses against the Pydantic models they replaced.
+
+Times the hot-path operations a run does once per item — building a
+ContentItem from a parsed entry, copying it with one field changed (as
+feedback re-ranking does) and copying it into a ScoredItem after scoring —
+and measures memory per item with tracemalloc.
+
+    python scripts/bench_items.py --items 50000
+    python scripts/bench_items.py --items 100000 --repeat 5
+"""
+import argparse
+import sys
+import os
+import time
+import tracemalloc
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import Optional
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import BaseModel, Field
+
+from src.models import ContentItem, ContentSource, ScoredItem
+
+
+class PydanticContentItem(BaseModel):
+    source: ContentSource
+    title: str
+    url: str
+    author: str = ""
+    content_snippet: str = ""
+    published_at: Optional[datetime] = None
+
+
+class PydanticScoredItem(BaseModel):
+    source: ContentSource
+    title: str
+    url: str
+    author: str = ""
+    content_snippet: str = ""
+    score: float = Field(ge=0.0, le=10.0)
+    justification: str = ""
+
+
+def entries(n: int) -> list[dict]:
+    published = datetime.now(timezone.utc)
+    return [
+        {
+            "source": ContentSource.NEWSLETTER,
+            "title": f"Post {i} on inference latency",
+            "url": f"https://blog.example.com/posts/{i}",
+            "author": "Example Blog",
+            "content_snippet": f"A walkthrough of batching and caching for model serving, part {i}.",
+            "published_at": published,
+        }
+        for i in range(n)
+    ]
+
+
+def pydantic_ops(rows: list[dict]):
+    items = [PydanticContentItem(**row) for row in rows]
+    moved = [item.model_copy(update={"url": item.url + "?ref=1"}) for item in items]
+    scored = [
+        PydanticScoredItem(source=i.source, title=i.title, url=i.url, author=i.author,
+                           content_snippet=i.content_snippet, score=7.5, justification="Relevant")
+        for i in moved
+    ]
+    return items, moved, scored
+
+
+def slotted_ops(rows: list[dict]):
+    items = [ContentItem(**row) for row in rows]
+    moved = [replace(item, url=item.url + "?ref=1") for item in items]
+    scored = [ScoredItem.from_item(i, 7.5, "Relevant") for i in moved]
+    return items, moved, scored
+
+
+def measure(ops, rows: list[dict], repeat: int) -> tuple[float, float]:
+    """Best wall time of `repeat` runs, and bytes allocated per item kept alive by one run."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ops(rows)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    kept = ops(rows)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return best, current / (3 * len(rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = entries(args.items)
+    print(f"{args.items} items: build ContentItem, copy with one field changed, build ScoredItem")
+    print(f"{'':>10} {'seconds':>8} {'items/s':>9} {'bytes/obj':>10}")
+    results = {}
+    for name, ops in (("pydantic", pydantic_ops), ("slotted", slotted_ops)):
+        seconds, per_item = measure(ops, rows, args.repeat)
+        results[name] = (seconds, per_item)
+        print(f"{name:>10} {seconds:>8.3f} {args.items / seconds:>9.0f} {per_item:>10.0f}")
+    (p_s, p_b), (s_s, s_b) = results["pydantic"], results["slotted"]
+    print(f"slotted: {p_s / s_s:.1f}x faster, {p_b / s_b:.1f}x less memory per object")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,559 @@
+"""Benchmark the full daily pipeline offline against local fakes of every external service.
+
+One local HTTP server stands in for Supabase (an in-memory PostgREST), OpenAI,
+Resend, the RSS feeds, the YouTube Data API and Apify. Each service answers
+with synthetic data after a configurable delay. The real `run_pipeline` runs
+against it unchanged, with the real SDK clients pointed at the server. Every
+size runs in a fresh subprocess so peak RSS is per run. The report covers
+per-stage time and throughput, peak memory and calls per external service.
+
+    python scripts/bench_pipeline.py --sizes 100 1000 10000 50000
+    python scripts/bench_pipeline.py --sizes 1000 --latency-ms 20 --openai-latency-ms 800 --json bench.json
+    python scripts/bench_pipeline.py --sizes 1000 10000 --engine embedding
+    python scripts/bench_pipeline.py --sizes 1000 --baseline base.json --max-regression 25
+
+With `--baseline` (a `--json` file from another checkout), it exits non-zero
+when a run did not complete, got more than `--max-regression` percent
+slower or larger in peak memory, or made more calls to any service.
+"""
+import argparse
+import gzip
+import json
+import sys
+import os
+import random
+import re
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import parse_qsl, urlsplit
+from xml.sax.saxutils import escape
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.bench_dedup import synthetic_items
+
+# Any JWT-shaped string passes the Supabase client's key check
+FAKE_KEY = "stub.stub.stub"
+SERVICES = ("supabase", "openai", "resend", "rss", "youtube", "apify")
+# Stages shown in the summary table, in pipeline order
+REPORT_STAGES = ("ingest", "vectors", "score", "store", "deliver", "total")
+RSS_ITEMS_PER_FEED = 50
+YOUTUBE_ITEMS_PER_CHANNEL = 10  # one playlistItems page
+# Slowdowns smaller than this are not reported, whatever their percentage
+MIN_REGRESSION_SECONDS = 0.5
+
+
+# --- Fake services ---
+
+class FakeServices(ThreadingHTTPServer):
+    """Every external API on one local port; `calls` counts requests per service."""
+
+    request_queue_size = 1024
+
+    def __init__(self, latency_s: float, openai_latency_s: float):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.latency_s = latency_s
+        self.openai_latency_s = openai_latency_s
+        self.calls = {name: 0 for name in SERVICES}
+        self.lock = threading.Lock()
+        self.tables: dict[str, list[dict]] = {}
+        self.indexes: dict[tuple, dict] = {}
+        self.feeds: dict[str, bytes] = {}
+        self.playlists: dict[str, list[dict]] = {}
+        self.tweets: list[dict] = []
+        self.runs: dict[str, list[dict]] = {}
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _dispatch(self):
+        length = int(self.headers.get("content-length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if self.headers.get("content-encoding") == "gzip":
+            raw = gzip.decompress(raw)  # the Apify client compresses its payloads
+        body = json.loads(raw) if raw else None
+        parts = urlsplit(self.path)
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        path = parts.path
+
+        if path.startswith("/rest/v1/"):
+            service, handler = "supabase", partial(self._postgrest, path.removeprefix("/rest/v1/"), params, body)
+        elif path.startswith("/v1/chat/completions"):
+            service, handler = "openai", partial(self._openai, body)
+        elif path.startswith("/emails/batch"):
+            service, handler = "resend", partial(self._resend, body)
+        elif path.startswith("/feeds/"):
+            service, handler = "rss", partial(self._feed, path)
+        elif path.startswith("/youtube/"):
+            service, handler = "youtube", partial(self._youtube, dict(params))
+        elif path.startswith("/v2/"):
+            service, handler = "apify", partial(self._apify, path, dict(params), body)
+        else:
+            return self._reply(404, {"message": f"no fake for {path}"})
+
+        with self.server.lock:
+            self.server.calls[service] += 1
+        time.sleep(self.server.openai_latency_s if service == "openai" else self.server.latency_s)
+        try:
+            handler()
+        except Exception as e:
+            self._reply(500, {"message": f"fake {service} failed: {e!r}"})
+
+    do_GET = do_POST = do_PATCH = do_DELETE = _dispatch
+
+    def _reply(self, status: int, payload=None, content_type: str = "application/json", headers: dict | None = None):
+        data = payload if isinstance(payload, bytes) else (b"" if payload is None else json.dumps(payload).encode())
+        self.send_response(status)
+        self.send_header("content-type", content_type)
+        self.send_header("content-length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _postgrest(self, table: str, params: list[tuple[str, str]], body):
+        prefer = self.headers.get("prefer", "")
+        query = {k: v for k, v in params if k in ("select", "order", "limit", "offset", "on_conflict", "columns")}
+        filters = [(k, v) for k, v in params if k not in query]
+        with self.server.lock:
+            rows = self.server.tables.setdefault(table, [])
+            if self.command == "GET":
+                result = _order([r for r in rows if _matches(r, filters)], query.get("order"))
+                if "limit" in query:
+                    result = result[:int(query["limit"])]
+                return self._reply(200, result)
+            if self.command == "POST":
+                new_rows = body if isinstance(body, list) else [body]
+                conflict = query.get("on_conflict", "").split(",") if "resolution=merge-duplicates" in prefer else []
+                conflict = tuple(c for c in conflict if c)
+                index = None
+                if conflict:
+                    if (table, conflict) not in self.server.indexes:
+                        self.server.indexes[(table, conflict)] = {tuple(str(r.get(c)) for c in conflict): r for r in rows}
+                    index = self.server.indexes[(table, conflict)]
+                result = [_upsert(rows, dict(row), conflict, index) for row in new_rows]
+            elif self.command == "PATCH":
+                result = [r for r in rows if _matches(r, filters)]
+                for r in result:
+                    r.update(body)
+            else:
+                result = [r for r in rows if _matches(r, filters)]
+                self.server.tables[table] = [r for r in rows if r not in result]
+                self.server.indexes = {k: v for k, v in self.server.indexes.items() if k[0] != table}
+        if "return=minimal" in prefer:
+            return self._reply(201 if self.command == "POST" else 204)
+        return self._reply(201 if self.command == "POST" else 200, result)
+
+    def _openai(self, body):
+        prompt = body["messages"][-1]["content"]
+        titles = re.findall(r"- \*\*Title\*\*: (.*)", prompt)
+        # Stable pseudo-scores so runs are comparable; about half clear the digest threshold
+        scores = [
+            {"score": round(random.Random(title).uniform(0, 10), 1), "justification": "Synthetic score"}
+            for title in titles
+        ]
+        prompt_tokens = sum(len(m["content"]) for m in body["messages"]) // 4
+        completion_tokens = 20 * len(titles)
+        # Embedding-engine justification calls want one sentence per item instead
+        content = {"scores": scores, "justifications": ["Synthetic justification"] * len(titles)}
+        self._reply(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(content)},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    def _resend(self, body):
+        self._reply(200, {"data": [{"id": f"email-{uuid.uuid4().hex}"} for _ in body]})
+
+    def _feed(self, path: str):
+        feed = self.server.feeds.get(path.removeprefix("/feeds/"))
+        if feed is None:
+            return self._reply(404)
+        self._reply(200, feed, content_type="application/rss+xml")
+
+    def _youtube(self, params: dict):
+        videos = self.server.playlists.get(params.get("playlistId", ""), [])
+        offset, size = int(params.get("pageToken") or 0), int(params.get("maxResults", 5))
+        page = {"items": videos[offset:offset + size]}
+        if offset + size < len(videos):
+            page["nextPageToken"] = str(offset + size)
+        self._reply(200, page)
+
+    def _apify(self, path: str, params: dict, body):
+        if path.endswith("/items"):
+            tweets = self.server.runs[path.split("/")[-2]]
+            offset, limit = int(params.get("offset", 0)), int(params.get("limit", 1000))
+            page = tweets[offset:offset + limit]
+            return self._reply(200, page, headers={
+                "x-apify-pagination-total": str(len(tweets)),
+                "x-apify-pagination-offset": str(offset),
+                "x-apify-pagination-limit": str(limit),
+                "x-apify-pagination-desc": "",
+            })
+        if self.command == "POST":
+            # A run's dataset holds the tweets its `from:` / `list:` search terms ask for, after any since_id
+            wanted, since_ids, everyone = set(), {}, False
+            for term in body.get("searchTerms", []):
+                source, *ops = term.split()
+                if source.startswith("from:"):
+                    wanted.add(source[5:].lower())
+                else:
+                    everyone = True
+                for op in ops:
+                    if op.startswith("since_id:"):
+                        since_ids[source[5:].lower()] = int(op[9:])
+            tweets = [
+                t for t in self.server.tweets
+                if (everyone or t["author"]["userName"].lower() in wanted)
+                and int(t["id"]) > since_ids.get(t["author"]["userName"].lower(), 0)
+            ][:body.get("maxItems", len(self.server.tweets))]
+            with self.server.lock:
+                run_id = f"run-{len(self.server.runs) + 1}"
+                self.server.runs[run_id] = tweets
+        elif path.endswith("/log"):
+            return self._reply(200, b"", content_type="text/plain")
+        elif path.startswith("/v2/acts/"):
+            # The client's status watcher looks up the actor itself
+            return self._reply(200, {"data": {"id": "tweet-scraper", "name": "tweet-scraper"}})
+        else:
+            run_id = path.rstrip("/").split("/")[-1]
+        # Starting the actor and polling the run both see a finished run
+        self._reply(201 if self.command == "POST" else 200, {"data": {
+            "id": run_id, "actId": "tweet-scraper", "status": "SUCCEEDED",
+            "defaultDatasetId": run_id, "usageTotalUsd": 0.0004 * len(self.server.runs[run_id]),
+            "isStatusMessageTerminal": True,
+        }})
+
+    def log_message(self, *args):
+        pass
+
+
+def _value(raw):
+    try:
+        return float(raw)
+    except (TypeError, ValueError):
+        return raw
+
+
+def _matches(row: dict, filters: list[tuple[str, str]]) -> bool:
+    for column, expr in filters:
+        negate = expr.startswith("not.")
+        op, _, arg = expr.removeprefix("not.").partition(".")
+        value = row.get(column)
+        if op == "is":
+            ok = value is None if arg == "null" else value == (arg == "true")
+        elif op == "in":
+            ok = str(value) in [v.strip('"') for v in arg.strip("()").split(",")]
+        elif op == "eq":
+            ok = str(value).lower() == arg.lower() if isinstance(value, bool) else str(value) == arg or _value(value) == _value(arg)
+        elif value is None:
+            ok = False
+        else:
+            a, b = _value(value), _value(arg)
+            if type(a) is not type(b):
+                a, b = str(value), arg
+            ok = {"gt": a > b, "gte": a >= b, "lt": a < b, "lte": a <= b, "neq": a != b}[op]
+        if ok == negate:
+            return False
+    return True
+
+
+def _order(rows: list[dict], order: str | None) -> list[dict]:
+    for term in reversed((order or "").split(",")):
+        if term:
+            column, _, direction = term.partition(".")
+            rows = sorted(rows, key=lambda r: (r.get(column) is None, _value(r.get(column))), reverse=direction.startswith("desc"))
+    return rows
+
+
+def _upsert(rows: list[dict], row: dict, conflict: tuple[str, ...], index: dict | None) -> dict:
+    # `index` maps conflict-column values to rows, so a large upsert stays linear
+    key = tuple(str(row.get(c)) for c in conflict)
+    if index is not None and key in index:
+        index[key].update(row)
+        return index[key]
+    row.setdefault("id", str(uuid.uuid4()))
+    row.setdefault("included_in_email", False)
+    rows.append(row)
+    if index is not None:
+        index[key] = row
+    return row
+
+
+# --- Synthetic data ---
+
+def populate(server: FakeServices, n_items: int, users: int, dup_rate: float, twitter: bool = True, seed: int = 0) -> dict:
+    """Spread `n_items` synthetic items over RSS feeds, YouTube channels and one Apify run."""
+    items, _ = synthetic_items(n_items, dup_rate, seed)
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    feeds: dict[str, list] = {}
+    channels: dict[str, list] = {}
+    n_rss = n_videos = 0
+
+    for idx, item in enumerate(items):
+        kind = rng.random()
+        if kind < 0.2 and twitter:
+            tweet_id = 10**15 + idx
+            server.tweets.append({
+                "id": str(tweet_id), "text": f"{item.title}. {item.content_snippet}",
+                "url": f"https://x.com/user{idx % 97}/status/{tweet_id}",
+                "author": {"userName": f"user{idx % 97}"}, "createdAt": now.strftime("%a %b %d %H:%M:%S +0000 %Y"),
+            })
+        elif kind < 0.4:
+            channel = f"UCbench{n_videos // YOUTUBE_ITEMS_PER_CHANNEL}"
+            n_videos += 1
+            channels.setdefault(channel, []).append({"snippet": {
+                "title": item.title, "description": item.content_snippet, "channelTitle": channel,
+                "publishedAt": now.isoformat().replace("+00:00", "Z"),
+                "resourceId": {"videoId": f"vid{idx}"},
+            }})
+        else:
+            feeds.setdefault(f"{n_rss // RSS_ITEMS_PER_FEED}.xml", []).append(item)
+            n_rss += 1
+
+    for name, entries in feeds.items():
+        server.feeds[name] = _rss(name, entries, now)
+    for channel, videos in channels.items():
+        server.playlists["UU" + channel[2:]] = videos
+
+    server.tables["learning_context"] = [
+        {
+            "id": uid, "email": f"user{uid}@example.com", "active": True,
+            "goals": "Build reliable LLM agents and inference pipelines" if uid % 2 else "Learn Rust and GPU kernels",
+            "digest_format": "daily", "methodology": {"style": "practical", "depth": "intermediate"},
+            "skill_levels": {"python": "advanced"}, "time_availability": "30 minutes per day",
+            "project_context": "agent model inference latency python",
+        }
+        for uid in range(1, users + 1)
+    ]
+    handles = sorted({t["author"]["userName"] for t in server.tweets})
+    return {"items": len(items), "feeds": list(feeds), "channels": list(channels), "handles": handles}
+
+
+def _rss(name: str, entries: list, published: datetime) -> bytes:
+    pub = format_datetime(published)
+    body = "".join(
+        f"<item><title>{escape(e.title)}</title><link>{escape(e.url)}</link><guid>{escape(e.url)}</guid>"
+        f"<description>{escape(e.content_snippet)}</description><pubDate>{pub}</pubDate></item>"
+        for e in entries
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Bench {name}</title>{body}</channel></rss>'.encode()
+
+
+# --- Runner ---
+
+def run_once(
+    n_items: int,
+    users: int = 1,
+    latency_ms: float = 2.0,
+    openai_latency_ms: float = 50.0,
+    dup_rate: float = 0.1,
+    twitter: bool = True,
+    engine: str = "llm",
+) -> dict:
+    """Run `run_pipeline` once against fresh fakes and return its timings and call counts.
+
+    Patches the environment and clears every process-wide cache before and
+    after, so it can also be called from tests.
+    """
+    server = FakeServices(latency_ms / 1000, openai_latency_ms / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    setup = populate(server, n_items, users, dup_rate, twitter)
+
+    with tempfile.TemporaryDirectory() as cache_dir, ExitStack() as stack:
+        env = {
+            "SUPABASE_URL": server.url,
+            "SUPABASE_SERVICE_ROLE_KEY": FAKE_KEY,
+            "OPENAI_API_KEY": "sk-bench",
+            "OPENAI_BASE_URL": f"{server.url}/v1",
+            "RESEND_API_KEY": "re_bench",
+            "APIFY_API_TOKEN": "apify-bench",
+            "YOUTUBE_API_KEY": "yt-bench",
+            "DIGEST_RECIPIENT_EMAIL": "owner@example.com",
+            "RSS_FEED_URLS": ",".join(f"{server.url}/feeds/{name}" for name in setup["feeds"]),
+            "YOUTUBE_CHANNEL_IDS": ",".join(setup["channels"]),
+            "TWITTER_HANDLES": ",".join(setup["handles"]),
+            "TWITTER_MAX_TWEETS_PER_SOURCE": "1000000",
+            "TWITTER_LIST_URLS": "",
+            "CACHE_DIR": cache_dir,
+            # Measure orchestration, not the budget gates or TPM pacing
+            "DAILY_BUDGET_USD": "1000000",
+            "MONTHLY_BUDGET_USD": "1000000",
+            "OPENAI_TPM_LIMIT": "1000000000",
+            "SCORING_ENGINE": engine,
+            "EMBEDDING_MODEL": "local",
+        }
+        stack.enter_context(patch.dict(os.environ, env))
+
+        import apify_client
+        import resend
+        from apify_client import ApifyClient
+        from googleapiclient import discovery
+        from googleapiclient.discovery import build_from_document
+
+        from src import pipeline
+        from src.monitoring.timing import get_run_timings, peak_rss_mb
+
+        stack.enter_context(patch.object(resend, "api_url", server.url))
+        # The stages import their SDKs when they run, so patch the SDK modules themselves
+        stack.enter_context(patch.object(apify_client, "ApifyClient", partial(ApifyClient, api_url=server.url)))
+        stack.enter_context(patch.object(discovery, "build_from_document", partial(build_from_document, client_options={"api_endpoint": server.url})))
+        stack.callback(_clear_caches)
+        _clear_caches()
+
+        start = time.perf_counter()
+        pipeline.run_pipeline()
+        seconds = time.perf_counter() - start
+
+    server.shutdown()
+    log = server.tables.get("digest_log", [{}])[-1]
+    return {
+        "size": n_items,
+        "users": users,
+        "engine": engine,
+        "seconds": round(seconds, 3),
+        "items_per_second": round(n_items / seconds, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "items_ingested": log.get("items_ingested", 0),
+        "items_scored": log.get("items_scored", 0),
+        "items_emailed": log.get("items_emailed", 0),
+        "status": log.get("status"),
+        "calls": dict(server.calls),
+        "stages": get_run_timings().to_dict(),
+    }
+
+
+def _clear_caches() -> None:
+    import src.ingestion.youtube as youtube
+    from src.config import get_settings
+    from src.db import get_client
+    from src.digest.builder import get_digest_template, get_template_environment
+    from src.ingestion.feed_cache import get_feed_cache
+    from src.ingestion.tweet_watermarks import get_tweet_watermarks
+    from src.scoring.cache import get_score_cache
+    from src.scoring.vector_store import get_vector_store
+
+    for cached in (get_settings, get_client, get_template_environment, get_digest_template, get_feed_cache, get_tweet_watermarks, get_score_cache, get_vector_store):
+        cached.cache_clear()
+    youtube._local.__dict__.clear()
+
+
+def print_report(results: list[dict]) -> None:
+    print(f"{'items':>7} {'status':>9} {'seconds':>8} {'items/s':>8} {'peak MB':>8} "
+          + " ".join(f"{s:>8}" for s in SERVICES))
+    for r in results:
+        print(f"{r['size']:>7} {r['status']:>9} {r['seconds']:>8.2f} {r['items_per_second']:>8.0f} {r['peak_rss_mb']:>8.0f} "
+              + " ".join(f"{r['calls'][s]:>8}" for s in SERVICES))
+    print()
+    print(f"{'items':>7} " + " ".join(f"{s + ' s':>10} {'items/s':>8}" for s in REPORT_STAGES))
+    for r in results:
+        cells = []
+        for stage in REPORT_STAGES:
+            t = r["stages"].get(stage, {"seconds": 0.0, "items_per_second": 0.0})
+            cells.append(f"{t['seconds']:>10.2f} {t['items_per_second']:>8.0f}")
+        print(f"{r['size']:>7} " + " ".join(cells))
+
+
+def compare(results: list[dict], baseline: list[dict], max_regression: float) -> list[str]:
+    """Regressions of `results` against `baseline`, matched by size, users and engine."""
+    base = {(b["size"], b["users"], b["engine"]): b for b in baseline}
+    limit = 1 + max_regression / 100
+    regressions = []
+    for r in results:
+        name = f"{r['size']} items"
+        if r["status"] != "completed":
+            regressions.append(f"{name}: run ended {r['status']}")
+        b = base.get((r["size"], r["users"], r["engine"]))
+        if b is None:
+            continue
+        # Sub-second differences are runner noise, not regressions
+        if r["seconds"] > b["seconds"] * limit and r["seconds"] - b["seconds"] > MIN_REGRESSION_SECONDS:
+            regressions.append(f"{name}: {r['seconds']:.2f}s vs {b['seconds']:.2f}s")
+        if r["peak_rss_mb"] > b["peak_rss_mb"] * limit:
+            regressions.append(f"{name}: peak RSS {r['peak_rss_mb']:.0f} MB vs {b['peak_rss_mb']:.0f} MB")
+        for service in SERVICES:
+            # Calls are deterministic for a given size, so any increase is real
+            if r["calls"].get(service, 0) > b["calls"].get(service, 0):
+                regressions.append(f"{name}: {r['calls'][service]} {service} calls vs {b['calls'].get(service, 0)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--users", type=int, default=1, help="active learning contexts")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="simulated latency of every service but OpenAI")
+    parser.add_argument("--openai-latency-ms", type=float, default=50.0, help="simulated latency of one scoring call")
+    parser.add_argument("--dup-rate", type=float, default=0.1)
+    parser.add_argument("--engine", choices=["llm", "embedding"], default="llm", help="SCORING_ENGINE (embedding uses the local model)")
+    parser.add_argument("--no-twitter", action="store_true", help="skip the Apify source (its client waits ~6s for final run status)")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--baseline", help="fail on regressions against this --json file")
+    parser.add_argument("--max-regression", type=float, default=25.0, help="allowed slowdown / memory growth in percent")
+    parser.add_argument("--in-process", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.in_process:
+        # Child mode: one size, result as JSON on the last line of stdout
+        import logging
+        logging.disable(logging.WARNING)
+        print(json.dumps(run_once(args.sizes[0], args.users, args.latency_ms, args.openai_latency_ms, args.dup_rate, not args.no_twitter, args.engine)))
+        return
+
+    results = []
+    for size in args.sizes:
+        # A fresh interpreter per size keeps peak RSS and caches independent
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--in-process", "--sizes", str(size),
+             "--users", str(args.users), "--latency-ms", str(args.latency_ms),
+             "--openai-latency-ms", str(args.openai_latency_ms), "--dup-rate", str(args.dup_rate),
+             "--engine", args.engine]
+            + (["--no-twitter"] if args.no_twitter else []),
+            capture_output=True, text=True, check=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        print(f"{size} items: {results[-1]['seconds']:.2f}s", file=sys.stderr)
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (threshold {args.max_regression:g}%)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark the on-disk vector store: build, reload and query latency at 100k items.
+
+Fills a store with random unit vectors (the local hashing embedder's
+dimension by default), then times incremental adds, save, a cold reload,
+single-vector top-k search, batched nearest-neighbour lookups of the kind
+history dedup and feedback re-ranking run, and age eviction.
+
+    python scripts/bench_vector_store.py --items 100000
+    python scripts/bench_vector_store.py --items 100000 --dim 1536 --queries 500
+"""
+import argparse
+import sys
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from src.monitoring.timing import peak_rss_mb
+from src.scoring.vector_store import VectorStore
+
+
+def unit_vectors(rng: np.random.Generator, n: int, dim: int) -> np.ndarray:
+    v = rng.standard_normal((n, dim), dtype=np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--batch", type=int, default=512, help="items per add / nearest call (one pipeline batch)")
+    parser.add_argument("--queries", type=int, default=200, help="single-vector searches to time")
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        store = VectorStore(directory, model="bench", max_age_days=30)
+        add_seconds = 0.0
+        for start in range(0, args.items, args.batch):
+            n = min(args.batch, args.items - start)
+            vectors = unit_vectors(rng, n, args.dim)
+            urls = [f"https://example.com/{i}" for i in range(start, start + n)]
+            add_seconds += timed(lambda: store.add(urls, vectors))
+        # A quarter of the items carry feedback, as after months of daily digests
+        store._labels[rng.choice(len(store), len(store) // 4, replace=False)] = 1
+        save_seconds = timed(store.save)
+
+        del store
+        load_start = time.perf_counter()
+        store = VectorStore(directory, model="bench", max_age_days=30)
+        load_seconds = time.perf_counter() - load_start
+
+        queries = unit_vectors(rng, args.queries, args.dim)
+        search = sorted(timed(lambda: store.search(q, args.k)) for q in queries)
+        batch = unit_vectors(rng, args.batch, args.dim)
+        nearest = [timed(lambda: store.nearest(batch)) for _ in range(5)]
+        labelled = [timed(lambda: store.nearest(batch, label=1)) for _ in range(5)]
+        more_like = [timed(lambda: store.more_like_useful(args.k)) for _ in range(5)]
+
+        store._seen[: len(store) // 10] = 0
+        evict_seconds = timed(store.evict)
+
+        print(f"{args.items} items x {args.dim} dims, {args.items * args.dim * 4 / 1e6:.0f} MB of vectors")
+        print(f"  add          {args.items / add_seconds:>10.0f} items/s")
+        print(f"  save         {save_seconds * 1000:>10.1f} ms")
+        print(f"  cold load    {load_seconds * 1000:>10.1f} ms")
+        print(f"  search k={args.k:<3} p50 {statistics.median(search) * 1000:.1f} ms, p99 {search[int(len(search) * 0.99) - 1] * 1000:.1f} ms")
+        print(f"  nearest x{args.batch:<4} {statistics.median(nearest) * 1000:>7.1f} ms ({args.batch / statistics.median(nearest):.0f} queries/s)")
+        print(f"  nearest useful x{args.batch} {statistics.median(labelled) * 1000:.1f} ms")
+        print(f"  more-like-this {statistics.median(more_like) * 1000:>8.1f} ms")
+        print(f"  evict 10%    {evict_seconds * 1000:>10.1f} ms")
+        print(f"  peak RSS     {peak_rss_mb():>10.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark YouTube ingestion across many channels, serial vs a bounded pool.
+
+Points the real googleapiclient client at the fake YouTube API from
+bench_pipeline.py (which pages playlists like the real one) and times
+`fetch_youtube_items` for each concurrency, with quota units consumed.
+
+    python scripts/bench_youtube.py --channels 200 --latency-ms 100
+    python scripts/bench_youtube.py --channels 200 --videos 60 --concurrency 1 8 16 32
+"""
+import argparse
+import sys
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from functools import partial
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from googleapiclient import discovery
+from googleapiclient.discovery import build_from_document
+
+import src.ingestion.youtube as youtube
+from scripts.bench_pipeline import FakeServices
+from src.models import CostTracker
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channels", type=int, default=200)
+    parser.add_argument("--videos", type=int, default=3, help="videos per channel inside the 24h window")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="simulated latency of one API call")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    args = parser.parse_args()
+
+    server = FakeServices(args.latency_ms / 1000, 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    published = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    channels = [f"UCbench{i}" for i in range(args.channels)]
+    for channel in channels:
+        server.playlists["UU" + channel[2:]] = [
+            {"snippet": {"title": f"{channel} video {v}", "description": "", "channelTitle": channel,
+                         "publishedAt": published, "resourceId": {"videoId": f"{channel}-{v}"}}}
+            for v in range(args.videos)
+        ]
+
+    print(f"{args.channels} channels x {args.videos} videos, {args.latency_ms:.0f}ms per call")
+    print(f"{'workers':>8} {'seconds':>8} {'videos':>7} {'calls':>6} {'quota':>6}")
+    client = partial(build_from_document, client_options={"api_endpoint": server.url})
+    for workers in args.concurrency:
+        settings = SimpleNamespace(youtube_channels=channels, youtube_api_key="yt-bench", ingestion_max_concurrency=workers)
+        youtube._local.__dict__.clear()
+        server.calls["youtube"] = 0
+        tracker = CostTracker()
+        with patch.object(youtube, "get_settings", lambda: settings), patch.object(discovery, "build_from_document", client):
+            start = time.perf_counter()
+            items = youtube.fetch_youtube_items(tracker=tracker)
+            seconds = time.perf_counter() - start
+        print(f"{workers:>8} {seconds:>8.2f} {len(items):>7} {server.calls['youtube']:>6} {tracker.youtube_quota_units:>6}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Evaluate the local pre-filter against historical GPT-4o scores.
+
+Replays each past digest through the pre-filter at several thresholds and
+prints how many items it would have removed and the recall of items the LLM
+scored >= MIN_SCORE_FOR_EMAIL. Use it to pick PREFILTER_MIN_RELEVANCE and
+PREFILTER_TOP_K.
+
+    python scripts/evaluate_prefilter.py --days 30 --top-k 0 150
+"""
+import argparse
+import sys
+import os
+from datetime import date, timedelta
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.db import DEFAULT_USER_ID, get_client, get_learning_context, get_scored_items_since
+from src.digest.builder import MIN_SCORE_FOR_EMAIL
+from src.scoring.prefilter import prefilter_recall
+
+DEFAULT_THRESHOLDS = [0.0, 0.01, 0.02, 0.05, 0.08, 0.1, 0.15, 0.2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=30, help="history window in days")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=DEFAULT_THRESHOLDS)
+    parser.add_argument("--user-id", type=int, default=DEFAULT_USER_ID, help="whose context and history to replay")
+    parser.add_argument("--top-k", type=int, nargs="+", default=[0], help="per-run caps to try (0 = no cap)")
+    args = parser.parse_args()
+
+    client = get_client()
+    context = get_learning_context(client, args.user_id)
+    rows = get_scored_items_since(date.today() - timedelta(days=args.days), client, args.user_id)
+    relevant = sum(1 for r in rows if float(r.get("score", 0)) >= MIN_SCORE_FOR_EMAIL)
+    print(f"{len(rows)} historical items, {relevant} scored >= {MIN_SCORE_FOR_EMAIL}\n")
+
+    print(f"{'min_relevance':>13} {'top_k':>6} {'removed':>8} {'recall':>7}")
+    for top_k in args.top_k:
+        for threshold in args.thresholds:
+            recall, removed = prefilter_recall(rows, context, threshold, top_k, MIN_SCORE_FOR_EMAIL)
+            recall_str = f"{recall:.1%}" if recall is not None else "n/a"
+            print(f"{threshold:>13.3f} {top_k:>6} {removed:>8.1%} {recall_str:>7}")
+
+
+if __name__ == "__main__":
+    main()
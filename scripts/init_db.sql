@@ -1,6 +1,8 @@
--- Learning Context: single row storing user's learning goals
+-- Learning Context: one row per user storing their learning goals (id is the user id)
 CREATE TABLE IF NOT EXISTS learning_context (
-    id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    id SERIAL PRIMARY KEY,
+    email TEXT UNIQUE,
+    active BOOLEAN NOT NULL DEFAULT TRUE,
     goals TEXT NOT NULL DEFAULT '',
     digest_format TEXT NOT NULL DEFAULT 'daily',
     methodology JSONB NOT NULL DEFAULT '{"style": "practical", "depth": "intermediate", "consumption": "30min"}',
@@ -10,19 +12,22 @@ CREATE TABLE IF NOT EXISTS learning_context (
     updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
 );
 
--- Seed the single row
+-- Seed the first user (email falls back to DIGEST_RECIPIENT_EMAIL)
 INSERT INTO learning_context (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
+SELECT setval('learning_context_id_seq', GREATEST((SELECT MAX(id) FROM learning_context), 1));
 
 -- Learning Context History: snapshots on every update
 CREATE TABLE IF NOT EXISTS learning_context_history (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id INTEGER NOT NULL DEFAULT 1 REFERENCES learning_context (id) ON DELETE CASCADE,
     snapshot JSONB NOT NULL,
     changed_at TIMESTAMPTZ NOT NULL DEFAULT now()
 );
 
--- Digest Items: scored content items per digest run
+-- Digest Items: scored content items per digest run and user
 CREATE TABLE IF NOT EXISTS digest_items (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id INTEGER NOT NULL DEFAULT 1 REFERENCES learning_context (id) ON DELETE CASCADE,
     digest_date DATE NOT NULL DEFAULT CURRENT_DATE,
     source TEXT NOT NULL,
     title TEXT NOT NULL,
@@ -33,11 +38,11 @@ CREATE TABLE IF NOT EXISTS digest_items (
     justification TEXT NOT NULL DEFAULT '',
     included_in_email BOOLEAN NOT NULL DEFAULT FALSE,
     created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
-    UNIQUE (url, digest_date)
+    CONSTRAINT digest_items_user_url_date_key UNIQUE (user_id, url, digest_date)
 );
 
 CREATE INDEX IF NOT EXISTS idx_digest_items_date ON digest_items (digest_date);
-CREATE INDEX IF NOT EXISTS idx_digest_items_score ON digest_items (digest_date, score DESC);
+CREATE INDEX IF NOT EXISTS idx_digest_items_user_score ON digest_items (user_id, digest_date, score DESC);
 
 -- Feedback: user responses to digest items
 CREATE TABLE IF NOT EXISTS feedback (
@@ -49,6 +54,45 @@ CREATE TABLE IF NOT EXISTS feedback (
 
 CREATE INDEX IF NOT EXISTS idx_feedback_item ON feedback (item_id);
 
+-- Feedback Daily Counts: useful/total per digest date and user, kept current by a trigger on feedback
+CREATE TABLE IF NOT EXISTS feedback_daily_counts (
+    digest_date DATE NOT NULL,
+    user_id INTEGER NOT NULL REFERENCES learning_context (id) ON DELETE CASCADE,
+    useful INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (digest_date, user_id)
+);
+
+CREATE OR REPLACE FUNCTION bump_feedback_daily_counts() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO feedback_daily_counts (digest_date, user_id, useful, total)
+    SELECT d.digest_date, d.user_id, COUNT(*) FILTER (WHERE n.response = 'useful'), COUNT(*)
+    FROM new_feedback n
+    JOIN digest_items d ON d.id = n.item_id
+    GROUP BY d.digest_date, d.user_id
+    ON CONFLICT (digest_date, user_id) DO UPDATE
+    SET useful = feedback_daily_counts.useful + EXCLUDED.useful,
+        total = feedback_daily_counts.total + EXCLUDED.total;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS feedback_daily_counts_insert ON feedback;
+CREATE TRIGGER feedback_daily_counts_insert
+    AFTER INSERT ON feedback
+    REFERENCING NEW TABLE AS new_feedback
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_feedback_daily_counts();
+
+-- Daily Precision: precision per digest date across all users
+CREATE OR REPLACE VIEW daily_precision AS
+SELECT
+    digest_date,
+    SUM(useful)::INTEGER AS useful,
+    SUM(total)::INTEGER AS total,
+    ROUND(SUM(useful) * 100.0 / NULLIF(SUM(total), 0), 2) AS precision_rate
+FROM feedback_daily_counts
+GROUP BY digest_date;
+
 -- Digest Log: pipeline run tracking
 CREATE TABLE IF NOT EXISTS digest_log (
     digest_date DATE PRIMARY KEY DEFAULT CURRENT_DATE,
@@ -63,6 +107,8 @@ CREATE TABLE IF NOT EXISTS digest_log (
     cost_resend_usd NUMERIC(8, 4) DEFAULT 0,
     cost_total_usd NUMERIC(8, 4) DEFAULT 0,
     openai_tokens_used INTEGER DEFAULT 0,
+    youtube_quota_units INTEGER DEFAULT 0,
+    stage_timings JSONB,
     started_at TIMESTAMPTZ NOT NULL DEFAULT now(),
     completed_at TIMESTAMPTZ
 );
@@ -0,0 +1,108 @@
+"""Load-test the feedback endpoint with direct and buffered writes.
+
+Runs the FastAPI app in-process over httpx's ASGI transport, with the real
+async Supabase client pointed at the local PostgREST stand-in from
+bench_db_writes.py, and fires concurrent clicks (a share of them repeated as
+double-clicks). Reports click latency p50/p99, clicks/s and database round
+trips for each mode.
+
+    python scripts/load_test_feedback.py --clicks 2000 --concurrency 100 --latency-ms 20
+"""
+import argparse
+import asyncio
+import sys
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+import src.db as db
+from scripts.bench_db_writes import FAKE_KEY, PostgrestStub
+from src.feedback import api
+
+
+async def run_clicks(clicks: list[tuple[str, str]], concurrency: int) -> list[float]:
+    latencies = []
+    queue = asyncio.Queue()
+    for click in clicks:
+        queue.put_nowait(click)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://api") as client:
+        async def worker():
+            while not queue.empty():
+                item_id, response = queue.get_nowait()
+                start = time.perf_counter()
+                r = await client.get(f"/feedback/{item_id}", params={"response": response})
+                latencies.append(time.perf_counter() - start)
+                assert r.status_code == 200, r.text
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+async def run_mode(mode: str, clicks: list[tuple[str, str]], concurrency: int, server: PostgrestStub) -> None:
+    server.requests = 0
+    start = time.perf_counter()
+    if mode == "direct":
+        latencies = await run_clicks(clicks, concurrency)
+        await db.close_async_client()
+    else:
+        async with api.lifespan(api.app):
+            latencies = await run_clicks(clicks, concurrency)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{mode:>9} {p50:>8.1f} {p99:>8.1f} {len(clicks) / elapsed:>9.0f} {server.requests:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clicks", type=int, default=2000, help="feedback clicks per mode")
+    parser.add_argument("--concurrency", type=int, default=100, help="clicks in flight at once")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated database latency")
+    parser.add_argument("--double-click-rate", type=float, default=0.1, help="share of clicks sent twice")
+    parser.add_argument("--flush-interval-ms", type=int, default=250)
+    parser.add_argument("--flush-max-rows", type=int, default=100)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    clicks = []
+    for i in range(args.clicks):
+        click = (str(uuid.UUID(int=i + 1)), rng.choice(["useful", "not_useful"]))
+        clicks.append(click)
+        if rng.random() < args.double_click_rate:
+            clicks.append(click)
+
+    server = PostgrestStub(args.latency_ms / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        settings = SimpleNamespace(
+            supabase_url=server.url,
+            supabase_service_role_key=FAKE_KEY,
+            feedback_flush_interval_ms=args.flush_interval_ms,
+            feedback_flush_max_rows=args.flush_max_rows,
+            cache_dir=cache_dir,
+        )
+        print(f"{len(clicks)} clicks, concurrency {args.concurrency}, db latency {args.latency_ms:.0f}ms")
+        print(f"{'mode':>9} {'p50 ms':>8} {'p99 ms':>8} {'clicks/s':>9} {'db reqs':>10}")
+        with patch.object(db, "get_settings", lambda: settings), patch.object(api, "get_settings", lambda: settings):
+            for mode in ["direct", "buffered"]:
+                asyncio.run(run_mode(mode, clicks, args.concurrency, server))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+-- Migration: precision maintained incrementally from per-day feedback counters
+-- Run once in the Supabase SQL editor; safe to re-run (the backfill recomputes from feedback).
+CREATE TABLE IF NOT EXISTS feedback_daily_counts (
+    digest_date DATE NOT NULL,
+    user_id INTEGER NOT NULL REFERENCES learning_context (id) ON DELETE CASCADE,
+    useful INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (digest_date, user_id)
+);
+
+-- One upsert per inserted batch, so buffered bulk inserts from the API bump each day once
+CREATE OR REPLACE FUNCTION bump_feedback_daily_counts() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO feedback_daily_counts (digest_date, user_id, useful, total)
+    SELECT d.digest_date, d.user_id, COUNT(*) FILTER (WHERE n.response = 'useful'), COUNT(*)
+    FROM new_feedback n
+    JOIN digest_items d ON d.id = n.item_id
+    GROUP BY d.digest_date, d.user_id
+    ON CONFLICT (digest_date, user_id) DO UPDATE
+    SET useful = feedback_daily_counts.useful + EXCLUDED.useful,
+        total = feedback_daily_counts.total + EXCLUDED.total;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS feedback_daily_counts_insert ON feedback;
+CREATE TRIGGER feedback_daily_counts_insert
+    AFTER INSERT ON feedback
+    REFERENCING NEW TABLE AS new_feedback
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_feedback_daily_counts();
+
+-- Precision per digest date across all users
+CREATE OR REPLACE VIEW daily_precision AS
+SELECT
+    digest_date,
+    SUM(useful)::INTEGER AS useful,
+    SUM(total)::INTEGER AS total,
+    ROUND(SUM(useful) * 100.0 / NULLIF(SUM(total), 0), 2) AS precision_rate
+FROM feedback_daily_counts
+GROUP BY digest_date;
+
+-- Backfill counters from existing feedback
+LOCK TABLE feedback IN SHARE MODE;
+INSERT INTO feedback_daily_counts (digest_date, user_id, useful, total)
+SELECT d.digest_date, d.user_id, COUNT(*) FILTER (WHERE f.response = 'useful'), COUNT(*)
+FROM feedback f
+JOIN digest_items d ON d.id = f.item_id
+GROUP BY d.digest_date, d.user_id
+ON CONFLICT (digest_date, user_id) DO UPDATE
+SET useful = EXCLUDED.useful, total = EXCLUDED.total;
@@ -0,0 +1,17 @@
+-- Migration: multiple learning contexts (one per user) sharing one pipeline run
+-- learning_context.id becomes the user id; the existing row 1 keeps its data.
+ALTER TABLE learning_context DROP CONSTRAINT IF EXISTS learning_context_id_check;
+CREATE SEQUENCE IF NOT EXISTS learning_context_id_seq OWNED BY learning_context.id;
+SELECT setval('learning_context_id_seq', GREATEST((SELECT MAX(id) FROM learning_context), 1));
+ALTER TABLE learning_context ALTER COLUMN id SET DEFAULT nextval('learning_context_id_seq');
+ALTER TABLE learning_context ADD COLUMN IF NOT EXISTS email TEXT UNIQUE;
+ALTER TABLE learning_context ADD COLUMN IF NOT EXISTS active BOOLEAN NOT NULL DEFAULT TRUE;
+
+ALTER TABLE learning_context_history ADD COLUMN IF NOT EXISTS user_id INTEGER NOT NULL DEFAULT 1 REFERENCES learning_context (id) ON DELETE CASCADE;
+
+-- Each user gets their own scored copy of an item
+ALTER TABLE digest_items ADD COLUMN IF NOT EXISTS user_id INTEGER NOT NULL DEFAULT 1 REFERENCES learning_context (id) ON DELETE CASCADE;
+ALTER TABLE digest_items DROP CONSTRAINT IF EXISTS digest_items_url_digest_date_key;
+ALTER TABLE digest_items ADD CONSTRAINT digest_items_user_url_date_key UNIQUE (user_id, url, digest_date);
+DROP INDEX IF EXISTS idx_digest_items_score;
+CREATE INDEX IF NOT EXISTS idx_digest_items_user_score ON digest_items (user_id, digest_date, score DESC);
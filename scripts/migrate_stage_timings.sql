@@ -0,0 +1,3 @@
+-- Migration: per-stage timings on digest_log
+-- {"stage": {"seconds", "calls", "items", "items_per_second", "errors", "peak_rss_mb"}, ...}
+ALTER TABLE digest_log ADD COLUMN IF NOT EXISTS stage_timings JSONB;
@@ -0,0 +1,2 @@
+-- Migration: YouTube Data API quota units consumed per run (playlistItems.list = 1 unit per page)
+ALTER TABLE digest_log ADD COLUMN IF NOT EXISTS youtube_quota_units INTEGER DEFAULT 0;
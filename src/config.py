@@ -25,8 +25,19 @@ class Settings(BaseSettings):
     digest_recipient_email: str
     digest_from_email: str = "Learning Feed <digest@yourdomain.com>"
 
+    # Multi-recipient delivery (render workers and concurrent Resend batch requests)
+    email_max_concurrency: int = 4
+    email_max_retries: int = 3
+
     # Feedback API
     feedback_api_url: str = "http://localhost:8000"
+    # Clicks are buffered and bulk-inserted every interval or once this many are pending
+    feedback_flush_interval_ms: int = 250
+    feedback_flush_max_rows: int = 100
+
+    # Twitter: handles per parallel Apify actor run, and new tweets requested per list/handle
+    twitter_handles_per_run: int = 20
+    twitter_max_tweets_per_source: int = 10
 
     # Sources (comma-separated)
     twitter_list_urls: str = ""
@@ -41,6 +52,56 @@ class Settings(BaseSettings):
     daily_budget_usd: float = 1.00
     monthly_budget_usd: float = 15.00
 
+    # Export pipeline spans over OTLP (needs opentelemetry-sdk + exporter; endpoint from OTEL_EXPORTER_OTLP_ENDPOINT)
+    otel_enabled: bool = False
+
+    # Local cache directory (persisted between CI runs)
+    cache_dir: str = ".cache"
+
+    # Ingestion concurrency
+    ingestion_max_concurrency: int = 16
+    rss_timeout_seconds: float = 60.0
+    youtube_timeout_seconds: float = 60.0
+    twitter_timeout_seconds: float = 300.0
+
+    # Scoring concurrency
+    scoring_max_concurrency: int = 4
+    scoring_max_retries: int = 4
+    openai_tpm_limit: int = 30000
+    scoring_prompt_token_budget: int = 4000
+    scoring_completion_token_budget: int = 1500
+    scoring_max_batch_items: int = 25
+
+    # Scoring engine: "llm" (GPT-4o scores every item) or "embedding" (cosine similarity to the
+    # learning context; GPT-4o only justifies the top items). EMBEDDING_MODEL "local" runs offline.
+    scoring_engine: str = "llm"
+    embedding_model: str = "local"
+    embedding_batch_size: int = 512
+    embedding_justify_top_n: int = 10
+
+    # Embeddings of past items (.cache/vectors, from EMBEDDING_MODEL) reused across runs
+    vector_store_enabled: bool = True
+    vector_store_max_age_days: float = 30.0
+    # Drop items at least this similar to content stored by an earlier run (above 1.0 disables;
+    # opt-in, since it drops items the pre-filter would keep; 0.95 is a reasonable setting)
+    vector_dedup_min_similarity: float = 1.1
+    # Score shift per unit of similarity to items marked useful minus not useful (0 disables)
+    vector_rerank_weight: float = 0.0
+
+    # Near-duplicate detection (word-bigram Jaccard similarity; above 1.0 disables)
+    dedup_min_jaccard: float = 0.5
+
+    # Local pre-filter before LLM scoring (defaults keep everything)
+    prefilter_min_relevance: float = 0.0
+    prefilter_top_k: int = 0
+
+    # Users whose context term similarity is at least this share one scoring pass (above 1.0: identical only)
+    user_cluster_min_similarity: float = 0.9
+
+    # Scoring cache
+    score_cache_max_entries: int = 20000
+    score_cache_ttl_days: float = 14.0
+
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
     @property
@@ -1,23 +1,120 @@
+import threading
+import time
+from dataclasses import dataclass
 from datetime import date, datetime
-from typing import Optional
-
-from supabase import create_client, Client
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
 
 from src.config import get_settings
-from src.models import LearningContext, ScoredItem, ContentSource
+from src.models import LearningContext, ScoredItem, ContentSource, UserProfile
+from src.monitoring.timing import record as record_timing
+
+if TYPE_CHECKING:
+    # supabase (and its httpx/realtime stack) is imported by the first call that needs a client
+    from supabase import AsyncClient, Client
+
+# The original single-user row; used whenever no user is given
+DEFAULT_USER_ID = 1
+
+# IDs per `in.(...)` filter; keeps the PATCH URL well under server limits
+UPDATE_CHUNK_SIZE = 200
+
+
+# --- Client ---
+
+@dataclass
+class ConnectionStats:
+    """HTTP requests sent and new connections opened by the shared clients."""
+    connections: int = 0
+    requests: int = 0
+
+    def summary(self) -> str:
+        return f"Supabase: {self.requests} requests over {self.connections} connections"
+
+
+_stats = ConnectionStats()
+_stats_lock = threading.Lock()
+_async_client: Optional["AsyncClient"] = None
+
+
+def _count(connections: int = 0, requests: int = 0) -> None:
+    with _stats_lock:
+        _stats.connections += connections
+        _stats.requests += requests
+
+
+def get_connection_stats() -> ConnectionStats:
+    with _stats_lock:
+        return ConnectionStats(_stats.connections, _stats.requests)
+
+
+def reset_connection_stats() -> None:
+    with _stats_lock:
+        _stats.connections = _stats.requests = 0
+
+
+def _trace(event: str, info: dict) -> None:
+    if event == "connection.connect_tcp.complete":
+        _count(connections=1)
+
+
+async def _atrace(event: str, info: dict) -> None:
+    _trace(event, info)
+
+
+def _count_request(request) -> None:
+    # httpcore reports connection setup through the per-request trace extension
+    request.extensions["trace"] = _trace
+    request.extensions["started_at"] = time.perf_counter()
+    _count(requests=1)
 
 
-def get_client() -> Client:
+def _time_response(response) -> None:
+    started_at = response.request.extensions.get("started_at")
+    if started_at is not None:
+        record_timing("supabase", time.perf_counter() - started_at, error=response.status_code >= 400)
+
+
+async def _acount_request(request) -> None:
+    request.extensions["trace"] = _atrace
+    _count(requests=1)
+
+
+@lru_cache
+def get_client() -> "Client":
+    """Process-wide client; its PostgREST session keeps connections alive between calls."""
+    from supabase import create_client
+
     s = get_settings()
-    return create_client(s.supabase_url, s.supabase_service_role_key)
+    client = create_client(s.supabase_url, s.supabase_service_role_key)
+    client.postgrest.session.event_hooks["request"].append(_count_request)
+    client.postgrest.session.event_hooks["response"].append(_time_response)
+    return client
+
+
+async def get_async_client() -> "AsyncClient":
+    """Shared async client for the API. Connections are bound to the running event loop."""
+    global _async_client
+    if _async_client is None:
+        from supabase import acreate_client
+
+        s = get_settings()
+        client = await acreate_client(s.supabase_url, s.supabase_service_role_key)
+        client.postgrest.session.event_hooks["request"].append(_acount_request)
+        _async_client = client
+    return _async_client
+
+
+async def close_async_client() -> None:
+    global _async_client
+    if _async_client is not None:
+        await _async_client.postgrest.aclose()
+        _async_client = None
 
 
 # --- Learning Context ---
 
-def get_learning_context(client: Optional[Client] = None) -> LearningContext:
-    client = client or get_client()
-    result = client.table("learning_context").select("*").eq("id", 1).single().execute()
-    row = result.data
+def _context_from_row(row: dict) -> LearningContext:
     return LearningContext(
         goals=row["goals"],
         digest_format=row["digest_format"],
@@ -28,15 +125,37 @@ def get_learning_context(client: Optional[Client] = None) -> LearningContext:
     )
 
 
-def update_learning_context(ctx: LearningContext, client: Optional[Client] = None) -> None:
+def get_learning_context(client: Optional["Client"] = None, user_id: int = DEFAULT_USER_ID) -> LearningContext:
+    client = client or get_client()
+    result = client.table("learning_context").select("*").eq("id", user_id).single().execute()
+    return _context_from_row(result.data)
+
+
+def get_active_users(client: Optional["Client"] = None) -> list[UserProfile]:
+    """Every active user with their learning context, oldest first.
+
+    A user without an email (the original single-user row) receives the
+    digest at DIGEST_RECIPIENT_EMAIL.
+    """
+    client = client or get_client()
+    result = client.table("learning_context").select("*").eq("active", True).order("id").execute()
+    fallback = get_settings().digest_recipient_email
+    return [
+        UserProfile(user_id=row["id"], email=row.get("email") or fallback, context=_context_from_row(row))
+        for row in result.data
+    ]
+
+
+def update_learning_context(ctx: LearningContext, client: Optional["Client"] = None, user_id: int = DEFAULT_USER_ID) -> None:
     client = client or get_client()
     # Save history snapshot first
-    current = get_learning_context(client)
+    current = get_learning_context(client, user_id)
     client.table("learning_context_history").insert({
+        "user_id": user_id,
         "snapshot": current.model_dump(),
     }).execute()
 
-    # Update the single row
+    # Update the user's row
     client.table("learning_context").update({
         "goals": ctx.goals,
         "digest_format": ctx.digest_format,
@@ -45,16 +164,17 @@ def update_learning_context(ctx: LearningContext, client: Optional[Client] = Non
         "time_availability": ctx.time_availability,
         "project_context": ctx.project_context,
         "updated_at": datetime.utcnow().isoformat(),
-    }).eq("id", 1).execute()
+    }).eq("id", user_id).execute()
 
 
 # --- Digest Items ---
 
-def insert_digest_items(items: list[ScoredItem], digest_date: date, client: Optional[Client] = None) -> list[dict]:
+def insert_digest_items(items: list[ScoredItem], digest_date: date, client: Optional["Client"] = None, user_id: int = DEFAULT_USER_ID) -> list[dict]:
     client = client or get_client()
     rows = []
     for item in items:
         rows.append({
+            "user_id": user_id,
             "digest_date": digest_date.isoformat(),
             "source": item.source.value,
             "title": item.title,
@@ -67,16 +187,17 @@ def insert_digest_items(items: list[ScoredItem], digest_date: date, client: Opti
     if not rows:
         return []
     result = client.table("digest_items").upsert(
-        rows, on_conflict="url,digest_date"
+        rows, on_conflict="user_id,url,digest_date"
     ).execute()
     return result.data
 
 
-def get_digest_items(digest_date: date, min_score: float = 0.0, client: Optional[Client] = None) -> list[dict]:
+def get_digest_items(digest_date: date, min_score: float = 0.0, client: Optional["Client"] = None, user_id: int = DEFAULT_USER_ID) -> list[dict]:
     client = client or get_client()
     result = (
         client.table("digest_items")
         .select("*")
+        .eq("user_id", user_id)
         .eq("digest_date", digest_date.isoformat())
         .gte("score", min_score)
         .order("score", desc=True)
@@ -85,17 +206,32 @@ def get_digest_items(digest_date: date, min_score: float = 0.0, client: Optional
     return result.data
 
 
-def mark_items_emailed(item_ids: list[str], client: Optional[Client] = None) -> None:
+def get_scored_items_since(since: date, client: Optional["Client"] = None, user_id: int = DEFAULT_USER_ID) -> list[dict]:
+    """Get every item scored for a user on or after a date (for tuning and evaluation)."""
+    client = client or get_client()
+    result = (
+        client.table("digest_items")
+        .select("digest_date, source, title, content_snippet, score")
+        .eq("user_id", user_id)
+        .gte("digest_date", since.isoformat())
+        .execute()
+    )
+    return result.data
+
+
+def mark_items_emailed(item_ids: list[str], client: Optional["Client"] = None) -> None:
+    """Flag items as emailed with one `id in (...)` update per chunk of IDs."""
     client = client or get_client()
-    for item_id in item_ids:
+    for i in range(0, len(item_ids), UPDATE_CHUNK_SIZE):
+        chunk = item_ids[i:i + UPDATE_CHUNK_SIZE]
         client.table("digest_items").update(
             {"included_in_email": True}
-        ).eq("id", item_id).execute()
+        ).in_("id", chunk).execute()
 
 
 # --- Feedback ---
 
-def log_feedback(item_id: str, response: str, client: Optional[Client] = None) -> dict:
+def log_feedback(item_id: str, response: str, client: Optional["Client"] = None) -> dict:
     client = client or get_client()
     result = client.table("feedback").insert({
         "item_id": item_id,
@@ -104,7 +240,24 @@ def log_feedback(item_id: str, response: str, client: Optional[Client] = None) -
     return result.data[0] if result.data else {}
 
 
-def get_feedback_for_date(digest_date: date, client: Optional[Client] = None) -> list[dict]:
+async def alog_feedback(item_id: str, response: str, client: Optional["AsyncClient"] = None) -> dict:
+    client = client or await get_async_client()
+    result = await client.table("feedback").insert({
+        "item_id": item_id,
+        "response": response,
+    }).execute()
+    return result.data[0] if result.data else {}
+
+
+async def alog_feedback_batch(rows: list[dict], client: Optional["AsyncClient"] = None) -> None:
+    """Insert many feedback rows ({item_id, response}) in one request."""
+    if not rows:
+        return
+    client = client or await get_async_client()
+    await client.table("feedback").insert(rows, returning="minimal").execute()
+
+
+def get_feedback_for_date(digest_date: date, client: Optional["Client"] = None) -> list[dict]:
     client = client or get_client()
     result = (
         client.table("feedback")
@@ -115,6 +268,19 @@ def get_feedback_for_date(digest_date: date, client: Optional[Client] = None) ->
     return result.data
 
 
+def get_feedback_labels(since: date, client: Optional["Client"] = None) -> dict[str, str]:
+    """Latest feedback response per item URL for digests on or after a date."""
+    client = client or get_client()
+    result = (
+        client.table("feedback")
+        .select("response, clicked_at, digest_items!inner(url, digest_date)")
+        .gte("digest_items.digest_date", since.isoformat())
+        .order("clicked_at")
+        .execute()
+    )
+    return {row["digest_items"]["url"]: row["response"] for row in result.data}
+
+
 # --- Digest Log ---
 
 def upsert_digest_log(
@@ -130,7 +296,9 @@ def upsert_digest_log(
     cost_resend_usd: float = 0,
     cost_total_usd: float = 0,
     openai_tokens_used: int = 0,
-    client: Optional[Client] = None,
+    youtube_quota_units: int = 0,
+    stage_timings: Optional[dict] = None,
+    client: Optional["Client"] = None,
 ) -> None:
     client = client or get_client()
     row = {
@@ -144,11 +312,14 @@ def upsert_digest_log(
         "cost_resend_usd": cost_resend_usd,
         "cost_total_usd": cost_total_usd,
         "openai_tokens_used": openai_tokens_used,
+        "youtube_quota_units": youtube_quota_units,
     }
     if precision_rate is not None:
         row["precision_rate"] = float(precision_rate)
     if error_message is not None:
         row["error_message"] = error_message
+    if stage_timings is not None:
+        row["stage_timings"] = stage_timings
     if status == "completed":
         row["completed_at"] = datetime.utcnow().isoformat()
 
@@ -157,7 +328,7 @@ def upsert_digest_log(
 
 # --- Precision Queries ---
 
-def get_precision_stats(days: int = 7, client: Optional[Client] = None) -> list[dict]:
+def get_precision_stats(days: int = 7, client: Optional["Client"] = None) -> list[dict]:
     """Get daily precision rates for the last N days."""
     client = client or get_client()
     result = (
@@ -171,7 +342,20 @@ def get_precision_stats(days: int = 7, client: Optional[Client] = None) -> list[
     return result.data
 
 
-def get_daily_cost(target_date: date, client: Optional[Client] = None) -> float:
+async def aget_precision_stats(days: int = 7, client: Optional["AsyncClient"] = None) -> list[dict]:
+    client = client or await get_async_client()
+    result = await (
+        client.table("digest_log")
+        .select("digest_date, precision_rate, items_emailed")
+        .not_.is_("precision_rate", "null")
+        .order("digest_date", desc=True)
+        .limit(days)
+        .execute()
+    )
+    return result.data
+
+
+def get_daily_cost(target_date: date, client: Optional["Client"] = None) -> float:
     """Get total cost for a specific date."""
     client = client or get_client()
     result = (
@@ -185,7 +369,7 @@ def get_daily_cost(target_date: date, client: Optional[Client] = None) -> float:
     return 0.0
 
 
-def get_monthly_cost(year: int, month: int, client: Optional[Client] = None) -> float:
+def get_monthly_cost(year: int, month: int, client: Optional["Client"] = None) -> float:
     """Sum cost_total_usd for all runs in a given month."""
     client = client or get_client()
     start = date(year, month, 1).isoformat()
@@ -203,12 +387,36 @@ def get_monthly_cost(year: int, month: int, client: Optional[Client] = None) ->
     return sum(float(r.get("cost_total_usd", 0) or 0) for r in result.data)
 
 
-def calculate_precision_for_date(digest_date: date, client: Optional[Client] = None) -> Optional[float]:
-    """Calculate precision = useful / (useful + not_useful) for a given date."""
+def get_precision_by_date(since: date, until: date, client: Optional["Client"] = None) -> dict[date, float]:
+    """Precision (useful / total, in percent) per digest date in [since, until].
+
+    One query against the `daily_precision` view, whose counters a trigger on
+    `feedback` keeps current, so a 30-day window costs the same as one day.
+    """
     client = client or get_client()
-    feedback = get_feedback_for_date(digest_date, client)
-    if not feedback:
-        return None
-    useful = sum(1 for f in feedback if f["response"] == "useful")
-    total = len(feedback)
-    return round(useful / total * 100, 2) if total > 0 else None
+    result = (
+        client.table("daily_precision")
+        .select("digest_date, precision_rate")
+        .gte("digest_date", since.isoformat())
+        .lte("digest_date", until.isoformat())
+        .execute()
+    )
+    return {
+        date.fromisoformat(row["digest_date"]): float(row["precision_rate"])
+        for row in result.data
+        if row.get("precision_rate") is not None
+    }
+
+
+def update_precision_rates(rates: dict[date, float], client: Optional["Client"] = None) -> None:
+    """Store precision on digest_log for many dates in one upsert, leaving the other columns alone."""
+    if not rates:
+        return
+    client = client or get_client()
+    rows = [{"digest_date": d.isoformat(), "precision_rate": float(rate)} for d, rate in rates.items()]
+    client.table("digest_log").upsert(rows, on_conflict="digest_date").execute()
+
+
+def calculate_precision_for_date(digest_date: date, client: Optional["Client"] = None) -> Optional[float]:
+    """Calculate precision = useful / (useful + not_useful) for a given date."""
+    return get_precision_by_date(digest_date, digest_date, client).get(digest_date)
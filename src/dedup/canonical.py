@@ -0,0 +1,69 @@
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "mkt_tok",
+    "_hsenc", "_hsmi", "ref", "ref_src", "ref_url", "referrer", "cmpid", "yclid",
+})
+TRACKING_PREFIXES = ("utm_",)
+# Share-link params that only carry tracking on specific hosts
+HOST_TRACKING_PARAMS = {
+    "x.com": frozenset({"s", "t", "src"}),
+    "youtube.com": frozenset({"si", "feature", "pp"}),
+}
+HOST_ALIASES = {
+    "twitter.com": "x.com",
+    "mobile.twitter.com": "x.com",
+    "mobile.x.com": "x.com",
+    "m.youtube.com": "youtube.com",
+    "music.youtube.com": "youtube.com",
+}
+DEFAULT_PORTS = {"http": ":80", "https": ":443"}
+
+_TWEET_PATH = re.compile(r"^/[^/]+/status(?:es)?/(\d+)")
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so trivially different links to the same content compare equal.
+
+    Lowercases scheme and host, drops ``www.``, default ports, fragments,
+    trailing slashes and tracking parameters, sorts the remaining query,
+    maps twitter.com to x.com (tweets become ``x.com/i/status/<id>``) and
+    youtu.be links to ``youtube.com/watch?v=<id>``.
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    if not parts.scheme or not parts.netloc:
+        return url
+
+    scheme = "https" if parts.scheme.lower() in ("http", "https") else parts.scheme.lower()
+    host = parts.netloc.lower()
+    if host.endswith(DEFAULT_PORTS.get(parts.scheme.lower(), "\0")):
+        host = host.rsplit(":", 1)[0]
+    if host.startswith("www."):
+        host = host[4:]
+    host = HOST_ALIASES.get(host, host)
+    path = parts.path or "/"
+    query = parse_qsl(parts.query, keep_blank_values=True)
+
+    if host == "youtu.be" and len(path) > 1:
+        query = [("v", path.lstrip("/").split("/")[0])] + query
+        host, path = "youtube.com", "/watch"
+    elif host == "x.com":
+        match = _TWEET_PATH.match(path)
+        if match:
+            path = f"/i/status/{match.group(1)}"
+
+    host_params = HOST_TRACKING_PARAMS.get(host, frozenset())
+    query = sorted(
+        (k, v) for k, v in query
+        if k.lower() not in TRACKING_PARAMS
+        and k.lower() not in host_params
+        and not k.lower().startswith(TRACKING_PREFIXES)
+    )
+    if len(path) > 1:
+        path = path.rstrip("/")
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
@@ -0,0 +1,39 @@
+import logging
+import time
+from typing import Iterable, Iterator
+
+from src.models import ContentItem, CostTracker
+from src.scoring.embedding import chunked, embed_items
+from src.scoring.vector_store import VectorStore, item_keys
+
+logger = logging.getLogger(__name__)
+
+
+def history_dedup_stream(
+    items: Iterable[ContentItem],
+    store: VectorStore,
+    embedder,
+    min_similarity: float = 0.95,
+    batch_size: int = 64,
+    tracker: CostTracker | None = None,
+) -> Iterator[ContentItem]:
+    """Drop items whose embedding nearly matches content stored by an earlier run.
+
+    Items are embedded in batches (and added to the store) as they stream
+    through, so later stages reuse the vectors. Only rows first stored before
+    this pass count, and an item never matches its own canonical URL, so
+    re-running a day or re-ingesting the same post is unaffected.
+    """
+    started = time.time()
+    seen = dropped = 0
+    for batch in chunked(items, batch_size):
+        seen += len(batch)
+        keys = item_keys(batch)
+        vectors = embed_items(embedder, batch, tracker, store, keys)
+        sims, _ = store.nearest(vectors, added_before=started, exclude=keys)
+        for item, sim in zip(batch, sims):
+            if sim >= min_similarity:
+                dropped += 1
+            else:
+                yield item
+    logger.info(f"History dedup: {seen} -> {seen - dropped} items ({dropped} seen in earlier runs)")
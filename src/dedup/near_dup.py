@@ -0,0 +1,230 @@
+import logging
+from array import array
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from src.dedup.canonical import canonicalize_url
+from src.models import ContentItem
+from src.scoring.prefilter import tokenize
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NUM_BINS = 32
+BAND_ROWS = 2
+MIN_SHINGLES = 5
+_MAX_HASH = (1 << 64) - 1
+
+
+@dataclass
+class Sketch:
+    """Hashed word-bigram shingles of one item plus their MinHash signature."""
+    shingles: array
+    signature: tuple[int, ...]
+
+
+def sketch(text: str) -> Sketch | None:
+    """Build a one-permutation MinHash sketch, or None if the text is too short.
+
+    Each shingle is hashed once; the hash picks one of NUM_BINS bins and the
+    signature keeps the minimum per bin, so an item costs O(shingles) rather
+    than O(shingles x permutations). Empty bins borrow from the next
+    non-empty bin (rotation densification). Word bigrams rather than single
+    words keep common topic words from pulling unrelated items into the same
+    LSH buckets.
+
+    Uses Python's per-process string hash, so sketches are only comparable
+    within one run.
+    """
+    tokens = tokenize(text)
+    hashes = array("Q", {hash(f"{a} {b}") & _MAX_HASH for a, b in zip(tokens, tokens[1:])})
+    if len(hashes) < MIN_SHINGLES:
+        return None
+
+    bins = [_MAX_HASH] * NUM_BINS
+    for h in hashes:
+        b, value = h % NUM_BINS, h // NUM_BINS
+        if value < bins[b]:
+            bins[b] = value
+    if _MAX_HASH in bins:
+        original = bins[:]
+        for i in range(NUM_BINS):
+            if original[i] != _MAX_HASH:
+                continue
+            offset = 1
+            while original[(i + offset) % NUM_BINS] == _MAX_HASH:
+                offset += 1
+            # Tag borrowed values with the offset so they only match the same borrow
+            bins[i] = original[(i + offset) % NUM_BINS] * NUM_BINS + offset
+    return Sketch(hashes, tuple(bins))
+
+
+def jaccard(a: Sketch, b: Sketch) -> float:
+    sa, sb = set(a.shingles), set(b.shingles)
+    return len(sa & sb) / len(sa | sb)
+
+
+def near_duplicate_groups(sketches: list[Sketch | None], min_jaccard: float = 0.5) -> list[int]:
+    """Cluster items whose shingle Jaccard similarity is >= min_jaccard.
+
+    Returns a cluster id per entry. LSH banding over the signatures
+    (NUM_BINS / BAND_ROWS bands) limits work to pairs that agree on a whole
+    band, which keeps the pass near-linear; each candidate pair is then
+    checked once with the exact Jaccard of its shingles. None entries stay
+    singletons.
+    """
+    import numpy as np
+
+    parent = list(range(len(sketches)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    shingle_sets: dict[int, set] = {}
+
+    def shingles(i: int) -> set:
+        if i not in shingle_sets:
+            shingle_sets[i] = set(sketches[i].shingles)
+        return shingle_sets[i]
+
+    present = [idx for idx, sk in enumerate(sketches) if sk is not None]
+    if len(present) > 1:
+        signatures = np.array([sketches[idx].signature for idx in present], dtype=np.uint64)
+        for a, b in _candidate_pairs(signatures).tolist():
+            a, b = present[a], present[b]
+            if find(a) == find(b):
+                continue
+            sa, sb = shingles(a), shingles(b)
+            if len(sa & sb) / len(sa | sb) >= min_jaccard:
+                parent[find(b)] = find(a)
+    return [find(i) for i in range(len(sketches))]
+
+
+def _candidate_pairs(signatures: "np.ndarray") -> "np.ndarray":
+    """Distinct (i, j), i < j, of signature rows that share at least one LSH band."""
+    import numpy as np
+
+    firsts, seconds = [], []
+    for start in range(0, NUM_BINS, BAND_ROWS):
+        # Fold the band's rows into one key; a collision only adds a candidate the Jaccard check rejects
+        key = signatures[:, start].copy()
+        for col in range(start + 1, start + BAND_ROWS):
+            key = key * np.uint64(0x9E3779B97F4A7C15) + signatures[:, col]
+        order = np.argsort(key, kind="stable")
+        bucket = np.cumsum(np.r_[0, key[order][1:] != key[order][:-1]])
+        # Pair each member of a bucket with every later one, one distance at a time
+        distance = 1
+        while distance < len(order):
+            same = np.flatnonzero(bucket[distance:] == bucket[:-distance])
+            if not len(same):
+                break
+            firsts.append(order[same])
+            seconds.append(order[same + distance])
+            distance += 1
+    if not firsts:
+        return np.zeros((0, 2), dtype=np.intp)
+    a, b = np.concatenate(firsts), np.concatenate(seconds)
+    pairs = np.unique(np.minimum(a, b) * len(signatures) + np.maximum(a, b))
+    return np.stack([pairs // len(signatures), pairs % len(signatures)], axis=1)
+
+
+@dataclass
+class DedupResult:
+    items: list[ContentItem] = field(default_factory=list)
+    url_duplicates: int = 0
+    near_duplicates: int = 0
+
+
+def dedup_items(items: list[ContentItem], min_jaccard: float = 0.5) -> DedupResult:
+    """Collapse exact (canonical URL) and near-duplicate (MinHash) items.
+
+    Each cluster keeps one representative — the item with the longest
+    snippet, earliest on ties — with its original URL; canonical URLs are
+    only the grouping key. Output order follows each cluster's first
+    appearance.
+    """
+    import numpy as np
+
+    from src.item_batch import ItemBatch, group_representatives
+
+    # Canonical URLs and sketches are per item; grouping and picking runs on arrays
+    urls = [canonicalize_url(item.url) for item in items]
+    batch = ItemBatch.from_items(items, urls)
+    by_url = group_representatives(batch.url_hash, batch.snippet_len).tolist()
+    unique = [items[i] for i in by_url]
+
+    sketches = [sketch(f"{item.title} {item.content_snippet}") for item in unique]
+    clusters = np.asarray(near_duplicate_groups(sketches, min_jaccard))
+    kept = group_representatives(clusters, batch.snippet_len[by_url]).tolist()
+
+    result = DedupResult(
+        items=[unique[i] for i in kept],
+        url_duplicates=len(items) - len(unique),
+        near_duplicates=len(unique) - len(kept),
+    )
+    logger.info(
+        f"Dedup: {len(items)} -> {len(result.items)} items "
+        f"({result.url_duplicates} URL duplicates, {result.near_duplicates} near-duplicates)"
+    )
+    return result
+
+
+class StreamingDedup:
+    """Incremental dedup for items that arrive one at a time.
+
+    Uses the same canonical URLs and LSH bands as `dedup_items`, but the first
+    item of each URL or near-duplicate cluster wins, since later (possibly
+    longer) copies cannot replace an item that was already passed on. Only
+    the sketches of kept items are held.
+    """
+
+    def __init__(self, min_jaccard: float = 0.5):
+        self.min_jaccard = min_jaccard
+        self.kept = 0
+        self.url_duplicates = 0
+        self.near_duplicates = 0
+        self._urls: set[str] = set()
+        self._sketches: list[Sketch] = []
+        self._bands: list[dict[tuple[int, ...], list[int]]] = [{} for _ in range(0, NUM_BINS, BAND_ROWS)]
+
+    def add(self, item: ContentItem) -> ContentItem | None:
+        """Return the item, unchanged, if it is new, else None."""
+        url = canonicalize_url(item.url)
+        if url in self._urls:
+            self.url_duplicates += 1
+            return None
+
+        sk = sketch(f"{item.title} {item.content_snippet}")
+        if sk is not None:
+            keys = [sk.signature[start:start + BAND_ROWS] for start in range(0, NUM_BINS, BAND_ROWS)]
+            candidates = {idx for band, key in zip(self._bands, keys) for idx in band.get(key, ())}
+            if any(jaccard(sk, self._sketches[idx]) >= self.min_jaccard for idx in candidates):
+                self.near_duplicates += 1
+                return None
+            for band, key in zip(self._bands, keys):
+                band.setdefault(key, []).append(len(self._sketches))
+            self._sketches.append(sk)
+
+        self._urls.add(url)
+        self.kept += 1
+        return item
+
+
+def dedup_stream(items: Iterable[ContentItem], min_jaccard: float = 0.5) -> Iterator[ContentItem]:
+    """Yield each item that is not a URL or near-duplicate of an earlier one."""
+    dedup = StreamingDedup(min_jaccard)
+    seen = 0
+    for item in items:
+        seen += 1
+        kept = dedup.add(item)
+        if kept is not None:
+            yield kept
+    logger.info(
+        f"Dedup: {seen} -> {dedup.kept} items "
+        f"({dedup.url_duplicates} URL duplicates, {dedup.near_duplicates} near-duplicates)"
+    )
@@ -1,39 +1,19 @@
 import logging
 from datetime import date
 
-import resend
-
 from src.config import get_settings
-from src.models import CostTracker
 
 logger = logging.getLogger(__name__)
 
 
-def send_digest_email(html: str, digest_date: date, tracker: CostTracker | None = None) -> bool:
-    """Send the digest email via Resend."""
-    s = get_settings()
-    resend.api_key = s.resend_api_key
-
-    subject = f"🎓 Your Learning Digest — {digest_date.strftime('%b %d, %Y')}"
-
-    try:
-        response = resend.Emails.send({
-            "from": s.digest_from_email,
-            "to": [s.digest_recipient_email],
-            "subject": subject,
-            "html": html,
-        })
-        logger.info(f"Digest email sent: {response}")
-        if tracker:
-            tracker.add_resend_email()
-        return True
-    except Exception as e:
-        logger.error(f"Failed to send digest email: {e}")
-        return False
+def digest_subject(digest_date: date) -> str:
+    return f"🎓 Your Learning Digest — {digest_date.strftime('%b %d, %Y')}"
 
 
 def send_alert_email(subject: str, body: str) -> bool:
     """Send an alert email (e.g., low precision warning)."""
+    import resend
+
     s = get_settings()
     resend.api_key = s.resend_api_key
 
@@ -0,0 +1,159 @@
+import hashlib
+import logging
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from typing import TYPE_CHECKING
+
+from src.config import get_settings
+from src.delivery.emailer import digest_subject
+from src.digest.builder import build_digest
+from src.models import CostTracker
+from src.monitoring.timing import span
+
+if TYPE_CHECKING:
+    from resend.exceptions import ResendError
+
+logger = logging.getLogger(__name__)
+
+# Resend's batch endpoint accepts at most 100 emails per request
+RESEND_BATCH_SIZE = 100
+BACKOFF_BASE_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 30.0
+
+# CostTracker is shared by the send workers
+_tracker_lock = threading.Lock()
+
+
+@dataclass
+class Recipient:
+    """One team member and the scored digest_items rows picked for their own learning context."""
+    email: str
+    items: list[dict] = field(default_factory=list)
+
+
+@dataclass
+class RenderedDigest:
+    email: str
+    html: str
+    item_ids: list[str]
+
+
+@dataclass
+class SendResult:
+    """Outcome of one batch request; `seconds` covers every attempt, backoff included."""
+    emails: list[str]
+    ok: bool
+    attempts: int
+    seconds: float
+    error: str = ""
+
+
+@dataclass
+class DeliveryReport:
+    digests: list[RenderedDigest] = field(default_factory=list)
+    sends: list[SendResult] = field(default_factory=list)
+    render_seconds: float = 0.0
+
+    @property
+    def delivered(self) -> list[str]:
+        return [email for send in self.sends if send.ok for email in send.emails]
+
+    @property
+    def failed(self) -> list[str]:
+        return [email for send in self.sends if not send.ok for email in send.emails]
+
+    def summary(self) -> str:
+        latencies = sorted(send.seconds for send in self.sends)
+        if not latencies:
+            return "Delivery: nothing to send"
+        p50 = statistics.median(latencies)
+        return (
+            f"Delivery: {len(self.delivered)} sent, {len(self.failed)} failed in {len(self.sends)} batch request(s); "
+            f"render {self.render_seconds:.2f}s, send latency p50={p50:.2f}s max={latencies[-1]:.2f}s"
+        )
+
+
+def deliver_digests(recipients: list[Recipient], digest_date: date, tracker: CostTracker | None = None) -> DeliveryReport:
+    """Render every recipient's digest in parallel, then send them through Resend's batch endpoint."""
+    report = DeliveryReport()
+    start = time.perf_counter()
+    report.digests = render_digests(recipients, digest_date)
+    report.render_seconds = time.perf_counter() - start
+    report.sends = send_batches(report.digests, digest_date, tracker)
+    logger.info(report.summary())
+    return report
+
+
+def render_digests(recipients: list[Recipient], digest_date: date) -> list[RenderedDigest]:
+    """Build each recipient's digest HTML concurrently, preserving recipient order."""
+    s = get_settings()
+
+    def render(recipient: Recipient) -> RenderedDigest:
+        # build_digest annotates the row dicts, so each recipient gets its own copies
+        html, item_ids = build_digest([dict(row) for row in recipient.items], digest_date)
+        return RenderedDigest(recipient.email, html, item_ids)
+
+    with ThreadPoolExecutor(max_workers=s.email_max_concurrency, thread_name_prefix="render") as pool:
+        return list(pool.map(render, recipients))
+
+
+def send_batches(digests: list[RenderedDigest], digest_date: date, tracker: CostTracker | None = None) -> list[SendResult]:
+    """Send digests in chunks of RESEND_BATCH_SIZE, up to `email_max_concurrency` requests at once."""
+    import resend
+
+    s = get_settings()
+    resend.api_key = s.resend_api_key
+    chunks = [digests[i:i + RESEND_BATCH_SIZE] for i in range(0, len(digests), RESEND_BATCH_SIZE)]
+
+    def send(chunk: list[RenderedDigest]) -> SendResult:
+        result = _send_chunk(chunk, digest_date, s.digest_from_email, s.email_max_retries)
+        if result.ok and tracker:
+            with _tracker_lock:
+                for _ in chunk:
+                    tracker.add_resend_email()
+        return result
+
+    with ThreadPoolExecutor(max_workers=s.email_max_concurrency, thread_name_prefix="send") as pool:
+        return list(pool.map(send, chunks))
+
+
+def _send_chunk(chunk: list[RenderedDigest], digest_date: date, from_email: str, max_retries: int) -> SendResult:
+    import resend
+    from resend.exceptions import ResendError
+
+    emails = [d.email for d in chunk]
+    params = [
+        {"from": from_email, "to": [d.email], "subject": digest_subject(digest_date), "html": d.html}
+        for d in chunk
+    ]
+    # The same key on every attempt lets Resend drop a retry of a request that actually went through
+    key = hashlib.sha256(f"{digest_date.isoformat()}\0{','.join(emails)}".encode()).hexdigest()
+
+    start = time.perf_counter()
+    for attempt in range(max_retries + 1):
+        try:
+            with span("resend", items=len(chunk)):
+                resend.Batch.send(params, {"idempotency_key": key})
+            seconds = time.perf_counter() - start
+            logger.info(f"Sent {len(chunk)} digest(s) in {seconds:.2f}s (attempt {attempt + 1})")
+            return SendResult(emails, True, attempt + 1, seconds)
+        except ResendError as e:
+            if attempt == max_retries or not _is_retryable(e):
+                logger.error(f"Failed to send {len(chunk)} digest(s): {e}")
+                return SendResult(emails, False, attempt + 1, time.perf_counter() - start, str(e))
+            delay = min(BACKOFF_BASE_SECONDS * 2 ** attempt, MAX_BACKOFF_SECONDS)
+            logger.warning(f"Resend error {e.code}, retrying in {delay:.1f}s: {e}")
+            time.sleep(delay)
+    raise RuntimeError("unreachable")
+
+
+def _is_retryable(error: "ResendError") -> bool:
+    try:
+        code = int(error.code)
+    except (TypeError, ValueError):
+        return False
+    return code == 429 or code >= 500
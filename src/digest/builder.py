@@ -1,8 +1,10 @@
 import logging
 from datetime import date
+from functools import lru_cache
 from pathlib import Path
+from typing import Iterator
 
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
 
 from src.config import get_settings
 
@@ -13,22 +15,55 @@ MIN_SCORE_FOR_EMAIL = 5.0
 TOP_N = 3
 
 
+@lru_cache
+def get_template_environment() -> Environment:
+    """Process-wide Jinja environment; compiled templates are also cached on disk under cache_dir."""
+    bytecode_dir = Path(get_settings().cache_dir) / "jinja"
+    bytecode_dir.mkdir(parents=True, exist_ok=True)
+    return Environment(
+        loader=FileSystemLoader(str(TEMPLATE_DIR)),
+        bytecode_cache=FileSystemBytecodeCache(str(bytecode_dir)),
+        # Templates ship with the code, so skip the per-render mtime check
+        auto_reload=False,
+    )
+
+
+@lru_cache
+def get_digest_template() -> Template:
+    return get_template_environment().get_template("digest.html")
+
+
 def build_digest(items: list[dict], digest_date: date) -> tuple[str, list[str]]:
     """Build HTML digest email from scored items.
 
     Returns:
         Tuple of (html_content, list_of_item_ids_included)
     """
-    env = Environment(loader=FileSystemLoader(str(TEMPLATE_DIR)))
-    template = env.get_template("digest.html")
+    context, included_ids = _digest_context(items, digest_date)
+    html = get_digest_template().render(**context)
+    return html, included_ids
+
 
-    # Filter items with score >= MIN_SCORE
-    eligible = [i for i in items if float(i.get("score", 0)) >= MIN_SCORE_FOR_EMAIL]
-    eligible.sort(key=lambda x: float(x.get("score", 0)), reverse=True)
+def stream_digest(items: list[dict], digest_date: date) -> tuple[Iterator[str], list[str]]:
+    """Like `build_digest`, but yields the HTML in chunks via `Template.generate`.
+
+    Avoids holding the whole rendered string for very large digests; the
+    chunks are produced lazily as the iterator is consumed.
+    """
+    context, included_ids = _digest_context(items, digest_date)
+    return get_digest_template().generate(**context), included_ids
+
+
+def _digest_context(items: list[dict], digest_date: date) -> tuple[dict, list[str]]:
+    from src.item_batch import ItemBatch
+
+    # Threshold and rank as array operations; only the chosen rows are touched after
+    batch = ItemBatch.from_rows(items)
+    eligible = batch.take(batch.score >= MIN_SCORE_FOR_EMAIL).by_score()
 
     # Split into top 3 and remaining
-    top_items = eligible[:TOP_N]
-    remaining_items = eligible[TOP_N:]
+    top_items = eligible.rows[:TOP_N]
+    remaining_items = eligible.rows[TOP_N:]
 
     # Add feedback URLs
     s = get_settings()
@@ -38,7 +73,7 @@ def build_digest(items: list[dict], digest_date: date) -> tuple[str, list[str]]:
         item["feedback_useful_url"] = f"{base_url}/feedback/{item_id}?response=useful"
         item["feedback_not_useful_url"] = f"{base_url}/feedback/{item_id}?response=not_useful"
 
-    html = template.render(
+    context = dict(
         digest_date=digest_date.strftime("%B %d, %Y"),
         total_items=len(items),
         top_items=top_items,
@@ -47,5 +82,5 @@ def build_digest(items: list[dict], digest_date: date) -> tuple[str, list[str]]:
     )
 
     included_ids = [i["id"] for i in top_items + remaining_items if "id" in i]
-    logger.info(f"Built digest: {len(top_items)} top + {len(remaining_items)} remaining items")
-    return html, included_ids
+    logger.info(f"Built digest: {len(top_items)} top + {len(remaining_items)} remaining items ({eligible.source_summary()})")
+    return context, included_ids
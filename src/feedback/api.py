@@ -1,22 +1,70 @@
 import logging
+from contextlib import asynccontextmanager
 from datetime import date
+from pathlib import Path
+from typing import Optional
+from uuid import UUID
 
-from fastapi import FastAPI, Query
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import HTMLResponse, JSONResponse
 
-from src.db import log_feedback, get_precision_stats
-from src.pipeline import run_pipeline
+from src.config import get_settings
+from src.db import alog_feedback, alog_feedback_batch, aget_precision_stats, close_async_client
+from src.feedback.buffer import FeedbackBuffer
+from src.feedback.jobs import JobAlreadyRunning, JobRunner
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Learning Feed Curator - Feedback API")
+jobs = JobRunner()
+# Write-behind buffer for clicks; None outside the app lifespan, where clicks are written directly
+feedback_buffer: Optional[FeedbackBuffer] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global feedback_buffer
+    s = get_settings()
+    feedback_buffer = FeedbackBuffer(
+        alog_feedback_batch,
+        flush_interval_ms=s.feedback_flush_interval_ms,
+        max_rows=s.feedback_flush_max_rows,
+        spill_path=Path(s.cache_dir) / "feedback_spill.jsonl",
+    )
+    await feedback_buffer.start()
+    yield
+    jobs.shutdown()
+    # Flush buffered clicks while the database client is still open
+    await feedback_buffer.stop()
+    feedback_buffer = None
+    await close_async_client()
+
+
+def run_pipeline():
+    """Run the daily pipeline in this process.
+
+    Imported on first use: the pipeline pulls in every ingestion and
+    scoring SDK, which the feedback endpoints never need.
+    """
+    from src import pipeline
+    return pipeline.run_pipeline()
+
+
+app = FastAPI(title="Learning Feed Curator - Feedback API", lifespan=lifespan)
 
 
 @app.get("/feedback/{item_id}", response_class=HTMLResponse)
 async def record_feedback(item_id: str, response: str = Query(..., pattern="^(useful|not_useful)$")):
     """Record user feedback from email link click."""
     try:
-        log_feedback(item_id, response)
+        # Feedback rows reference digest_items by UUID; reject anything else before it reaches the buffer
+        item_id = str(UUID(item_id))
+    except ValueError:
+        return HTMLResponse("<p>This feedback link is not valid.</p>", status_code=400)
+    try:
+        if feedback_buffer is not None:
+            await feedback_buffer.add(item_id, response)
+        else:
+            await alog_feedback(item_id, response)
         emoji = "👍" if response == "useful" else "👎"
         label = "useful" if response == "useful" else "not useful"
         return HTMLResponse(f"""
@@ -46,15 +94,23 @@ async def health():
 @app.get("/stats")
 async def stats(days: int = Query(default=7, ge=1, le=30)):
     """Get recent precision rates."""
-    data = get_precision_stats(days)
+    data = await aget_precision_stats(days)
     return {"days": days, "stats": data}
 
 
-@app.post("/trigger")
+@app.post("/trigger", status_code=202)
 async def trigger_pipeline():
-    """Manually trigger the daily pipeline (dev only)."""
+    """Start the daily pipeline in the background (dev only); poll GET /jobs/{id} for the result."""
     try:
-        run_pipeline()
-        return {"status": "completed"}
-    except Exception as e:
-        return {"status": "failed", "error": str(e)}
+        job = jobs.submit("pipeline", run_pipeline)
+    except JobAlreadyRunning as e:
+        return JSONResponse({"detail": str(e), "job": e.job.to_dict()}, status_code=409)
+    return {"job_id": job.id, "status": job.status}
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job.to_dict()
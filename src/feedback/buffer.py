@@ -0,0 +1,188 @@
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+Writer = Callable[[list[dict]], Awaitable[object]]
+
+# A repeat click on the same item and answer within this window is a double-click
+DEDUPE_WINDOW_SECONDS = 60.0
+# Callers wait for a flush once this many flushes' worth of rows is pending
+BACKPRESSURE_FACTOR = 10
+# ...but never longer than this; a click that still finds the buffer full is dropped
+BACKPRESSURE_TIMEOUT_SECONDS = 2.0
+# Postgres SQLSTATE classes caused by the row itself (22 = bad data, 23 = constraint violation)
+ROW_ERROR_CLASSES = ("22", "23")
+
+
+def is_row_error(error: Exception) -> bool:
+    """True if the write failed because of the rows (e.g. an unknown item_id), not the database."""
+    return str(getattr(error, "code", "") or "")[:2] in ROW_ERROR_CLASSES
+
+
+class FeedbackBuffer:
+    """Write-behind buffer for feedback clicks on the API's event loop.
+
+    `add` acknowledges a click immediately; rows are bulk-inserted every
+    `flush_interval_ms` or as soon as `max_rows` are pending. A repeat of the
+    same (item, response) within DEDUPE_WINDOW_SECONDS is dropped, and a
+    changed answer for a pending item replaces the earlier one. Rows from a
+    failed flush are retried on the next one; whatever still cannot be
+    written at shutdown is spilled to `spill_path` and replayed on start.
+    A batch rejected because of its rows is retried row by row, and rows the
+    database still rejects are dropped so they cannot block later clicks.
+    """
+
+    def __init__(self, writer: Writer, flush_interval_ms: int = 250, max_rows: int = 100, spill_path: Optional[Path] = None):
+        self.writer = writer
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_rows = max_rows
+        self.spill_path = spill_path
+        self.flushed = 0
+        self.duplicates = 0
+        self.dropped = 0
+        self._pending: dict[str, dict] = {}
+        self._recent: dict[tuple[str, str], float] = {}
+        self._wake: Optional[asyncio.Event] = None
+        self._flushed_event: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._spill_replayed = False
+
+    async def start(self) -> None:
+        self._wake = asyncio.Event()
+        self._flushed_event = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._load_spill()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write out everything still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._pending:
+            self._spill()
+
+    async def add(self, item_id: str, response: str) -> bool:
+        """Queue a click; returns False if it was a double-click or dropped because the buffer is full."""
+        key = (item_id, response)
+        now = time.monotonic()
+        if self._recent.get(key, -DEDUPE_WINDOW_SECONDS) > now - DEDUPE_WINDOW_SECONDS:
+            self.duplicates += 1
+            return False
+
+        if len(self._pending) >= self.max_rows * BACKPRESSURE_FACTOR and self._task is not None:
+            # The database is falling behind; slow clicks down rather than grow without bound
+            self._wake.set()
+            self._flushed_event.clear()
+            try:
+                await asyncio.wait_for(self._flushed_event.wait(), BACKPRESSURE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            if len(self._pending) >= self.max_rows * BACKPRESSURE_FACTOR:
+                self.dropped += 1
+                logger.error(f"Feedback buffer full ({len(self._pending)} rows pending), dropping click on {item_id}")
+                return False
+
+        self._recent[key] = now
+        self._pending[item_id] = {"item_id": item_id, "response": response}
+        if len(self._pending) >= self.max_rows and self._wake is not None:
+            self._wake.set()
+        return True
+
+    async def flush(self) -> int:
+        """Bulk-insert every pending row; on a database failure the rows stay pending."""
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            if not self._pending:
+                return 0
+            rows = list(self._pending.values())
+            self._pending.clear()
+            try:
+                await self.writer(rows)
+                written, failed = len(rows), []
+            except Exception as e:
+                if not is_row_error(e):
+                    logger.error(f"Feedback flush of {len(rows)} rows failed, will retry: {e}")
+                    written, failed = 0, rows
+                else:
+                    logger.warning(f"Feedback flush of {len(rows)} rows rejected, writing them one by one: {e}")
+                    written, failed = await self._write_each(rows)
+            self.flushed += written
+            if failed:
+                # Newer clicks for the same item win over the failed rows
+                self._pending = {**{r["item_id"]: r for r in failed}, **self._pending}
+                return written
+            if self._spill_replayed:
+                # Replayed rows went out (or were dropped) with this flush
+                self.spill_path.unlink(missing_ok=True)
+                self._spill_replayed = False
+            self._prune_recent()
+            if self._flushed_event is not None:
+                self._flushed_event.set()
+            return written
+
+    async def _write_each(self, rows: list[dict]) -> tuple[int, list[dict]]:
+        """Write rows singly; drop the ones the database rejects, return (written, still failing)."""
+        written, failed = 0, []
+        for row in rows:
+            try:
+                await self.writer([row])
+                written += 1
+            except Exception as e:
+                if is_row_error(e):
+                    self.dropped += 1
+                    logger.error(f"Dropping feedback row {row} rejected by the database: {e}")
+                else:
+                    failed.append(row)
+        return written, failed
+
+    async def _run(self) -> None:
+        while True:
+            # asyncio.wait rather than wait_for: on 3.11 wait_for can swallow
+            # the cancel from stop() if the wake-up lands at the same moment
+            waiter = asyncio.ensure_future(self._wake.wait())
+            try:
+                await asyncio.wait({waiter}, timeout=self.flush_interval)
+            finally:
+                waiter.cancel()
+            self._wake.clear()
+            await self.flush()
+
+    def _prune_recent(self) -> None:
+        cutoff = time.monotonic() - DEDUPE_WINDOW_SECONDS
+        if len(self._recent) > self.max_rows * BACKPRESSURE_FACTOR:
+            self._recent = {k: t for k, t in self._recent.items() if t > cutoff}
+
+    def _spill(self) -> None:
+        if self.spill_path is None:
+            logger.error(f"Dropping {len(self._pending)} unflushed feedback rows (no spill path)")
+            return
+        self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+        # Pending rows include any replayed spill, so the file is rewritten
+        with open(self.spill_path, "w") as f:
+            for row in self._pending.values():
+                f.write(json.dumps(row) + "\n")
+        logger.warning(f"Spilled {len(self._pending)} unflushed feedback rows to {self.spill_path}")
+        self._pending.clear()
+
+    def _load_spill(self) -> None:
+        if self.spill_path is None or not self.spill_path.exists():
+            return
+        with open(self.spill_path) as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    self._pending.setdefault(row["item_id"], row)
+        self._spill_replayed = True
+        logger.info(f"Replaying {len(self._pending)} spilled feedback rows")
@@ -0,0 +1,86 @@
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept for GET /jobs/{id}
+MAX_JOB_HISTORY = 50
+
+
+class JobAlreadyRunning(Exception):
+    def __init__(self, job: "Job"):
+        super().__init__(f"Job {job.id} is already {job.status}")
+        self.job = job
+
+
+@dataclass
+class Job:
+    id: str
+    name: str
+    status: str = "queued"  # queued -> running -> completed | failed
+    created_at: str = ""
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class JobRunner:
+    """Runs one job at a time on a background thread, off the API's event loop.
+
+    Submitting while a job is queued or running raises JobAlreadyRunning, so
+    pipeline runs never overlap.
+    """
+
+    def __init__(self, max_history: int = MAX_JOB_HISTORY):
+        self.max_history = max_history
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job")
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._active: Optional[Job] = None
+        self._lock = threading.Lock()
+
+    def submit(self, name: str, fn: Callable[[], object]) -> Job:
+        with self._lock:
+            if self._active is not None:
+                raise JobAlreadyRunning(self._active)
+            job = Job(id=uuid.uuid4().hex, name=name, created_at=_now())
+            self._active = job
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.max_history:
+                self._jobs.popitem(last=False)
+        self._executor.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: Job, fn: Callable[[], object]) -> None:
+        job.status, job.started_at = "running", _now()
+        logger.info(f"Job {job.id} ({job.name}) started")
+        try:
+            fn()
+            job.status = "completed"
+        except Exception as e:
+            logger.exception(f"Job {job.id} ({job.name}) failed: {e}")
+            job.status, job.error = "failed", str(e)
+        finally:
+            job.finished_at = _now()
+            with self._lock:
+                self._active = None
+        logger.info(f"Job {job.id} ({job.name}) {job.status}")
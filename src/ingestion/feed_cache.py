@@ -0,0 +1,92 @@
+import json
+import logging
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from src.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+MAX_SEEN_IDS_PER_FEED = 500
+
+
+class FeedCache:
+    """Persistent per-feed ETag / Last-Modified / seen-entry cache for conditional GETs.
+
+    A hit is a feed the server answered with 304 Not Modified; a miss is a
+    feed that had to be downloaded and parsed.
+
+    A run's new validators and seen IDs are staged and only take effect in
+    `save()`; `discard()` drops them after a failed run. The instance is
+    shared by every run of a long-lived process, so until then lookups
+    return what was last saved.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.entries_skipped = 0
+        self._feeds: dict[str, dict] = {}
+        self._pending: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            self._feeds = json.loads(self.path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable feed cache {self.path}: {e}")
+            self._feeds = {}
+
+    def save(self) -> None:
+        """Commit this run's staged changes and write the cache."""
+        with self._lock:
+            self._feeds.update(self._pending)
+            self._pending = {}
+            data = json.dumps(self._feeds)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(data)
+        tmp.replace(self.path)
+
+    def discard(self) -> None:
+        """Drop this run's staged changes, e.g. after it failed."""
+        with self._lock:
+            self._pending = {}
+
+    def validators(self, url: str) -> tuple[str | None, str | None]:
+        """Return the (etag, modified) pair to send with the next request."""
+        with self._lock:
+            feed = self._feeds.get(url, {})
+            return feed.get("etag"), feed.get("modified")
+
+    def seen_ids(self, url: str) -> set[str]:
+        with self._lock:
+            return set(self._feeds.get(url, {}).get("seen_ids", []))
+
+    def record_hit(self, url: str) -> None:
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self, url: str, etag: str | None, modified: str | None, entry_ids: list[str], skipped: int = 0) -> None:
+        with self._lock:
+            self.misses += 1
+            self.entries_skipped += skipped
+            previous = self._feeds.get(url, {}).get("seen_ids", [])
+            # Newest IDs first, keeping older ones until the cap is reached
+            merged = list(dict.fromkeys(entry_ids + previous))[:MAX_SEEN_IDS_PER_FEED]
+            self._pending[url] = {"etag": etag, "modified": modified, "seen_ids": merged}
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"feed cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate), {self.entries_skipped} seen entries skipped"
+
+
+@lru_cache
+def get_feed_cache() -> FeedCache:
+    return FeedCache(Path(get_settings().cache_dir) / "rss_feeds.json")
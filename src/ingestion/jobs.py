@@ -0,0 +1,18 @@
+from typing import Callable, Generator, Iterable, Iterator
+
+from src.models import ContentItem
+
+# Runs once every item a job yielded has reached its consumer, e.g. to mark
+# feed entries seen or advance tweet watermarks
+Commit = Callable[[], None]
+
+# A fetch job yields one request's items; a generator job may return a Commit
+Job = Callable[[], Iterable[ContentItem]]
+JobItems = Generator[ContentItem, None, Commit | None]
+
+
+def committed(items: Iterable[ContentItem]) -> Iterator[ContentItem]:
+    """Yield a job's items, then run its commit once the consumer asks for more."""
+    commit = yield from items
+    if commit is not None:
+        commit()
@@ -1,10 +1,12 @@
 import logging
 from datetime import datetime, timedelta, timezone
-
-import feedparser
+from functools import partial
 
 from src.config import get_settings
+from src.ingestion.feed_cache import FeedCache
+from src.ingestion.jobs import JobItems, committed
 from src.models import ContentItem, ContentSource
+from src.monitoring.timing import span
 
 logger = logging.getLogger(__name__)
 
@@ -21,37 +23,7 @@ def fetch_rss_items(feed_urls: list[str] | None = None, hours_back: int = 24) ->
 
     for url in urls:
         try:
-            feed = feedparser.parse(url)
-            if feed.bozo and not feed.entries:
-                logger.warning(f"Failed to parse feed {url}: {feed.bozo_exception}")
-                continue
-
-            for entry in feed.entries:
-                published = _parse_date(entry)
-                if published and published < cutoff:
-                    continue
-
-                title = entry.get("title", "").strip()
-                link = entry.get("link", "").strip()
-                if not title or not link:
-                    continue
-
-                author = entry.get("author", "")
-                summary = entry.get("summary", "")
-                # Truncate summary to ~500 chars
-                if len(summary) > 500:
-                    summary = summary[:500] + "..."
-
-                items.append(ContentItem(
-                    source=ContentSource.NEWSLETTER,
-                    title=title,
-                    url=link,
-                    author=author,
-                    content_snippet=summary,
-                    published_at=published,
-                ))
-
-            logger.info(f"Fetched {len(feed.entries)} entries from {url}")
+            items.extend(fetch_feed_items(url, cutoff))
         except Exception as e:
             logger.error(f"Error fetching feed {url}: {e}")
             continue
@@ -60,6 +32,75 @@ def fetch_rss_items(feed_urls: list[str] | None = None, hours_back: int = 24) ->
     return items
 
 
+def fetch_feed_items(url: str, cutoff: datetime, cache: FeedCache | None = None) -> list[ContentItem]:
+    """Fetch and parse a single RSS feed, keeping entries published after cutoff."""
+    return list(committed(iter_feed_items(url, cutoff, cache)))
+
+
+def iter_feed_items(url: str, cutoff: datetime, cache: FeedCache | None = None) -> JobItems:
+    """Yield a single RSS feed's entries published after cutoff as they are parsed.
+
+    With a cache, the request is conditional on the stored ETag/Last-Modified
+    so an unchanged feed costs a single 304, and entries already seen on a
+    previous run are skipped. The new validators and seen IDs are returned
+    as a commit, so they are only staged once the items reached the consumer.
+    """
+    import feedparser
+
+    etag, modified = cache.validators(url) if cache else (None, None)
+    with span("feedparser") as s:
+        feed = feedparser.parse(url, etag=etag, modified=modified)
+        s.items = len(feed.entries)
+    if cache and feed.get("status") == 304:
+        cache.record_hit(url)
+        logger.info(f"Feed not modified: {url}")
+        return
+
+    if feed.bozo and not feed.entries:
+        logger.warning(f"Failed to parse feed {url}: {feed.bozo_exception}")
+        return
+
+    seen = cache.seen_ids(url) if cache else set()
+    entry_ids: list[str] = []
+    skipped = 0
+
+    for entry in feed.entries:
+        entry_id = entry.get("id") or entry.get("link", "")
+        if entry_id:
+            entry_ids.append(entry_id)
+            if entry_id in seen:
+                skipped += 1
+                continue
+
+        published = _parse_date(entry)
+        if published and published < cutoff:
+            continue
+
+        title = entry.get("title", "").strip()
+        link = entry.get("link", "").strip()
+        if not title or not link:
+            continue
+
+        author = entry.get("author", "")
+        summary = entry.get("summary", "")
+        # Truncate summary to ~500 chars
+        if len(summary) > 500:
+            summary = summary[:500] + "..."
+
+        yield ContentItem(
+            source=ContentSource.NEWSLETTER,
+            title=title,
+            url=link,
+            author=author,
+            content_snippet=summary,
+            published_at=published,
+        )
+
+    logger.info(f"Fetched {len(feed.entries)} entries from {url}")
+    if cache:
+        return partial(cache.record_miss, url, feed.get("etag"), feed.get("modified"), entry_ids, skipped)
+
+
 def _parse_date(entry) -> datetime | None:
     """Parse published date from a feed entry."""
     for field in ("published_parsed", "updated_parsed"):
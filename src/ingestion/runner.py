@@ -0,0 +1,273 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Iterator
+
+from src.config import get_settings
+from src.models import ContentItem, CostTracker
+from src.monitoring.timing import record
+from src.ingestion.feed_cache import get_feed_cache
+from src.ingestion.jobs import Job
+from src.ingestion.newsletters import iter_feed_items
+from src.ingestion.youtube import iter_channel_items
+from src.ingestion.tweet_watermarks import get_tweet_watermarks
+from src.ingestion.twitter import twitter_jobs
+
+logger = logging.getLogger(__name__)
+
+# Items buffered between fetch workers and the consumer; a full queue pauses
+# the workers, so a slow consumer never lets a large source pile up in memory.
+STREAM_QUEUE_SIZE = 256
+_POLL_SECONDS = 0.1
+
+
+@dataclass
+class SourceTiming:
+    source: str
+    requests: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    items: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class IngestionReport:
+    items: list[ContentItem] = field(default_factory=list)
+    timings: list[SourceTiming] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def total_items(self) -> int:
+        return sum(t.items for t in self.timings)
+
+    def summary(self) -> str:
+        parts = [
+            f"{t.source}={t.seconds:.2f}s ({t.items} items, {t.requests} req, "
+            f"{t.failed} failed, {t.timed_out} timed out)"
+            for t in self.timings
+        ]
+        return f"Ingestion took {self.seconds:.2f}s: " + ", ".join(parts)
+
+
+def build_sources(hours_back: int = 24, include_twitter: bool = True, tracker: CostTracker | None = None) -> list[tuple[str, list[Job], float]]:
+    """One (name, jobs, timeout) entry per configured source; each job yields that request's items."""
+    s = get_settings()
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=hours_back)
+
+    sources: list[tuple[str, list[Job], float]] = []
+    if s.rss_feeds:
+        cache = get_feed_cache()
+        jobs = [partial(iter_feed_items, url, cutoff, cache) for url in s.rss_feeds]
+        sources.append(("newsletters", jobs, s.rss_timeout_seconds))
+    else:
+        logger.warning("No RSS feed URLs configured")
+
+    if s.youtube_channels and s.youtube_api_key:
+        jobs = [partial(iter_channel_items, s.youtube_api_key, cid, cutoff, tracker) for cid in s.youtube_channels]
+        sources.append(("youtube", jobs, s.youtube_timeout_seconds))
+    else:
+        logger.warning("YouTube channel IDs or API key not configured")
+
+    if include_twitter:
+        jobs = twitter_jobs(hours_back=hours_back, tracker=tracker, watermarks=get_tweet_watermarks())
+        if jobs:
+            sources.append(("twitter", jobs, s.twitter_timeout_seconds))
+    return sources
+
+
+def stream_ingestion(hours_back: int = 24, include_twitter: bool = True, tracker: CostTracker | None = None) -> "IngestionStream":
+    """Fetch every configured source concurrently, yielding items as they are parsed."""
+    sources = build_sources(hours_back, include_twitter, tracker)
+    return IngestionStream(sources, get_settings().ingestion_max_concurrency)
+
+
+def run_ingestion(hours_back: int = 24, include_twitter: bool = True, tracker: CostTracker | None = None) -> IngestionReport:
+    """Fetch every configured source concurrently and report per-source timings."""
+    sources = build_sources(hours_back, include_twitter, tracker)
+    report = gather_sources(sources, get_settings().ingestion_max_concurrency)
+    if get_settings().rss_feeds:
+        logger.info(get_feed_cache().stats())
+    return report
+
+
+def gather_sources(sources: list[tuple[str, list[Job], float]], max_concurrency: int) -> IngestionReport:
+    """Run every job of every source and collect the items into the report."""
+    stream = IngestionStream(sources, max_concurrency)
+    items = list(stream)
+    stream.report.items = items
+    return stream.report
+
+
+@dataclass
+class _SourceState:
+    timing: SourceTiming
+    timeout: float
+    remaining: int
+    runs: list["_JobRun"] = field(default_factory=list)
+
+
+@dataclass
+class _JobRun:
+    """One job's progress and the clock its timeout is checked against."""
+    state: _SourceState
+    started: float | None = None
+    finished: bool = False
+    paused: float = 0.0
+    paused_since: float | None = None
+    # Set when the job times out or the stream closes; its worker stops at the next item
+    abandoned: threading.Event = field(default_factory=threading.Event)
+
+    def running_seconds(self, now: float) -> float:
+        paused_since = self.paused_since
+        paused = self.paused + (now - paused_since if paused_since is not None else 0.0)
+        return now - self.started - paused
+
+
+class IngestionStream:
+    """Iterate items as fetch jobs produce them, across all sources at once.
+
+    Every job of every source runs under a global concurrency limit, jobs
+    of the sources with the longest timeouts submitted first. A job
+    that runs longer than its source's timeout is abandoned and counted as
+    timed out; the clock starts when a worker picks the job up, pauses while
+    the consumer is behind, and stops when the job returns, so neither time
+    queued behind other jobs nor time the consumer spends on items counts.
+    Everything a job queued is delivered, even after it timed out, and a
+    job's commit (see `src.ingestion.jobs`) runs only once the consumer has
+    received all of its items. A failing job only loses the rest of its own
+    items. `report` is complete once the stream is exhausted.
+    """
+
+    def __init__(self, sources: list[tuple[str, list[Job], float]], max_concurrency: int):
+        self.sources = sources
+        self.max_concurrency = max_concurrency
+        self.report = IngestionReport()
+        self._queue: queue.Queue = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+        self._start = 0.0
+
+    def __iter__(self) -> Iterator[ContentItem]:
+        self._start = time.perf_counter()
+        states = [
+            _SourceState(SourceTiming(source=name, requests=len(jobs)), timeout, len(jobs))
+            for name, jobs, timeout in self.sources
+        ]
+        self.report.timings = [state.timing for state in states]
+
+        # A dedicated pool rather than a shared one, so abandoned jobs never
+        # hold up the rest of the run on exit.
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="ingest")
+        try:
+            # Longest timeouts first: a handful of multi-minute Apify runs
+            # start right away instead of queueing behind hundreds of feeds
+            for state, (_, jobs, _) in sorted(zip(states, self.sources), key=lambda pair: -pair[0].timeout):
+                if not jobs:
+                    self._close(state)
+                for job in jobs:
+                    run = _JobRun(state)
+                    state.runs.append(run)
+                    executor.submit(self._drain, run, job)
+
+            while True:
+                now = time.perf_counter()
+                for state in states:
+                    if state.remaining:
+                        self._expire(state, now)
+                pending = any(state.remaining for state in states)
+                try:
+                    # Once every job is settled, only what is already queued is left
+                    kind, run, payload = self._queue.get(timeout=_POLL_SECONDS) if pending else self._queue.get_nowait()
+                except queue.Empty:
+                    if pending:
+                        continue
+                    break
+                state = run.state
+                if kind == "item":
+                    state.timing.items += 1
+                    yield payload
+                    continue
+                if kind == "failed":
+                    state.timing.failed += 1
+                    logger.error(f"{state.timing.source} ingestion request failed: {payload}")
+                elif payload is not None:
+                    # Every item this job yielded was queued before "done" and has now been consumed
+                    payload()
+                self._settle(state)
+        finally:
+            for state in states:
+                for run in state.runs:
+                    run.abandoned.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.report.seconds = time.perf_counter() - self._start
+            record("ingest", self.report.seconds, self.report.total_items)
+            for t in self.report.timings:
+                record(f"ingest.{t.source}", t.seconds, t.items, error=bool(t.failed or t.timed_out))
+
+    def _drain(self, run: _JobRun, job: Job) -> None:
+        if run.abandoned.is_set():
+            return
+        run.started = time.perf_counter()
+        try:
+            items = iter(job())
+            while True:
+                try:
+                    item = next(items)
+                except StopIteration as stop:
+                    commit = stop.value
+                    break
+                if not self._put(run, ("item", run, item)):
+                    return
+        except Exception as e:
+            run.finished = True
+            self._put(run, ("failed", run, e))
+            return
+        run.finished = True
+        self._put(run, ("done", run, commit))
+
+    def _put(self, run: _JobRun, message: tuple) -> bool:
+        if run.abandoned.is_set():
+            return False
+        try:
+            self._queue.put_nowait(message)
+            return True
+        except queue.Full:
+            pass
+        # Waiting on the consumer does not count against the job's timeout
+        run.paused_since = time.perf_counter()
+        try:
+            while not run.abandoned.is_set():
+                try:
+                    self._queue.put(message, timeout=_POLL_SECONDS)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            run.paused += time.perf_counter() - run.paused_since
+            run.paused_since = None
+
+    def _expire(self, state: _SourceState, now: float) -> None:
+        for run in state.runs:
+            if run.started is None or run.finished or run.abandoned.is_set():
+                continue
+            if run.running_seconds(now) >= state.timeout:
+                run.abandoned.set()
+                state.timing.timed_out += 1
+                self._settle(state)
+
+    def _settle(self, state: _SourceState) -> None:
+        state.remaining -= 1
+        if state.remaining == 0:
+            self._close(state)
+
+    def _close(self, state: _SourceState) -> None:
+        t = state.timing
+        t.seconds = time.perf_counter() - self._start
+        if t.timed_out:
+            logger.error(f"{t.source}: {t.timed_out} request(s) exceeded {state.timeout:g}s timeout")
+        logger.info(f"{t.source}: fetched {t.items} items in {t.seconds:.2f}s")
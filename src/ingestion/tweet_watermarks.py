@@ -0,0 +1,82 @@
+import json
+import logging
+import threading
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+from src.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class TweetWatermarks:
+    """Persistent newest tweet ID and time seen per Twitter list or handle.
+
+    Keys are "list:<url>" or "handle:<name>". The next actor run for a source
+    only asks for tweets after its watermark, so overlapping daily windows
+    are not fetched (and paid for) twice.
+
+    Advances are staged and only take effect in `save()`; `discard()` drops
+    them after a failed run, so the shared instance never runs ahead of
+    what was saved.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.skipped = 0
+        self._marks: dict[str, dict] = {}
+        self._pending: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            self._marks = json.loads(self.path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable tweet watermarks {self.path}: {e}")
+            self._marks = {}
+
+    def save(self) -> None:
+        """Commit this run's staged advances and write the watermarks."""
+        with self._lock:
+            self._marks.update(self._pending)
+            self._pending = {}
+            data = json.dumps(self._marks)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(data)
+        tmp.replace(self.path)
+
+    def discard(self) -> None:
+        """Drop this run's staged advances, e.g. after it failed."""
+        with self._lock:
+            self._pending = {}
+
+    def get(self, key: str) -> tuple[int, datetime | None] | None:
+        """The saved (last tweet ID, its time) for a source, or None before its first run."""
+        with self._lock:
+            mark = self._marks.get(key)
+        if mark is None:
+            return None
+        return int(mark["last_id"]), datetime.fromisoformat(mark["last_at"]) if mark.get("last_at") else None
+
+    def advance(self, key: str, tweet_id: int, created_at: datetime | None) -> None:
+        with self._lock:
+            mark = self._pending.get(key) or self._marks.get(key)
+            if mark is None or tweet_id > int(mark["last_id"]):
+                self._pending[key] = {"last_id": str(tweet_id), "last_at": created_at.isoformat() if created_at else None}
+
+    def record_skipped(self, count: int = 1) -> None:
+        with self._lock:
+            self.skipped += count
+
+    def stats(self) -> str:
+        return f"tweet watermarks: {len(self._marks)} sources, {self.skipped} already-seen tweets skipped"
+
+
+@lru_cache
+def get_tweet_watermarks() -> TweetWatermarks:
+    return TweetWatermarks(Path(get_settings().cache_dir) / "twitter_watermarks.json")
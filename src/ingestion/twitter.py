@@ -1,16 +1,39 @@
+import itertools
 import logging
+import re
+import threading
 from datetime import datetime, timedelta, timezone
-
-from apify_client import ApifyClient
+from functools import partial
+from typing import Iterator
 
 from src.config import get_settings
+from src.ingestion.jobs import Job, JobItems, committed
+from src.ingestion.tweet_watermarks import TweetWatermarks
 from src.models import ContentItem, ContentSource, CostTracker
+from src.monitoring.timing import span
 
 logger = logging.getLogger(__name__)
 
+# CostTracker is shared by parallel actor runs
+_tracker_lock = threading.Lock()
+
 
-def fetch_twitter_items(list_urls: list[str] | None = None, handles: list[str] | None = None, hours_back: int = 24, tracker: CostTracker | None = None) -> list[ContentItem]:
+def fetch_twitter_items(list_urls: list[str] | None = None, handles: list[str] | None = None, hours_back: int = 24, tracker: CostTracker | None = None, watermarks: TweetWatermarks | None = None) -> list[ContentItem]:
     """Fetch recent tweets from Twitter lists and individual accounts using Apify tweet-scraper."""
+    return list(iter_twitter_items(list_urls, handles, hours_back, tracker, watermarks))
+
+
+def iter_twitter_items(list_urls: list[str] | None = None, handles: list[str] | None = None, hours_back: int = 24, tracker: CostTracker | None = None, watermarks: TweetWatermarks | None = None) -> Iterator[ContentItem]:
+    """Yield recent tweets from each actor run in turn, paging through its dataset rather than loading it whole."""
+    return itertools.chain.from_iterable(committed(job()) for job in twitter_jobs(list_urls, handles, hours_back, tracker, watermarks))
+
+
+def twitter_jobs(list_urls: list[str] | None = None, handles: list[str] | None = None, hours_back: int = 24, tracker: CostTracker | None = None, watermarks: TweetWatermarks | None = None) -> list[Job]:
+    """One job per Apify actor run; the ingestion runner runs them in parallel and merges their streams.
+
+    Each list gets its own run, since its tweets can only be attributed to it
+    that way; handles are sharded `TWITTER_HANDLES_PER_RUN` to a run.
+    """
     s = get_settings()
     urls = list_urls or s.twitter_lists
     handle_list = handles or s.twitter_handle_list
@@ -23,86 +46,140 @@ def fetch_twitter_items(list_urls: list[str] | None = None, handles: list[str] |
         logger.warning("Apify API token not configured")
         return []
 
-    client = ApifyClient(s.apify_api_token)
     cutoff = datetime.now(timezone.utc) - timedelta(hours=hours_back)
-    items: list[ContentItem] = []
+    per_run = max(1, s.twitter_handles_per_run)
+    handle_keys = [f"handle:{h.lower()}" for h in handle_list]
+    shards = [[f"list:{url}"] for url in urls] + [handle_keys[i:i + per_run] for i in range(0, len(handle_keys), per_run)]
+    logger.info(f"Planning {len(shards)} Apify tweet-scraper run(s): {len(urls)} lists, {len(handle_list)} handles")
+    return [partial(iter_twitter_run, shard, cutoff, tracker, watermarks) for shard in shards]
+
+
+def iter_twitter_run(sources: list[str], cutoff: datetime, tracker: CostTracker | None = None, watermarks: TweetWatermarks | None = None) -> JobItems:
+    """Run tweet-scraper once for a shard of lists/handles and yield tweets newer than each source's watermark.
 
-    since_date = cutoff.strftime("%Y-%m-%d")
-    until_date = (datetime.now(timezone.utc) + timedelta(days=1)).strftime("%Y-%m-%d")
+    Returns a commit that advances the watermarks, so they only move once
+    the whole dataset was read and its tweets reached the consumer.
+    """
+    from apify_client import ApifyClient
+
+    s = get_settings()
+    client = ApifyClient(s.apify_api_token)
+    marks = {key: watermarks.get(key) if watermarks else None for key in sources}
+    # Newest (ID, time) per source, applied only once the whole dataset is read
+    newest: dict[str, tuple[int, datetime | None]] = {}
+    raw = fetched = skipped = 0
 
     run_input = {
-        "maxTweets": 10,
-        "sinceDate": since_date,
-        "untilDate": until_date,
+        "searchTerms": [_search_term(key, marks[key], cutoff) for key in sources],
+        "sort": "Latest",
+        "maxItems": s.twitter_max_tweets_per_source * len(sources),
     }
-    if urls:
-        run_input["listUrls"] = urls
-    if handle_list:
-        run_input["twitterHandles"] = handle_list
 
     try:
-        logger.info(f"Starting Apify tweet-scraper: {len(urls)} lists, {len(handle_list)} handles")
-        run = client.actor("apidojo/tweet-scraper").call(run_input=run_input)
+        logger.info(f"Starting Apify tweet-scraper for {len(sources)} source(s), {sum(m is not None for m in marks.values())} with watermarks")
+        with span("apify", items=len(sources)):
+            run = client.actor("apidojo/tweet-scraper").call(run_input=run_input)
 
         # Track Apify cost
         apify_cost = run.get("usageTotalUsd", 0)
         if tracker and apify_cost:
-            tracker.add_apify_cost(apify_cost)
+            with _tracker_lock:
+                tracker.add_apify_cost(apify_cost)
             logger.info(f"Apify run cost: ${apify_cost:.4f}")
 
-        dataset_items = list(client.dataset(run["defaultDatasetId"]).iterate_items())
-        logger.info(f"Apify returned {len(dataset_items)} raw tweets")
-
-        for tweet in dataset_items:
+        for tweet in client.dataset(run["defaultDatasetId"]).iterate_items():
+            raw += 1
             try:
-                # Apify tweet-scraper uses these field names
-                text = tweet.get("text") or tweet.get("fullText") or tweet.get("full_text", "")
-                if not text:
-                    continue
-
-                # Get tweet URL directly, or build from author + id
-                tweet_url = tweet.get("url") or tweet.get("twitterUrl", "")
-                if not tweet_url:
-                    author_info = tweet.get("author", {})
-                    screen_name = author_info.get("userName", "")
-                    tweet_id = tweet.get("id", tweet.get("id_str", ""))
-                    if screen_name and tweet_id:
-                        tweet_url = f"https://x.com/{screen_name}/status/{tweet_id}"
-                if not tweet_url:
-                    continue
-
-                # Get author name
-                author_info = tweet.get("author", tweet.get("user", {}))
-                screen_name = author_info.get("userName", author_info.get("screen_name", ""))
-
-                # Parse date
-                created_at_str = tweet.get("createdAt", tweet.get("created_at", ""))
-                published = _parse_twitter_date(created_at_str)
-
-                # Skip retweets (usually just noise)
-                if text.startswith("RT @"):
-                    continue
-
-                # Truncate long tweets
-                snippet = text[:500] + "..." if len(text) > 500 else text
-
-                items.append(ContentItem(
-                    source=ContentSource.TWITTER,
-                    title=snippet[:120],
-                    url=tweet_url,
-                    author=f"@{screen_name}" if screen_name else "",
-                    content_snippet=snippet,
-                    published_at=published,
-                ))
+                tweet_id, screen_name, item = _parse_tweet(tweet)
             except Exception as e:
                 logger.warning(f"Error parsing tweet: {e}")
                 continue
 
-        logger.info(f"Fetched {len(items)} tweets total")
+            key = sources[0] if sources[0].startswith("list:") else f"handle:{screen_name.lower()}"
+            mark = marks.get(key)
+            if tweet_id is not None and mark is not None and tweet_id <= mark[0]:
+                skipped += 1
+                continue
+            if tweet_id is not None and key in marks and (key not in newest or tweet_id > newest[key][0]):
+                newest[key] = (tweet_id, item.published_at if item else None)
+            if item is None:
+                continue
+            fetched += 1
+            yield item
+
+        logger.info(f"Apify returned {raw} raw tweets, fetched {fetched} tweets ({skipped} at or below watermark)")
     except Exception as e:
         logger.error(f"Error fetching tweets from Apify: {e}")
-
-    return items
+        return None
+    # A timeout or failed page never gets here, so a partly read dataset
+    # never moves a watermark past tweets it did not yield
+    return partial(_advance_watermarks, watermarks, newest, skipped) if watermarks else None
+
+
+def _advance_watermarks(watermarks: TweetWatermarks, newest: dict[str, tuple[int, datetime | None]], skipped: int) -> None:
+    for key, (tweet_id, created_at) in newest.items():
+        watermarks.advance(key, tweet_id, created_at)
+    if skipped:
+        watermarks.record_skipped(skipped)
+
+
+def _search_term(key: str, mark: tuple[int, datetime | None] | None, cutoff: datetime) -> str:
+    """Twitter advanced-search query for one source, starting after its watermark when recent enough."""
+    kind, _, value = key.partition(":")
+    query = f"list:{_list_id(value)}" if kind == "list" else f"from:{value}"
+    last_id, last_at = mark if mark else (None, None)
+    if last_at is not None and last_at >= cutoff:
+        return f"{query} since:{last_at:%Y-%m-%d_%H:%M:%S}_UTC since_id:{last_id}"
+    # First run, or the source was quiet for longer than the window
+    return f"{query} since:{cutoff:%Y-%m-%d_%H:%M:%S}_UTC"
+
+
+def _list_id(url: str) -> str:
+    match = re.search(r"/lists/(\d+)", url)
+    return match.group(1) if match else url
+
+
+def _parse_tweet(tweet: dict) -> tuple[int | None, str, ContentItem | None]:
+    """Return the tweet's numeric ID, author handle and item (None for retweets and unusable tweets)."""
+    raw_id = str(tweet.get("id") or tweet.get("id_str") or "")
+    tweet_id = int(raw_id) if raw_id.isdigit() else None
+
+    # Get author name
+    author_info = tweet.get("author", tweet.get("user", {}))
+    screen_name = author_info.get("userName", author_info.get("screen_name", ""))
+
+    # Apify tweet-scraper uses these field names
+    text = tweet.get("text") or tweet.get("fullText") or tweet.get("full_text", "")
+    if not text:
+        return tweet_id, screen_name, None
+
+    # Get tweet URL directly, or build from author + id
+    tweet_url = tweet.get("url") or tweet.get("twitterUrl", "")
+    if not tweet_url and screen_name and raw_id:
+        tweet_url = f"https://x.com/{screen_name}/status/{raw_id}"
+    if not tweet_url:
+        return tweet_id, screen_name, None
+
+    # Parse date
+    created_at_str = tweet.get("createdAt", tweet.get("created_at", ""))
+    published = _parse_twitter_date(created_at_str)
+
+    # Skip retweets (usually just noise)
+    if text.startswith("RT @"):
+        return tweet_id, screen_name, None
+
+    # Truncate long tweets
+    snippet = text[:500] + "..." if len(text) > 500 else text
+
+    item = ContentItem(
+        source=ContentSource.TWITTER,
+        title=snippet[:120],
+        url=tweet_url,
+        author=f"@{screen_name}" if screen_name else "",
+        content_snippet=snippet,
+        published_at=published,
+    )
+    return tweet_id, screen_name, item
 
 
 def _parse_twitter_date(date_str: str) -> datetime | None:
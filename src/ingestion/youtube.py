@@ -1,16 +1,71 @@
+import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-
-from googleapiclient.discovery import build
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator
 
 from src.config import get_settings
-from src.models import ContentItem, ContentSource
+from src.models import ContentItem, ContentSource, CostTracker
+from src.monitoring.timing import span
 
 logger = logging.getLogger(__name__)
 
+# Quota cost of one playlistItems.list call (of the default 10,000 units/day)
+PLAYLIST_ITEMS_QUOTA_UNITS = 1
+FIRST_PAGE_SIZE = 10
+NEXT_PAGE_SIZE = 50
+# Only the snippet fields we read, to keep pages small
+PLAYLIST_ITEM_FIELDS = "nextPageToken,items/snippet(publishedAt,title,description,channelTitle,resourceId/videoId)"
+
+# googleapiclient service objects wrap an httplib2 connection and are not
+# thread-safe, so concurrent ingestion keeps one per worker thread.
+_local = threading.local()
+# CostTracker is shared by the channel workers
+_tracker_lock = threading.Lock()
+
+
+@lru_cache
+def discovery_document() -> dict:
+    """The YouTube v3 discovery document, parsed once per process.
+
+    Uses the copy bundled with google-api-python-client, else a copy in
+    CACHE_DIR, downloading it only when neither exists.
+    """
+    from googleapiclient import discovery_cache
+
+    doc = discovery_cache.get_static_doc("youtube", "v3")
+    if doc is None:
+        path = Path(get_settings().cache_dir) / "youtube_v3_discovery.json"
+        if path.exists():
+            doc = path.read_text()
+        else:
+            import httplib2
+            from googleapiclient.discovery import DISCOVERY_URI
+
+            _, content = httplib2.Http(timeout=30).request(DISCOVERY_URI.format(api="youtube", apiVersion="v3"))
+            doc = content.decode()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(doc)
+    return json.loads(doc)
+
 
-def fetch_youtube_items(channel_ids: list[str] | None = None, hours_back: int = 24) -> list[ContentItem]:
-    """Fetch recent videos from YouTube channels using the Data API v3."""
+def get_youtube_client(api_key: str):
+    """Return a YouTube Data API client bound to the current thread."""
+    youtube = getattr(_local, "youtube", None)
+    if youtube is None or getattr(_local, "api_key", None) != api_key:
+        from googleapiclient.discovery import build_from_document
+
+        youtube = build_from_document(discovery_document(), developerKey=api_key)
+        _local.youtube = youtube
+        _local.api_key = api_key
+    return youtube
+
+
+def fetch_youtube_items(channel_ids: list[str] | None = None, hours_back: int = 24, tracker: CostTracker | None = None) -> list[ContentItem]:
+    """Fetch recent videos from YouTube channels using the Data API v3, up to INGESTION_MAX_CONCURRENCY channels at once."""
     s = get_settings()
     ids = channel_ids or s.youtube_channels
     if not ids:
@@ -21,52 +76,86 @@ def fetch_youtube_items(channel_ids: list[str] | None = None, hours_back: int =
         logger.warning("YouTube API key not configured")
         return []
 
-    youtube = build("youtube", "v3", developerKey=s.youtube_api_key)
     cutoff = datetime.now(timezone.utc) - timedelta(hours=hours_back)
-    items: list[ContentItem] = []
 
-    for channel_id in ids:
+    def fetch(channel_id: str) -> list[ContentItem]:
         try:
-            # Convert channel ID to uploads playlist ID (UC -> UU trick)
-            uploads_playlist_id = "UU" + channel_id[2:] if channel_id.startswith("UC") else channel_id
+            return fetch_channel_items(s.youtube_api_key, channel_id, cutoff, tracker)
+        except Exception as e:
+            logger.error(f"Error fetching YouTube channel {channel_id}: {e}")
+            return []
+
+    with ThreadPoolExecutor(max_workers=s.ingestion_max_concurrency, thread_name_prefix="youtube") as pool:
+        items = [item for channel_items in pool.map(fetch, ids) for item in channel_items]
+
+    logger.info(f"Total YouTube items: {len(items)}")
+    return items
+
+
+def fetch_channel_items(api_key: str, channel_id: str, cutoff: datetime, tracker: CostTracker | None = None) -> list[ContentItem]:
+    """Fetch videos uploaded to a single channel after cutoff."""
+    return list(iter_channel_items(api_key, channel_id, cutoff, tracker))
+
+
+def iter_channel_items(api_key: str, channel_id: str, cutoff: datetime, tracker: CostTracker | None = None) -> Iterator[ContentItem]:
+    """Yield videos uploaded to a single channel after cutoff.
+
+    The uploads playlist is newest first, so pages are requested only until
+    one reaches a video older than the cutoff. Each page costs one quota unit.
+    """
+    youtube = get_youtube_client(api_key)
+
+    # Convert channel ID to uploads playlist ID (UC -> UU trick)
+    uploads_playlist_id = "UU" + channel_id[2:] if channel_id.startswith("UC") else channel_id
+    page_token = None
+    pages = 0
 
+    while True:
+        with span("youtube") as s:
             response = youtube.playlistItems().list(
                 part="snippet",
                 playlistId=uploads_playlist_id,
-                maxResults=10,
+                maxResults=NEXT_PAGE_SIZE if page_token else FIRST_PAGE_SIZE,
+                pageToken=page_token,
+                fields=PLAYLIST_ITEM_FIELDS,
             ).execute()
+            s.items = len(response.get("items", []))
+        pages += 1
+        if tracker:
+            with _tracker_lock:
+                tracker.add_youtube_quota(PLAYLIST_ITEMS_QUOTA_UNITS)
 
-            for video in response.get("items", []):
-                snippet = video["snippet"]
-                published_str = snippet.get("publishedAt", "")
-                published = None
-                if published_str:
-                    published = datetime.fromisoformat(published_str.replace("Z", "+00:00"))
-                    if published < cutoff:
-                        continue
-
-                video_id = snippet.get("resourceId", {}).get("videoId", "")
-                if not video_id:
+        reached_cutoff = False
+        for video in response.get("items", []):
+            snippet = video["snippet"]
+            published_str = snippet.get("publishedAt", "")
+            published = None
+            if published_str:
+                published = datetime.fromisoformat(published_str.replace("Z", "+00:00"))
+                if published < cutoff:
+                    reached_cutoff = True
                     continue
 
-                title = snippet.get("title", "").strip()
-                description = snippet.get("description", "")
-                if len(description) > 500:
-                    description = description[:500] + "..."
-
-                items.append(ContentItem(
-                    source=ContentSource.YOUTUBE,
-                    title=title,
-                    url=f"https://www.youtube.com/watch?v={video_id}",
-                    author=snippet.get("channelTitle", ""),
-                    content_snippet=description,
-                    published_at=published,
-                ))
-
-            logger.info(f"Fetched videos from channel {channel_id}")
-        except Exception as e:
-            logger.error(f"Error fetching YouTube channel {channel_id}: {e}")
-            continue
+            video_id = snippet.get("resourceId", {}).get("videoId", "")
+            if not video_id:
+                continue
 
-    logger.info(f"Total YouTube items: {len(items)}")
-    return items
+            title = snippet.get("title", "").strip()
+            description = snippet.get("description", "")
+            if len(description) > 500:
+                description = description[:500] + "..."
+
+            yield ContentItem(
+                source=ContentSource.YOUTUBE,
+                title=title,
+                url=f"https://www.youtube.com/watch?v={video_id}",
+                author=snippet.get("channelTitle", ""),
+                content_snippet=description,
+                published_at=published,
+            )
+
+        page_token = response.get("nextPageToken")
+        if reached_cutoff or not page_token:
+            break
+
+    logger.info(f"Fetched videos from channel {channel_id} ({pages} page(s))")
@@ -0,0 +1,164 @@
+import math
+from datetime import datetime, timezone
+from typing import Callable, Sequence
+
+import numpy as np
+
+from src.models import ContentItem, ContentSource, ScoredItem
+
+SOURCES = list(ContentSource)
+_SOURCE_CODES = {s.value: code for code, s in enumerate(SOURCES)}
+# Rows whose source is not a ContentSource
+UNKNOWN_SOURCE = -1
+_MAX_HASH = (1 << 64) - 1
+
+
+def _epoch(value) -> float:
+    if value is None:
+        return math.nan
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return math.nan
+    return value.timestamp()
+
+
+# Column name -> builder of that column from a list of items / row dicts
+Builders = dict[str, Callable[[list], np.ndarray]]
+
+_ITEM_COLUMNS: Builders = {
+    "source": lambda items: np.array([_SOURCE_CODES.get(i.source.value, UNKNOWN_SOURCE) for i in items], np.int8),
+    "url_hash": lambda items: _hash_urls([i.url for i in items]),
+    "score": lambda items: np.array([getattr(i, "score", 0.0) for i in items], np.float64),
+    "published_at": lambda items: np.array([_epoch(getattr(i, "published_at", None)) for i in items], np.float64),
+    "snippet_len": lambda items: np.array([len(i.content_snippet) for i in items], np.int32),
+}
+
+_ROW_COLUMNS: Builders = {
+    "source": lambda rows: np.array([_SOURCE_CODES.get(r.get("source"), UNKNOWN_SOURCE) for r in rows], np.int8),
+    "url_hash": lambda rows: _hash_urls([r.get("url", "") for r in rows]),
+    # Scores may arrive as numeric strings; NumPy parses them
+    "score": lambda rows: np.array([r.get("score") or 0 for r in rows], np.float64),
+    "published_at": lambda rows: np.array([_epoch(r.get("published_at")) for r in rows], np.float64),
+    "snippet_len": lambda rows: np.array([len(r.get("content_snippet") or "") for r in rows], np.int32),
+}
+
+
+def _hash_urls(urls: list[str]) -> np.ndarray:
+    return np.array([hash(url) & _MAX_HASH for url in urls], np.uint64)
+
+
+class ItemBatch:
+    """Columnar view of a list of items or digest rows.
+
+    Source code, URL hash, score, publish time and snippet length are NumPy
+    arrays, so filtering, ranking, dedup grouping and per-source stats run
+    as array operations. Each column is extracted from the rows the first
+    time it is used; `rows` keeps the original objects in batch order and is
+    only touched to hand the selected ones on (e.g. as template dicts). URL
+    hashes use Python's per-process string hash, so they are only comparable
+    within one run.
+    """
+
+    def __init__(self, rows: list, builders: Builders, columns: dict[str, np.ndarray] | None = None):
+        self.rows = rows
+        self._builders = builders
+        self._columns = columns or {}
+
+    @classmethod
+    def from_items(cls, items: Sequence[ContentItem | ScoredItem], urls: Sequence[str] | None = None) -> "ItemBatch":
+        """Batch of items; `urls` overrides their URLs for hashing (e.g. canonical URLs)."""
+        batch = cls(list(items), _ITEM_COLUMNS)
+        if urls is not None:
+            batch._columns["url_hash"] = _hash_urls(list(urls))
+        return batch
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[dict]) -> "ItemBatch":
+        """Batch of `digest_items` rows as returned by the database."""
+        return cls(list(rows), _ROW_COLUMNS)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def column(self, name: str) -> np.ndarray:
+        if name not in self._columns:
+            self._columns[name] = self._builders[name](self.rows)
+        return self._columns[name]
+
+    @property
+    def source(self) -> np.ndarray:
+        """int8 index into SOURCES, UNKNOWN_SOURCE if not one."""
+        return self.column("source")
+
+    @property
+    def url_hash(self) -> np.ndarray:
+        return self.column("url_hash")
+
+    @property
+    def score(self) -> np.ndarray:
+        """0 for unscored items."""
+        return self.column("score")
+
+    @property
+    def published_at(self) -> np.ndarray:
+        """Epoch seconds, NaN when unknown."""
+        return self.column("published_at")
+
+    @property
+    def snippet_len(self) -> np.ndarray:
+        return self.column("snippet_len")
+
+    def take(self, indices: np.ndarray) -> "ItemBatch":
+        """The rows at `indices` (an index array or boolean mask), in that order."""
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        rows = self.rows
+        return ItemBatch(
+            [rows[i] for i in indices.tolist()],
+            self._builders,
+            {name: values[indices] for name, values in self._columns.items()},
+        )
+
+    def by_score(self) -> "ItemBatch":
+        """Highest score first; equal scores keep their order."""
+        return self.take(np.argsort(-self.score, kind="stable"))
+
+    def source_stats(self) -> dict[str, dict]:
+        """Count, mean score and newest publish time per source, for sources present."""
+        known = self.source >= 0
+        codes = self.source[known].astype(np.intp)
+        counts = np.bincount(codes, minlength=len(SOURCES))
+        totals = np.bincount(codes, weights=self.score[known], minlength=len(SOURCES))
+        published = self.published_at[known]
+        dated = ~np.isnan(published)
+        newest = np.full(len(SOURCES), -np.inf)
+        np.maximum.at(newest, codes[dated], published[dated])
+        return {
+            SOURCES[code].value: {
+                "count": int(counts[code]),
+                "mean_score": round(float(totals[code] / counts[code]), 2),
+                "newest": None if np.isneginf(newest[code]) else datetime.fromtimestamp(newest[code], timezone.utc),
+            }
+            for code in np.flatnonzero(counts).tolist()
+        }
+
+    def source_summary(self) -> str:
+        return ", ".join(f"{name} {s['count']} (mean {s['mean_score']:.1f})" for name, s in self.source_stats().items())
+
+
+def group_representatives(groups: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """One index per distinct value of `groups`: the member with the largest weight, earliest on ties.
+
+    Representatives are returned in order of each group's first appearance.
+    """
+    if len(groups) == 0:
+        return np.zeros(0, dtype=np.intp)
+    _, first, inverse = np.unique(groups, return_index=True, return_inverse=True)
+    # Sort by group, then weight descending, then position; each group's first entry wins
+    order = np.lexsort((np.arange(len(groups)), -weights.astype(np.int64), inverse))
+    sorted_groups = inverse[order]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    best = order[starts]
+    return best[np.argsort(first, kind="stable")]
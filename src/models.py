@@ -12,7 +12,13 @@ class ContentSource(str, Enum):
     YOUTUBE = "youtube"
 
 
-class ContentItem(BaseModel):
+# Items are created by the tens of thousands per run, so they are slotted
+# dataclasses rather than Pydantic models: no per-instance __dict__ and no
+# validation on every copy. Values are checked where they enter (feed
+# parsing, GPT-4o responses); Pydantic stays on the config/DB/API models below.
+
+@dataclass(slots=True, kw_only=True)
+class ContentItem:
     source: ContentSource
     title: str
     url: str
@@ -21,15 +27,28 @@ class ContentItem(BaseModel):
     published_at: Optional[datetime] = None
 
 
-class ScoredItem(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class ScoredItem:
     source: ContentSource
     title: str
     url: str
     author: str = ""
     content_snippet: str = ""
-    score: float = Field(ge=0.0, le=10.0)
+    score: float  # 0-10, clamped by the scoring engines
     justification: str = ""
 
+    @classmethod
+    def from_item(cls, item: ContentItem, score: float, justification: str) -> "ScoredItem":
+        return cls(
+            source=item.source,
+            title=item.title,
+            url=item.url,
+            author=item.author,
+            content_snippet=item.content_snippet,
+            score=score,
+            justification=justification,
+        )
+
 
 class LearningContext(BaseModel):
     goals: str = ""
@@ -44,6 +63,13 @@ class LearningContext(BaseModel):
     project_context: str = ""
 
 
+class UserProfile(BaseModel):
+    """A digest recipient and their learning context (learning_context.id is the user id)."""
+    user_id: int
+    email: str
+    context: LearningContext
+
+
 class FeedbackResponse(BaseModel):
     item_id: str
     response: str  # "useful" or "not_useful"
@@ -62,6 +88,8 @@ class DigestLog(BaseModel):
 # Pricing constants
 OPENAI_GPT4O_INPUT_PER_1K = 0.0025
 OPENAI_GPT4O_OUTPUT_PER_1K = 0.01
+# text-embedding-3-small
+OPENAI_EMBEDDING_PER_1K = 0.00002
 RESEND_COST_PER_EMAIL = 0.00028  # after free tier
 
 
@@ -73,6 +101,7 @@ class CostTracker:
     apify_cost_usd: float = 0.0
     resend_emails_sent: int = 0
     resend_cost_usd: float = 0.0
+    youtube_quota_units: int = 0
 
     @property
     def total_cost_usd(self) -> float:
@@ -84,9 +113,17 @@ class CostTracker:
         cost = (prompt_tokens * OPENAI_GPT4O_INPUT_PER_1K + completion_tokens * OPENAI_GPT4O_OUTPUT_PER_1K) / 1000
         self.openai_cost_usd += cost
 
+    def add_openai_embedding_usage(self, tokens: int) -> None:
+        self.openai_prompt_tokens += tokens
+        self.openai_cost_usd += tokens * OPENAI_EMBEDDING_PER_1K / 1000
+
     def add_apify_cost(self, cost_usd: float) -> None:
         self.apify_cost_usd += cost_usd
 
+    def add_youtube_quota(self, units: int) -> None:
+        # Free within the daily quota, so tracked in units rather than dollars
+        self.youtube_quota_units += units
+
     def add_resend_email(self) -> None:
         self.resend_emails_sent += 1
         self.resend_cost_usd = self.resend_emails_sent * RESEND_COST_PER_EMAIL
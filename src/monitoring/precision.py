@@ -1,7 +1,7 @@
 import logging
 from datetime import date, timedelta
 
-from src.db import calculate_precision_for_date, upsert_digest_log, get_precision_stats
+from src.db import get_precision_by_date, update_precision_rates
 from src.delivery.emailer import send_alert_email
 
 logger = logging.getLogger(__name__)
@@ -10,20 +10,25 @@ LOW_PRECISION_THRESHOLD = 60.0  # percent
 ALERT_CONSECUTIVE_DAYS = 3
 
 
-def check_precision_alert():
-    """Check precision from recent days and send alert if consistently low."""
+def check_precision_alert(window_days: int = ALERT_CONSECUTIVE_DAYS):
+    """Check precision from recent days and send alert if consistently low.
+
+    Precision for the whole window comes from one aggregate query and is
+    stored with one upsert, so a wider window (e.g. 30 days) costs the same.
+    """
     today = date.today()
 
-    # Calculate and store precision for last few days
-    for days_ago in range(1, ALERT_CONSECUTIVE_DAYS + 1):
-        check_date = today - timedelta(days=days_ago)
-        precision = calculate_precision_for_date(check_date)
-        if precision is not None:
-            upsert_digest_log(check_date, status="completed", precision_rate=precision)
-            logger.info(f"Precision for {check_date}: {precision}%")
+    # Read and store precision for the last `window_days` days
+    rates = get_precision_by_date(today - timedelta(days=window_days), today - timedelta(days=1))
+    update_precision_rates(rates)
+    for check_date, precision in sorted(rates.items()):
+        logger.info(f"Precision for {check_date}: {precision}%")
 
-    # Check if last N days are all below threshold
-    stats = get_precision_stats(days=ALERT_CONSECUTIVE_DAYS)
+    # Check if the most recent N days with feedback are all below threshold
+    stats = [
+        {"digest_date": d.isoformat(), "precision_rate": rates[d]}
+        for d in sorted(rates, reverse=True)[:ALERT_CONSECUTIVE_DAYS]
+    ]
     if len(stats) < ALERT_CONSECUTIVE_DAYS:
         logger.info("Not enough data for precision alert check")
         return
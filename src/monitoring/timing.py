@@ -0,0 +1,159 @@
+import logging
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+# Set by configure_tracing() when OpenTelemetry export is enabled
+_tracer = None
+_tracer_provider = None
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+@dataclass
+class StageTiming:
+    """Accumulated time for one stage or external call; `calls` > 1 when it runs repeatedly."""
+    seconds: float = 0.0
+    calls: int = 0
+    items: int = 0
+    errors: int = 0
+    peak_rss_mb: float = 0.0
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "seconds": round(self.seconds, 3),
+            "calls": self.calls,
+            "items": self.items,
+            "items_per_second": round(self.items_per_second, 1),
+            "errors": self.errors,
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+        }
+
+
+class Span:
+    """Handle for an open span; set `items` before it closes to record throughput."""
+
+    def __init__(self, name: str, items: int = 0):
+        self.name = name
+        self.items = items
+
+
+class RunTimings:
+    """Wall time, item throughput and peak RSS per stage for one pipeline run.
+
+    Safe to record into from the ingestion and scoring worker threads.
+    Streaming stages overlap, so their durations do not add up to the run.
+    """
+
+    def __init__(self):
+        self.stages: dict[str, StageTiming] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, items: int = 0, error: bool = False) -> None:
+        rss = peak_rss_mb()
+        with self._lock:
+            stage = self.stages.setdefault(name, StageTiming())
+            stage.seconds += seconds
+            stage.calls += 1
+            stage.items += items
+            stage.errors += int(error)
+            stage.peak_rss_mb = max(stage.peak_rss_mb, rss)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {name: stage.to_dict() for name, stage in self.stages.items()}
+
+    def summary(self) -> str:
+        with self._lock:
+            parts = [
+                f"{name}={stage.seconds:.2f}s" + (f"/{stage.calls}" if stage.calls > 1 else "")
+                + (f" ({stage.items_per_second:.0f} items/s)" if stage.items else "")
+                for name, stage in self.stages.items()
+            ]
+        return f"Timings: {', '.join(parts) or 'none'} | peak RSS {peak_rss_mb():.0f} MB"
+
+
+_timings = RunTimings()
+
+
+def get_run_timings() -> RunTimings:
+    return _timings
+
+
+def reset_run_timings() -> RunTimings:
+    global _timings
+    _timings = RunTimings()
+    return _timings
+
+
+def record(name: str, seconds: float, items: int = 0, error: bool = False) -> None:
+    """Record a duration measured elsewhere (e.g. from an HTTP event hook)."""
+    _timings.record(name, seconds, items, error)
+
+
+@contextmanager
+def span(name: str, items: int = 0) -> Iterator[Span]:
+    """Time the enclosed block under `name` in the current run's timings.
+
+    Also opens an OpenTelemetry span of the same name when tracing is configured.
+    """
+    handle = Span(name, items)
+    otel = _tracer.start_as_current_span(name) if _tracer is not None else nullcontext()
+    with otel as otel_span:
+        start = time.perf_counter()
+        error = False
+        try:
+            yield handle
+        except BaseException:
+            error = True
+            raise
+        finally:
+            _timings.record(name, time.perf_counter() - start, handle.items, error)
+            if otel_span is not None:
+                otel_span.set_attribute("items", handle.items)
+
+
+def configure_tracing(enabled: bool, service_name: str = "learning-feed") -> bool:
+    """Export spans over OTLP (endpoint from OTEL_EXPORTER_OTLP_ENDPOINT) when enabled.
+
+    Needs the optional opentelemetry-sdk and opentelemetry-exporter-otlp-proto-http
+    packages; without them spans are only recorded locally.
+    """
+    global _tracer, _tracer_provider
+    if not enabled or _tracer is not None:
+        return _tracer is not None
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("OTEL_ENABLED is set but opentelemetry-sdk/exporter are not installed; timings are only logged")
+        return False
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    _tracer_provider = provider
+    _tracer = provider.get_tracer(__name__)
+    logger.info("Exporting pipeline spans over OTLP")
+    return True
+
+
+def flush_tracing() -> None:
+    if _tracer_provider is not None:
+        _tracer_provider.force_flush()
+
@@ -1,10 +1,12 @@
 import logging
 import sys
-from datetime import date
+import time
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Iterable
 
-from src.config import get_settings
+from src.config import Settings, get_settings
 from src.db import (
-    get_learning_context,
+    get_active_users,
     insert_digest_items,
     get_digest_items,
     mark_items_emailed,
@@ -12,15 +14,24 @@ from src.db import (
     calculate_precision_for_date,
     get_daily_cost,
     get_monthly_cost,
+    get_connection_stats,
+    get_feedback_labels,
+    reset_connection_stats,
 )
-from src.models import ContentItem, CostTracker
-from src.ingestion.newsletters import fetch_rss_items
-from src.ingestion.youtube import fetch_youtube_items
-from src.ingestion.twitter import fetch_twitter_items
-from src.scoring.scorer import score_items
-from src.digest.builder import build_digest
-from src.delivery.emailer import send_digest_email
+from src.models import ContentItem, CostTracker, LearningContext, ScoredItem
+from src.dedup.near_dup import dedup_stream
+from src.ingestion.feed_cache import get_feed_cache
+from src.ingestion.runner import stream_ingestion
+from src.ingestion.tweet_watermarks import get_tweet_watermarks
+from src.scoring.cache import get_score_cache
+from src.scoring.prefilter import prefilter_items, prefilter_stream
+from src.scoring.scorer import cluster_contexts, score_items
+from src.delivery.fanout import Recipient, deliver_digests
 from src.monitoring.precision import check_precision_alert
+from src.monitoring.timing import configure_tracing, flush_tracing, record, reset_run_timings, span
+
+if TYPE_CHECKING:
+    from src.scoring.vector_store import VectorStore
 
 logging.basicConfig(
     level=logging.INFO,
@@ -35,12 +46,17 @@ def run_pipeline():
     today = date.today()
     settings = get_settings()
     tracker = CostTracker()
+    reset_connection_stats()
+    timings = reset_run_timings()
+    configure_tracing(settings.otel_enabled)
+    run_start = time.perf_counter()
     logger.info(f"Starting daily pipeline for {today}")
     upsert_digest_log(today, status="running")
 
     try:
         # Budget check: monthly
-        monthly_cost = get_monthly_cost(today.year, today.month)
+        with span("budget"):
+            monthly_cost = get_monthly_cost(today.year, today.month)
         logger.info(f"Monthly cost so far: ${monthly_cost:.4f} / ${settings.monthly_budget_usd:.2f}")
         if monthly_cost >= settings.monthly_budget_usd:
             logger.warning(f"Monthly budget exceeded (${monthly_cost:.4f}/${settings.monthly_budget_usd:.2f}). Skipping pipeline.")
@@ -48,103 +64,153 @@ def run_pipeline():
             return
 
         # Budget check: daily
-        daily_cost = get_daily_cost(today)
+        with span("budget"):
+            daily_cost = get_daily_cost(today)
         logger.info(f"Daily cost so far: ${daily_cost:.4f} / ${settings.daily_budget_usd:.2f}")
 
-        # 1. Load learning context
-        context = get_learning_context()
-        logger.info(f"Loaded learning context: goals={context.goals[:80]}...")
-
-        # 2. Ingest from all sources (isolated errors)
-        all_items: list[ContentItem] = []
-
-        # Non-paid sources first
-        for name, fetcher in [
-            ("newsletters", fetch_rss_items),
-            ("youtube", fetch_youtube_items),
-        ]:
-            try:
-                items = fetcher()
-                logger.info(f"{name}: fetched {len(items)} items")
-                all_items.extend(items)
-            except Exception as e:
-                logger.error(f"{name} ingestion failed: {e}")
-
+        # 1. Load every user's learning context; users with identical or very
+        # similar contexts share one scoring pass
+        with span("contexts") as s:
+            users = get_active_users()
+            clusters = cluster_contexts([u.context for u in users], settings.user_cluster_min_similarity)
+            s.items = len(users)
+        logger.info(f"Loaded {len(users)} learning context(s) in {len(clusters)} scoring cluster(s)")
+
+        # Embeddings, scores and feedback labels of past items, kept across runs
+        store = embedder = None
+        if settings.vector_store_enabled:
+            # numpy and the embedding stack load only when the store is in use
+            from src.dedup.canonical import canonicalize_url
+            from src.dedup.history import history_dedup_stream
+            from src.scoring.embedding import get_embedder
+            from src.scoring.vector_store import get_vector_store
+
+            with span("vectors"):
+                store = get_vector_store()
+                embedder = get_embedder(settings.embedding_model, settings.openai_api_key)
+                since = today - timedelta(days=settings.vector_store_max_age_days)
+                labels = {canonicalize_url(url): response for url, response in get_feedback_labels(since).items()}
+                labelled = store.set_labels(labels)
+            logger.info(f"{store.stats()}; {labelled} feedback labels matched")
+
+        # 2. Ingest from all sources concurrently (isolated errors)
         # Twitter (Apify) — budget gated
-        if monthly_cost + 0.50 <= settings.monthly_budget_usd:
-            try:
-                items = fetch_twitter_items(tracker=tracker)
-                logger.info(f"twitter: fetched {len(items)} items")
-                all_items.extend(items)
-            except Exception as e:
-                logger.error(f"twitter ingestion failed: {e}")
-        else:
+        include_twitter = monthly_cost + 0.50 <= settings.monthly_budget_usd
+        if not include_twitter:
             logger.warning("Skipping Twitter ingestion to stay within monthly budget")
 
-        logger.info(f"Total ingested: {len(all_items)} items")
-
-        # 3. Deduplicate by URL
-        seen_urls = set()
-        unique_items: list[ContentItem] = []
-        for item in all_items:
-            if item.url not in seen_urls:
-                seen_urls.add(item.url)
-                unique_items.append(item)
-        logger.info(f"After dedup: {len(unique_items)} unique items")
-
-        # 4. Score with GPT-4o — budget gated
-        scored_items = []
-        if daily_cost + tracker.total_cost_usd < settings.daily_budget_usd:
-            scored_items = score_items(unique_items, context, tracker)
-            logger.info(f"Scored {len(scored_items)} items")
-        else:
-            logger.warning(f"Daily budget exceeded (${daily_cost + tracker.total_cost_usd:.4f}/${settings.daily_budget_usd:.2f}). Skipping scoring.")
-
-        # 5. Store in DB
-        if scored_items:
-            stored = insert_digest_items(scored_items, today)
-            logger.info(f"Stored {len(stored)} items in DB")
-
-        # 6. Build digest
-        db_items = get_digest_items(today)
-        html, included_ids = build_digest(db_items, today)
-
-        # 7. Send email
-        email_sent = send_digest_email(html, today, tracker)
-        if email_sent:
-            mark_items_emailed(included_ids)
-            logger.info(f"Digest sent with {len(included_ids)} items")
-        else:
-            logger.error("Failed to send digest email")
+        # 3. Items stream from ingestion through dedup (canonical URL and
+        # near-duplicate content) and the pre-filter into scoring, so GPT-4o
+        # batches start while slower sources are still being fetched.
+        # Ingestion and dedup run once; with several clusters the deduped
+        # items are kept so each cluster can filter and score them.
+        ingestion = stream_ingestion(include_twitter=include_twitter, tracker=tracker)
+        unique_items = dedup_stream(ingestion, settings.dedup_min_jaccard)
+        if store is not None and settings.vector_dedup_min_similarity <= 1.0:
+            unique_items = history_dedup_stream(unique_items, store, embedder, settings.vector_dedup_min_similarity, tracker=tracker)
+        if len(clusters) > 1:
+            unique_items = list(unique_items)
+
+        # 4. Pre-filter and score with GPT-4o per cluster — budget gated
+        cache = get_score_cache()
+        items_scored = 0
+        for cluster in clusters:
+            # 4a. Cheap local relevance pre-filter before paying for LLM scoring
+            prefiltered = _prefilter(unique_items, cluster.context, settings)
+            if daily_cost + tracker.total_cost_usd >= settings.daily_budget_usd:
+                logger.warning(f"Daily budget exceeded (${daily_cost + tracker.total_cost_usd:.4f}/${settings.daily_budget_usd:.2f}). Skipping scoring.")
+                for _ in prefiltered:
+                    pass
+                continue
+            # Consumes the ingestion stream, so this also waits on the slowest source
+            with span("score") as s:
+                scored_items = score_items(prefiltered, cluster.context, tracker, cache=cache)
+                s.items = len(scored_items)
+            items_scored += len(scored_items)
+            if store is not None and scored_items:
+                with span("vectors", items=len(scored_items)):
+                    scored_items = _remember(scored_items, store, embedder, tracker, settings)
+            logger.info(f"Scored {len(scored_items)} items for {len(cluster.members)} user(s)")
+            if scored_items:
+                from src.item_batch import ItemBatch
+                logger.info(f"Scored by source: {ItemBatch.from_items(scored_items).source_summary()}")
+
+            # 5. Store in DB, one copy per user
+            if scored_items:
+                for idx in cluster.members:
+                    with span("store", items=len(scored_items)):
+                        stored = insert_digest_items(scored_items, today, user_id=users[idx].user_id)
+                    logger.info(f"Stored {len(stored)} items in DB for user {users[idx].user_id}")
+
+        logger.info(ingestion.report.summary())
+        logger.info(f"Total ingested: {ingestion.report.total_items} items")
+        if settings.rss_feeds:
+            logger.info(get_feed_cache().stats())
+        if include_twitter and (settings.twitter_lists or settings.twitter_handle_list):
+            logger.info(get_tweet_watermarks().stats())
+
+        # 6. Build each user's digest and 7. send them in batches
+        with span("deliver") as s:
+            recipients = [Recipient(u.email, get_digest_items(today, user_id=u.user_id)) for u in users]
+            delivery = deliver_digests(recipients, today, tracker)
+            delivered = set(delivery.delivered)
+            items_emailed = 0
+            for digest in delivery.digests:
+                if digest.email in delivered:
+                    mark_items_emailed(digest.item_ids)
+                    items_emailed += len(digest.item_ids)
+            s.items = items_emailed
+        if delivery.failed:
+            logger.error(f"Failed to send digest email to {len(delivery.failed)} user(s)")
+        logger.info(f"Digests sent to {len(delivered)} user(s) with {items_emailed} items")
 
         # 8. Check precision from previous days
-        check_precision_alert()
-
-        # 9. Log completion with cost data
+        with span("precision"):
+            check_precision_alert()
+
+        # 9. Persist feed validators, tweet watermarks and scores only once this run's items are safely stored
+        with span("caches"):
+            get_feed_cache().save()
+            get_tweet_watermarks().save()
+            get_score_cache().save()
+            if store is not None:
+                store.save()
+
+        # 10. Log completion with cost data and stage timings
+        record("total", time.perf_counter() - run_start, ingestion.report.total_items)
         upsert_digest_log(
             today,
             status="completed",
-            items_ingested=len(all_items),
-            items_scored=len(scored_items),
-            items_emailed=len(included_ids) if email_sent else 0,
+            items_ingested=ingestion.report.total_items,
+            items_scored=items_scored,
+            items_emailed=items_emailed,
             cost_openai_usd=tracker.openai_cost_usd,
             cost_apify_usd=tracker.apify_cost_usd,
             cost_resend_usd=tracker.resend_cost_usd,
             cost_total_usd=tracker.total_cost_usd,
             openai_tokens_used=tracker.openai_total_tokens,
+            youtube_quota_units=tracker.youtube_quota_units,
+            stage_timings=timings.to_dict(),
         )
 
-        # 10. Log cost summary
+        # 11. Log cost and timing summary
         new_monthly = monthly_cost + tracker.total_cost_usd
         logger.info(
             f"Cost: OpenAI=${tracker.openai_cost_usd:.4f} ({tracker.openai_total_tokens} tokens), "
-            f"Apify=${tracker.apify_cost_usd:.4f}, Resend=${tracker.resend_cost_usd:.4f} | "
+            f"Apify=${tracker.apify_cost_usd:.4f}, Resend=${tracker.resend_cost_usd:.4f}, "
+            f"YouTube={tracker.youtube_quota_units} quota units | "
             f"Total=${tracker.total_cost_usd:.4f} | Monthly=${new_monthly:.4f}/${settings.monthly_budget_usd:.2f}"
         )
+        logger.info(get_connection_stats().summary())
+        logger.info(timings.summary())
         logger.info("Pipeline completed successfully")
 
     except Exception as e:
         logger.exception(f"Pipeline failed: {e}")
+        # The caches outlive the run in the API process; forget what this run staged
+        get_feed_cache().discard()
+        get_tweet_watermarks().discard()
+        record("total", time.perf_counter() - run_start, error=True)
         upsert_digest_log(
             today,
             status="failed",
@@ -154,8 +220,33 @@ def run_pipeline():
             cost_resend_usd=tracker.resend_cost_usd,
             cost_total_usd=tracker.total_cost_usd,
             openai_tokens_used=tracker.openai_total_tokens,
+            youtube_quota_units=tracker.youtube_quota_units,
+            stage_timings=timings.to_dict(),
         )
         raise
+    finally:
+        flush_tracing()
+
+
+def _remember(items: list[ScoredItem], store: "VectorStore", embedder, tracker: CostTracker, settings: Settings) -> list[ScoredItem]:
+    """Store this run's scores with the items' embeddings and apply feedback re-ranking."""
+    from src.scoring.embedding import embed_items
+    from src.scoring.rerank import rerank_by_feedback
+    from src.scoring.vector_store import item_keys
+
+    keys = item_keys(items)
+    vectors = embed_items(embedder, items, tracker, store, keys)
+    store.set_scores(keys, [item.score for item in items])
+    if settings.vector_rerank_weight:
+        items = rerank_by_feedback(items, vectors, store, settings.vector_rerank_weight)
+    return items
+
+
+def _prefilter(items: Iterable[ContentItem], context: LearningContext, settings: Settings) -> Iterable[ContentItem]:
+    if settings.prefilter_top_k > 0:
+        # A top-k cut needs the whole run, so this path waits for ingestion
+        return prefilter_items(list(items), context, settings.prefilter_min_relevance, settings.prefilter_top_k).kept
+    return prefilter_stream(items, context, settings.prefilter_min_relevance)
 
 
 if __name__ == "__main__":
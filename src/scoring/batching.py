@@ -0,0 +1,76 @@
+import threading
+from dataclasses import dataclass
+
+DEFAULT_CHARS_PER_TOKEN = 4.0
+DEFAULT_COMPLETION_TOKENS_PER_ITEM = 60.0
+EMA_WEIGHT = 0.3
+
+
+class TokenEstimator:
+    """Character-based token estimate calibrated against observed API usage.
+
+    Starts from ~4 chars/token and ~60 completion tokens per item, then tracks
+    the real ratios as an exponential moving average of each response's usage.
+    """
+
+    def __init__(self, chars_per_token: float = DEFAULT_CHARS_PER_TOKEN, completion_tokens_per_item: float = DEFAULT_COMPLETION_TOKENS_PER_ITEM):
+        self.chars_per_token = chars_per_token
+        self.completion_tokens_per_item = completion_tokens_per_item
+        self._lock = threading.Lock()
+
+    def prompt_tokens(self, chars: int) -> int:
+        return int(chars / self.chars_per_token) + 1
+
+    def completion_tokens(self, n_items: int) -> int:
+        return int(self.completion_tokens_per_item * n_items)
+
+    def observe(self, prompt_chars: int, prompt_tokens: int, completion_tokens: int, n_items: int) -> None:
+        if not prompt_tokens or not n_items:
+            return
+        with self._lock:
+            self.chars_per_token += EMA_WEIGHT * (prompt_chars / prompt_tokens - self.chars_per_token)
+            self.completion_tokens_per_item += EMA_WEIGHT * (completion_tokens / n_items - self.completion_tokens_per_item)
+
+
+@dataclass
+class BatchStats:
+    items: int
+    prompt_tokens: int
+    completion_tokens: int
+    seconds: float
+
+    @property
+    def tokens_per_item(self) -> float:
+        return (self.prompt_tokens + self.completion_tokens) / self.items if self.items else 0.0
+
+    @property
+    def seconds_per_item(self) -> float:
+        return self.seconds / self.items if self.items else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.items} items, {self.prompt_tokens} prompt + {self.completion_tokens} completion tokens "
+            f"({self.tokens_per_item:.0f} tok/item), {self.seconds:.2f}s ({self.seconds_per_item:.2f} s/item)"
+        )
+
+
+def take_batch(item_chars: list[int], start: int, base_chars: int, estimator: TokenEstimator, prompt_budget: int, completion_budget: int, max_items: int) -> int:
+    """Return the end index of the next batch starting at `start`.
+
+    Items are added while the estimated prompt stays within `prompt_budget`
+    and the expected completion within `completion_budget`. A batch always
+    holds at least one item, however large.
+    """
+    end = start
+    chars = base_chars
+    while end < len(item_chars) and end - start < max_items:
+        chars += item_chars[end]
+        n = end - start + 1
+        over_budget = (
+            estimator.prompt_tokens(chars) > prompt_budget
+            or estimator.completion_tokens(n) > completion_budget
+        )
+        if over_budget and end > start:
+            break
+        end += 1
+    return end
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+
+from src.config import get_settings
+from src.models import ContentItem, LearningContext
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def context_fingerprint(context: LearningContext) -> str:
+    """Stable short hash of everything in the learning context the scorer sees."""
+    payload = json.dumps(context.model_dump(), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def content_key(item: ContentItem, fingerprint: str) -> str:
+    """Hash of the normalized title + snippet, scoped to a learning context.
+
+    The URL is deliberately left out so cross-posted copies of the same text
+    share a cache entry.
+    """
+    text = f"{item.title}\n{item.content_snippet}".lower()
+    text = _WHITESPACE.sub(" ", text).strip()
+    return hashlib.sha256(f"{fingerprint}\0{text}".encode()).hexdigest()
+
+
+class ScoreCache:
+    """Persistent LRU + TTL cache of (score, justification) per item and context."""
+
+    def __init__(self, path: Path, max_entries: int = 20000, ttl_days: float = 14):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_days * 86400
+        self.hits = 0
+        self.misses = 0
+        # key -> {"score": float, "justification": str, "ts": epoch}; keys include the context fingerprint
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            rows = json.loads(self.path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable score cache {self.path}: {e}")
+            return
+        now = time.time()
+        # Rows are stored least recently used first
+        for key, entry in rows:
+            if now - entry["ts"] < self.ttl_seconds:
+                self._entries[key] = entry
+        self._evict()
+
+    def save(self) -> None:
+        with self._lock:
+            data = json.dumps(list(self._entries.items()))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(data)
+        tmp.replace(self.path)
+
+    def get(self, key: str) -> tuple[float, str] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry["ts"] >= self.ttl_seconds:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["score"], entry["justification"]
+
+    def put(self, key: str, score: float, justification: str) -> None:
+        with self._lock:
+            self._entries[key] = {"score": score, "justification": justification, "ts": time.time()}
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"score cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate), {len(self._entries)} entries"
+
+
+@lru_cache
+def get_score_cache() -> ScoreCache:
+    s = get_settings()
+    return ScoreCache(
+        Path(s.cache_dir) / "scores.json",
+        max_entries=s.score_cache_max_entries,
+        ttl_days=s.score_cache_ttl_days,
+    )
@@ -0,0 +1,212 @@
+import json
+import logging
+import zlib
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+import numpy as np
+
+from src.models import ContentItem, CostTracker, LearningContext, ScoredItem
+from src.monitoring.timing import span
+from src.scoring.prefilter import tokenize
+from src.scoring.vector_store import VectorStore, item_keys
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+logger = logging.getLogger(__name__)
+
+LOCAL_MODEL = "local"
+# Inputs per embeddings request (the API accepts up to 2048)
+OPENAI_EMBEDDING_BATCH = 1024
+
+
+class HashingEmbedder:
+    """Offline embedder: signed feature hashing of word unigrams and bigrams.
+
+    Lexical rather than semantic, but needs no model download or network, so
+    the embedding engine can run (and be tested) anywhere.
+    """
+
+    name = LOCAL_MODEL
+    # Cosine range mapped onto 0-10; hashed bag-of-words vectors rarely exceed ~0.3
+    score_floor = 0.02
+    score_ceiling = 0.30
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+
+    def embed(self, texts: list[str], tracker: CostTracker | None = None) -> np.ndarray:
+        rows, cols, signs = [], [], []
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                h = zlib.crc32(feature.encode())
+                rows.append(row)
+                cols.append(h % self.dim)
+                signs.append(1.0 if h & 0x80000000 else -1.0)
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(vectors, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), np.array(signs, dtype=np.float32))
+        return _normalize(vectors)
+
+
+class OpenAIEmbedder:
+    """OpenAI embeddings (e.g. text-embedding-3-small), requested in large batches."""
+
+    score_floor = 0.10
+    score_ceiling = 0.50
+
+    def __init__(self, client: "OpenAI", model: str):
+        self.client = client
+        self.name = model
+
+    def embed(self, texts: list[str], tracker: CostTracker | None = None) -> np.ndarray:
+        vectors = []
+        for start in range(0, len(texts), OPENAI_EMBEDDING_BATCH):
+            batch = texts[start:start + OPENAI_EMBEDDING_BATCH]
+            with span("openai.embeddings", items=len(batch)):
+                response = self.client.embeddings.create(model=self.name, input=batch)
+            if tracker and response.usage:
+                tracker.add_openai_embedding_usage(response.usage.total_tokens)
+            vectors.extend(d.embedding for d in sorted(response.data, key=lambda d: d.index))
+        return _normalize(np.array(vectors, dtype=np.float32).reshape(len(texts), -1))
+
+
+def get_embedder(model: str, api_key: str = ""):
+    if model == LOCAL_MODEL:
+        return HashingEmbedder()
+    from openai import OpenAI
+    return OpenAIEmbedder(OpenAI(api_key=api_key), model)
+
+
+def embed_items(embedder, items: list[ContentItem], tracker: CostTracker | None = None, store: VectorStore | None = None, keys: list[str] | None = None) -> np.ndarray:
+    """Embed items, reusing vectors the store already holds for their keys and storing the rest.
+
+    `keys` are the items' store keys (`item_keys(items)` unless given).
+    """
+    if store is not None and keys is None:
+        keys = item_keys(items)
+    if store is None or store.dim is None:
+        vectors = embedder.embed([item_text(item) for item in items], tracker)
+    else:
+        vectors, found = store.get(keys)
+        missing = np.flatnonzero(~found)
+        if len(missing):
+            vectors[missing] = embedder.embed([item_text(items[i]) for i in missing], tracker)
+    if store is not None:
+        store.add(keys, vectors)
+    return vectors
+
+
+class EmbeddingScoringEngine:
+    """Scores items by cosine similarity between item and learning-context embeddings.
+
+    The context is embedded once per pass; items are embedded in batches of
+    `batch_size` as they stream in. Similarity is mapped linearly from the
+    embedder's [score_floor, score_ceiling] cosine range onto 0-10. GPT-4o is
+    only asked to justify the `justify_top_n` best items. With a vector
+    store, items embedded in earlier runs are not embedded again.
+    """
+
+    def __init__(self, embedder, batch_size: int = 512, justify_top_n: int = 10, openai_api_key: str = "", store: VectorStore | None = None):
+        self.embedder = embedder
+        self.store = store
+        self.name = f"embedding:{embedder.name}"
+        self.batch_size = batch_size
+        self.justify_top_n = justify_top_n
+        self.openai_api_key = openai_api_key
+
+    def score(self, items: Iterable[ContentItem], context: LearningContext, tracker: CostTracker | None = None) -> list[ScoredItem]:
+        context_vector = self.embedder.embed([context_text(context)], tracker)[0]
+        received: list[ContentItem] = []
+        similarities: list[np.ndarray] = []
+        for batch in chunked(items, self.batch_size):
+            received.extend(batch)
+            with span("embed", items=len(batch)):
+                vectors = embed_items(self.embedder, batch, tracker, self.store)
+            similarities.append(vectors @ context_vector)
+        if not received:
+            return []
+
+        sims = np.concatenate(similarities)
+        scores = self.calibrate(sims)
+        justifications = [f"Embedding similarity {sim:.2f}" for sim in sims]
+        if self.justify_top_n > 0 and self.openai_api_key:
+            top = np.argsort(-scores, kind="stable")[:self.justify_top_n]
+            for idx, text in zip(top, self._justify([received[i] for i in top], context, tracker)):
+                if text:
+                    justifications[idx] = text
+
+        logger.info(f"Embedding-scored {len(received)} items with {self.embedder.name} (mean similarity {sims.mean():.3f})")
+        return [
+            ScoredItem.from_item(item, score, justification)
+            for item, score, justification in zip(received, scores.tolist(), justifications)
+        ]
+
+    def calibrate(self, similarities: np.ndarray) -> np.ndarray:
+        floor, ceiling = self.embedder.score_floor, self.embedder.score_ceiling
+        return np.round(np.clip((similarities - floor) / (ceiling - floor), 0.0, 1.0) * 10, 1)
+
+    def _justify(self, items: list[ContentItem], context: LearningContext, tracker: CostTracker | None) -> list[str]:
+        """One GPT-4o call for a sentence per item on why it fits the context; empty strings on failure."""
+        from openai import OpenAI
+
+        client = OpenAI(api_key=self.openai_api_key)
+        listing = "\n".join(
+            f"### Item {i + 1}\n- **Title**: {item.title}\n- **Snippet**: {item.content_snippet[:300]}\n"
+            for i, item in enumerate(items)
+        )
+        try:
+            with span("openai", items=len(items)):
+                response = client.chat.completions.create(
+                    model="gpt-4o",
+                    messages=[
+                        {"role": "system", "content": (
+                            "You explain why content matches a learner's goals.\n"
+                            f"Goals: {context.goals or 'Not specified'}\n"
+                            f"Current project: {context.project_context or 'None'}\n"
+                            'Return a JSON object with a "justifications" array holding one 1-2 sentence '
+                            "explanation per input item, in the same order."
+                        )},
+                        {"role": "user", "content": listing},
+                    ],
+                    response_format={"type": "json_object"},
+                    temperature=0.3,
+                )
+            if tracker and response.usage:
+                tracker.add_openai_usage(response.usage.prompt_tokens, response.usage.completion_tokens)
+            parsed = json.loads(response.choices[0].message.content)
+            texts = parsed.get("justifications") if isinstance(parsed, dict) else None
+            if not isinstance(texts, list):
+                raise ValueError("response has no justifications array")
+        except Exception as e:
+            logger.error(f"Justifying top {len(items)} embedding-scored items failed: {e}")
+            return [""] * len(items)
+        # Anything that is not a sentence keeps its similarity text
+        texts = [t if isinstance(t, str) else "" for t in texts[:len(items)]]
+        return texts + [""] * (len(items) - len(texts))
+
+
+def context_text(context: LearningContext) -> str:
+    """What the user wants, as one document: goals, skill names and current project."""
+    return " ".join([context.goals, " ".join(context.skill_levels), context.project_context])
+
+
+def item_text(item: ContentItem) -> str:
+    return f"{item.title}\n{item.content_snippet}"
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def chunked(items: Iterable[ContentItem], size: int) -> Iterator[list[ContentItem]]:
+    batch: list[ContentItem] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
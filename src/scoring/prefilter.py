@@ -0,0 +1,159 @@
+import logging
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+
+from src.models import ContentItem, LearningContext
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]")
+STOPWORDS = frozenset("""
+a about after all also an and any are as at be been but by can do for from has have how i if in into
+is it its just like more most my new no not of on or our out so than that the their them there these
+this to up us was we what when which who why will with you your per via over under vs
+""".split())
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+def context_terms(context: LearningContext) -> list[str]:
+    """Terms describing what the user wants: goals, skill names and current project."""
+    return tokenize(" ".join([context.goals, " ".join(context.skill_levels), context.project_context]))
+
+
+def context_similarity(a: LearningContext, b: LearningContext) -> float:
+    """Cosine similarity of two contexts' term counts, in [0, 1]."""
+    ta, tb = Counter(context_terms(a)), Counter(context_terms(b))
+    if not ta or not tb:
+        return float(ta == tb)
+    dot = sum(c * tb[t] for t, c in ta.items())
+    return dot / (math.sqrt(sum(c * c for c in ta.values())) * math.sqrt(sum(c * c for c in tb.values())))
+
+
+def item_terms(item: ContentItem) -> list[str]:
+    return tokenize(f"{item.title} {item.content_snippet}")
+
+
+def relevance_scores(docs: list[list[str]], profile: list[str]) -> list[float]:
+    """TF-IDF cosine similarity of each document against the profile, in [0, 1].
+
+    IDF is computed over this run's documents, so terms every item shares
+    (e.g. "ai" on an AI-heavy day) count for less than distinctive ones.
+    """
+    if not profile:
+        return [1.0] * len(docs)
+    n = len(docs) + 1
+    df = Counter(t for doc in docs for t in set(doc))
+    df.update(set(profile))
+    idf = {t: math.log(n / df[t]) + 1.0 for t in df}
+
+    profile_counts = Counter(profile)
+    return [_cosine(Counter(doc), profile_counts, idf) for doc in docs]
+
+
+def _cosine(doc_counts: Counter, profile_counts: Counter, idf: dict[str, float]) -> float:
+    if not doc_counts:
+        return 0.0
+    profile_vec = {t: c * idf[t] for t, c in profile_counts.items()}
+    vec = {t: c * idf[t] for t, c in doc_counts.items()}
+    dot = sum(w * profile_vec[t] for t, w in vec.items() if t in profile_vec)
+    norm = math.sqrt(sum(w * w for w in vec.values()))
+    profile_norm = math.sqrt(sum(w * w for w in profile_vec.values()))
+    return dot / (norm * profile_norm)
+
+
+class RunningRelevance:
+    """TF-IDF relevance for items scored one at a time.
+
+    IDF comes from the documents seen so far rather than the whole run, so
+    the first few items of a run are ranked on a rougher estimate.
+    """
+
+    def __init__(self, profile: list[str]):
+        self.profile = Counter(profile)
+        self.df = Counter(set(profile))
+        self.n = 1
+
+    def score(self, doc: list[str]) -> float:
+        if not self.profile:
+            return 1.0
+        doc_counts = Counter(doc)
+        self.n += 1
+        self.df.update(doc_counts.keys())
+        terms = doc_counts.keys() | self.profile.keys()
+        idf = {t: math.log(self.n / self.df[t]) + 1.0 for t in terms}
+        return _cosine(doc_counts, self.profile, idf)
+
+
+@dataclass
+class PrefilterResult:
+    kept: list[ContentItem] = field(default_factory=list)
+    dropped: list[ContentItem] = field(default_factory=list)
+    relevance: list[float] = field(default_factory=list)
+
+
+def select(relevance: list[float], min_relevance: float, top_k: int) -> list[bool]:
+    """Keep mask: at or above min_relevance and, if top_k > 0, among the top_k."""
+    keep = [r >= min_relevance for r in relevance]
+    if top_k > 0 and sum(keep) > top_k:
+        ranked = sorted((i for i, k in enumerate(keep) if k), key=lambda i: relevance[i], reverse=True)
+        allowed = set(ranked[:top_k])
+        keep = [i in allowed for i in range(len(relevance))]
+    return keep
+
+
+def prefilter_items(items: list[ContentItem], context: LearningContext, min_relevance: float = 0.0, top_k: int = 0) -> PrefilterResult:
+    """Drop items that local keyword relevance says cannot be worth an LLM call.
+
+    Kept items stay in their original order.
+    """
+    relevance = relevance_scores([item_terms(i) for i in items], context_terms(context))
+    keep = select(relevance, min_relevance, top_k)
+    result = PrefilterResult(relevance=relevance)
+    for item, k in zip(items, keep):
+        (result.kept if k else result.dropped).append(item)
+    logger.info(f"Pre-filter kept {len(result.kept)}/{len(items)} items (removed {len(result.dropped)})")
+    return result
+
+
+def prefilter_stream(items: Iterable[ContentItem], context: LearningContext, min_relevance: float = 0.0) -> Iterator[ContentItem]:
+    """Streaming `prefilter_items` without top_k, which needs the whole run."""
+    relevance = RunningRelevance(context_terms(context))
+    seen = kept = 0
+    for item in items:
+        seen += 1
+        if relevance.score(item_terms(item)) >= min_relevance:
+            kept += 1
+            yield item
+    logger.info(f"Pre-filter kept {kept}/{seen} items (removed {seen - kept})")
+
+
+def prefilter_recall(rows: list[dict], context: LearningContext, min_relevance: float, top_k: int, min_score: float) -> tuple[float | None, float]:
+    """Evaluate the pre-filter against historical LLM scores.
+
+    `rows` are digest_items rows. Each digest date is filtered as its own run.
+    Returns (recall of items the LLM scored >= min_score, fraction of all
+    items removed). Recall is None when history has no relevant items.
+    """
+    profile = context_terms(context)
+    by_date: dict[str, list[dict]] = {}
+    for row in rows:
+        by_date.setdefault(row["digest_date"], []).append(row)
+
+    relevant = kept_relevant = removed = 0
+    for day_rows in by_date.values():
+        docs = [tokenize(f"{r.get('title', '')} {r.get('content_snippet', '')}") for r in day_rows]
+        keep = select(relevance_scores(docs, profile), min_relevance, top_k)
+        for row, k in zip(day_rows, keep):
+            removed += not k
+            if float(row.get("score", 0)) >= min_score:
+                relevant += 1
+                kept_relevant += k
+
+    recall = kept_relevant / relevant if relevant else None
+    return recall, removed / len(rows) if rows else 0.0
@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import deque
+
+MIN_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+
+
+class TokenRateLimiter:
+    """Shared tokens-per-minute budget and 429 backoff for concurrent API calls.
+
+    Workers reserve their estimated tokens before each request. Any 429 pauses
+    every worker, and the pause doubles for consecutive 429s until a request
+    succeeds again.
+    """
+
+    def __init__(self, tokens_per_minute: int, window_seconds: float = 60.0):
+        self.tokens_per_minute = tokens_per_minute
+        self.window_seconds = window_seconds
+        self.rate_limited = 0
+        self._window: deque[tuple[float, int]] = deque()
+        self._used = 0
+        self._paused_until = 0.0
+        self._backoff = MIN_BACKOFF_SECONDS
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int) -> None:
+        """Block until `tokens` fit in the current window and no backoff is active."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._expire(now)
+                wait = self._paused_until - now
+                if wait <= 0:
+                    # An oversized request still goes through once the window is empty
+                    if self._used + tokens <= self.tokens_per_minute or not self._window:
+                        self._window.append((now, tokens))
+                        self._used += tokens
+                        return
+                    wait = self._window[0][0] + self.window_seconds - now
+            time.sleep(max(wait, 0.01))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._backoff = MIN_BACKOFF_SECONDS
+
+    def record_rate_limit(self, retry_after: float | None = None) -> float:
+        """Pause all workers after a 429 and return the pause length in seconds."""
+        with self._lock:
+            self.rate_limited += 1
+            delay = retry_after if retry_after else self._backoff
+            self._backoff = min(self._backoff * 2, MAX_BACKOFF_SECONDS)
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            return delay
+
+    def _expire(self, now: float) -> None:
+        while self._window and now - self._window[0][0] >= self.window_seconds:
+            _, tokens = self._window.popleft()
+            self._used -= tokens
@@ -0,0 +1,28 @@
+import logging
+from dataclasses import replace
+
+import numpy as np
+
+from src.models import ScoredItem
+from src.scoring.vector_store import NOT_USEFUL, USEFUL, VectorStore
+
+logger = logging.getLogger(__name__)
+
+
+def rerank_by_feedback(items: list[ScoredItem], vectors: np.ndarray, store: VectorStore, weight: float) -> list[ScoredItem]:
+    """Nudge scores toward items like those marked useful and away from those marked not useful.
+
+    Each score moves by `weight` x (best similarity to a useful item - best
+    similarity to a not-useful item), clipped to 0-10. Without feedback in
+    the store, scores are unchanged.
+    """
+    useful, _ = store.nearest(vectors, label=USEFUL)
+    not_useful, _ = store.nearest(vectors, label=NOT_USEFUL)
+    adjustments = weight * (useful - not_useful)
+    if not adjustments.any():
+        return items
+    logger.info(f"Feedback re-rank: mean adjustment {adjustments.mean():+.2f}, max {np.abs(adjustments).max():.2f}")
+    return [
+        replace(item, score=round(float(np.clip(item.score + adjustment, 0.0, 10.0)), 1))
+        for item, adjustment in zip(items, adjustments)
+    ]
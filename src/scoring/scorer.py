@@ -1,93 +1,366 @@
+import itertools
 import json
 import logging
-
-from openai import OpenAI
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterable, Iterator, Protocol
 
 from src.config import get_settings
 from src.models import ContentItem, ScoredItem, LearningContext, CostTracker
+from src.monitoring.timing import span
+from src.scoring.batching import BatchStats, TokenEstimator, take_batch
+from src.scoring.cache import ScoreCache, content_key, context_fingerprint
+from src.scoring.prefilter import context_similarity
+from src.scoring.rate_limit import TokenRateLimiter
+
+if TYPE_CHECKING:
+    # The SDK is imported when scoring starts, not when the pipeline is imported
+    from openai import OpenAI, RateLimitError
 
 logger = logging.getLogger(__name__)
 
-BATCH_SIZE = 12
+SCORING_FAILED = "Scoring failed"
+NO_SCORE_RETURNED = "No score returned"
+
+# CostTracker is shared by the scoring workers
+_tracker_lock = threading.Lock()
+
+
+class MalformedResponse(ValueError):
+    """GPT-4o answered, but not with the scores array the prompt asks for."""
+
+
+class ScoringEngine(Protocol):
+    """Turns a stream of items into scored items, in input order, for one learning context."""
+    name: str
+
+    def score(self, items: Iterable[ContentItem], context: LearningContext, tracker: CostTracker | None = None) -> list[ScoredItem]: ...
+
+
+class LLMScoringEngine:
+    """GPT-4o scores and justifies every item."""
+    name = "llm"
+
+    def score(self, items: Iterable[ContentItem], context: LearningContext, tracker: CostTracker | None = None) -> list[ScoredItem]:
+        from openai import OpenAI
+
+        # Retries are handled here so 429s back off across all workers at once
+        client = OpenAI(api_key=get_settings().openai_api_key, max_retries=0)
+        return _score_pending(client, items, context, tracker)
+
+
+def get_scoring_engine(name: str | None = None) -> ScoringEngine:
+    """The engine named by SCORING_ENGINE (or `name`): "llm" or "embedding"."""
+    s = get_settings()
+    name = name or s.scoring_engine
+    if name == "llm":
+        return LLMScoringEngine()
+    if name == "embedding":
+        from src.scoring.embedding import EmbeddingScoringEngine, get_embedder
+        from src.scoring.vector_store import get_vector_store
+        return EmbeddingScoringEngine(
+            get_embedder(s.embedding_model, s.openai_api_key),
+            batch_size=s.embedding_batch_size,
+            justify_top_n=s.embedding_justify_top_n,
+            openai_api_key=s.openai_api_key,
+            store=get_vector_store() if s.vector_store_enabled else None,
+        )
+    raise ValueError(f"Unknown scoring engine: {name}")
+
 
+def score_items(items: Iterable[ContentItem], context: LearningContext, tracker: CostTracker | None = None, cache: ScoreCache | None = None, engine: ScoringEngine | None = None) -> list[ScoredItem]:
+    """Score content items against the learning context (GPT-4o unless another engine is configured).
 
-def score_items(items: list[ContentItem], context: LearningContext, tracker: CostTracker | None = None) -> list[ScoredItem]:
-    """Score content items against the learning context using GPT-4o."""
-    if not items:
+    `items` may be a generator: batches are sent as soon as enough new items
+    have arrived to fill one, so scoring overlaps with upstream stages.
+
+    With a cache, items whose normalized content was already scored against
+    the same context reuse that result, and identical items within this run
+    are only sent once. Cached scores are kept apart per engine.
+    """
+    engine = engine or get_scoring_engine()
+    fingerprint = context_fingerprint(context)
+    # LLM entries keep the original key so existing caches stay valid
+    key_scope = fingerprint if engine.name == "llm" else f"{fingerprint}:{engine.name}"
+    keyed: list[tuple[ContentItem, str]] = []
+    results: dict[str, tuple[float, str]] = {}
+    pending_keys: list[str] = []
+    queued: set[str] = set()
+
+    def uncached() -> Iterator[ContentItem]:
+        for item in items:
+            key = content_key(item, key_scope)
+            keyed.append((item, key))
+            if key in results or key in queued:
+                continue
+            cached = cache.get(key) if cache else None
+            if cached is not None:
+                results[key] = cached
+            else:
+                pending_keys.append(key)
+                queued.add(key)
+                yield item
+
+    pending = uncached()
+    first = next(pending, None)
+    if first is not None:
+        scored_pending = engine.score(itertools.chain([first], pending), context, tracker)
+        for scored_item, key in zip(scored_pending, pending_keys):
+            results[key] = (scored_item.score, scored_item.justification)
+            if cache and scored_item.justification not in (SCORING_FAILED, NO_SCORE_RETURNED):
+                cache.put(key, scored_item.score, scored_item.justification)
+
+    if not keyed:
         return []
+    if cache:
+        logger.info(f"Scored {len(pending_keys)} new items ({len(keyed) - len(pending_keys)} served from cache or duplicates)")
+
+    scored = [ScoredItem.from_item(item, *results[key]) for item, key in keyed]
+
+    if cache:
+        logger.info(cache.stats())
+    logger.info(f"Scored {len(scored)} items total")
+    return scored
 
-    client = OpenAI(api_key=get_settings().openai_api_key)
-    scored: list[ScoredItem] = []
 
-    # Process in batches
-    for i in range(0, len(items), BATCH_SIZE):
-        batch = items[i:i + BATCH_SIZE]
+@dataclass
+class ContextCluster:
+    """Learning contexts scored together in one pass, against the first member's context."""
+    context: LearningContext
+    members: list[int] = field(default_factory=list)
+
+
+def cluster_contexts(contexts: list[LearningContext], min_similarity: float = 0.9) -> list[ContextCluster]:
+    """Group users' contexts so each group needs only one scoring pass.
+
+    `members` are indices into `contexts`. Identical contexts always share a
+    cluster. Any other context joins the first cluster whose representative
+    has the same skill levels, learning style, depth and time availability
+    (everything the scoring prompt renders besides free text) and a
+    goal/skill/project term similarity of at least `min_similarity`, and is
+    scored as that representative; above 1.0 only identical contexts are
+    merged.
+    """
+    clusters: list[ContextCluster] = []
+    by_fingerprint: dict[str, ContextCluster] = {}
+    for idx, context in enumerate(contexts):
+        fp = context_fingerprint(context)
+        cluster = by_fingerprint.get(fp)
+        if cluster is None:
+            profile = _prompt_profile(context)
+            cluster = next(
+                (c for c in clusters
+                 if _prompt_profile(c.context) == profile and context_similarity(c.context, context) >= min_similarity),
+                None,
+            )
+        if cluster is None:
+            cluster = ContextCluster(context)
+            clusters.append(cluster)
+        by_fingerprint.setdefault(fp, cluster)
+        cluster.members.append(idx)
+    return clusters
+
+
+def _prompt_profile(context: LearningContext) -> tuple:
+    """The structured fields `_build_system_prompt` renders, as they are rendered."""
+    methodology = context.methodology or {}
+    return (
+        sorted(context.skill_levels.items()),
+        methodology.get("style", "practical"),
+        methodology.get("depth", "intermediate"),
+        context.time_availability,
+    )
+
+
+class _ScoringRun:
+    """Shared state for one concurrent scoring pass: client, limits and token calibration."""
+
+    def __init__(self, client: "OpenAI", context: LearningContext, tracker: CostTracker | None):
+        s = get_settings()
+        self.client = client
+        self.context = context
+        self.tracker = tracker
+        self.max_retries = s.scoring_max_retries
+        self.limiter = TokenRateLimiter(s.openai_tpm_limit)
+        self.estimator = TokenEstimator()
+        self.stats: list[BatchStats] = []
+        self.base_chars = len(_build_system_prompt(context)) + len(_build_user_prompt([]))
+
+    def score(self, items: list[ContentItem]) -> list[ScoredItem]:
+        """Score a batch, retrying one item per call for anything the batch lost.
+
+        Only a malformed or short response is split into single-item calls;
+        API errors (auth, bad request, or 429s and outages that outlasted
+        their retries) would fail those calls too, so they fail the batch.
+        """
         try:
-            batch_scored = _score_batch(client, batch, context, tracker)
-            scored.extend(batch_scored)
+            scored = self._score_with_retry(items)
+        except ValueError as e:
+            if len(items) == 1:
+                logger.error(f"Error scoring item {items[0].url}: {e}")
+                return [_failed_item(items[0])]
+            logger.error(f"Malformed response for batch of {len(items)} items, retrying individually: {e}")
+            scored = [None] * len(items)
         except Exception as e:
-            logger.error(f"Error scoring batch {i // BATCH_SIZE + 1}: {e}")
-            # On failure, assign default score of 0 so items aren't lost
-            for item in batch:
-                scored.append(ScoredItem(
-                    source=item.source,
-                    title=item.title,
-                    url=item.url,
-                    author=item.author,
-                    content_snippet=item.content_snippet,
-                    score=0.0,
-                    justification="Scoring failed",
-                ))
+            logger.error(f"Error scoring batch of {len(items)} items: {e}")
+            return [_failed_item(item) for item in items]
 
-    logger.info(f"Scored {len(scored)} items total")
-    return scored
+        if len(items) > 1:
+            for idx, item in enumerate(items):
+                if scored[idx] is None or scored[idx].justification == NO_SCORE_RETURNED:
+                    scored[idx] = self.score([item])[0]
+        return scored
+
+    def _score_with_retry(self, items: list[ContentItem]) -> list[ScoredItem]:
+        from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+        prompt_chars = self.base_chars + sum(_item_chars(item) for item in items)
+        estimate = self.estimator.prompt_tokens(prompt_chars) + self.estimator.completion_tokens(len(items))
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(estimate)
+            try:
+                start = time.perf_counter()
+                scored, usage = _score_batch(self.client, items, self.context, self.tracker)
+                self.limiter.record_success()
+                self._observe(items, prompt_chars, usage, time.perf_counter() - start)
+                return scored
+            except RateLimitError as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.limiter.record_rate_limit(_retry_after(e))
+                logger.warning(f"OpenAI 429, backing off {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+            except (APIConnectionError, APITimeoutError, InternalServerError) as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"OpenAI request failed, retrying: {e}")
+                time.sleep(2 ** attempt)
+        raise RuntimeError("unreachable")
+
+    def _observe(self, items: list[ContentItem], prompt_chars: int, usage, seconds: float) -> None:
+        prompt_tokens = usage.prompt_tokens if usage else 0
+        completion_tokens = usage.completion_tokens if usage else 0
+        self.estimator.observe(prompt_chars, prompt_tokens, completion_tokens, len(items))
+        stats = BatchStats(len(items), prompt_tokens, completion_tokens, seconds)
+        self.stats.append(stats)
+        logger.info(f"Scored batch: {stats.summary()}")
+
+
+def _score_pending(client: "OpenAI", items: Iterable[ContentItem], context: LearningContext, tracker: CostTracker | None = None) -> list[ScoredItem]:
+    """Score items in token-budgeted batches concurrently, preserving input order.
+
+    Batches are packed lazily as worker slots free up, so later batches use
+    the token ratios observed on earlier responses. While `items` is still
+    producing, only full batches are sent; the remainder goes once it ends.
+    """
+    s = get_settings()
+    run = _ScoringRun(client, context, tracker)
+    received: list[ContentItem] = []
+    item_chars: list[int] = []
+    results: list[ScoredItem | None] = []
+    in_flight: dict = {}
+    next_idx = 0
+
+    def submit(pool: ThreadPoolExecutor, final: bool) -> None:
+        nonlocal next_idx
+        while next_idx < len(received) and len(in_flight) < s.scoring_max_concurrency:
+            end = take_batch(
+                item_chars, next_idx, run.base_chars, run.estimator,
+                s.scoring_prompt_token_budget, s.scoring_completion_token_budget, s.scoring_max_batch_items,
+            )
+            if not final and end == len(received) and end - next_idx < s.scoring_max_batch_items:
+                return  # more items may still fit in this batch
+            in_flight[pool.submit(run.score, received[next_idx:end])] = next_idx
+            next_idx = end
+
+    def collect(block: bool) -> None:
+        done, _ = wait(in_flight, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        for future in done:
+            offset = in_flight.pop(future)
+            for i, scored_item in enumerate(future.result()):
+                results[offset + i] = scored_item
 
+    with ThreadPoolExecutor(max_workers=s.scoring_max_concurrency, thread_name_prefix="score") as pool:
+        for item in items:
+            received.append(item)
+            item_chars.append(_item_chars(item))
+            results.append(None)
+            if in_flight:
+                collect(block=False)
+            submit(pool, final=False)
+        while next_idx < len(received) or in_flight:
+            submit(pool, final=True)
+            collect(block=True)
 
-def _score_batch(client: OpenAI, items: list[ContentItem], context: LearningContext, tracker: CostTracker | None = None) -> list[ScoredItem]:
-    """Score a batch of items with a single GPT-4o call."""
+    if run.stats:
+        total_items = sum(b.items for b in run.stats)
+        total_tokens = sum(b.prompt_tokens + b.completion_tokens for b in run.stats)
+        logger.info(
+            f"Scoring used {len(run.stats)} calls, {total_tokens / total_items:.0f} tok/item "
+            f"(calibrated {run.estimator.chars_per_token:.2f} chars/token, "
+            f"{run.estimator.completion_tokens_per_item:.0f} completion tok/item)"
+        )
+    if run.limiter.rate_limited:
+        logger.warning(f"OpenAI rate limited {run.limiter.rate_limited} time(s) during scoring")
+    return results
+
+
+def _failed_item(item: ContentItem) -> ScoredItem:
+    # Assign default score of 0 so items aren't lost
+    return ScoredItem.from_item(item, 0.0, SCORING_FAILED)
+
+
+def _retry_after(error: "RateLimitError") -> float | None:
+    try:
+        return float(error.response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _score_batch(client: "OpenAI", items: list[ContentItem], context: LearningContext, tracker: CostTracker | None = None):
+    """Score a batch of items with a single GPT-4o call.
+
+    Returns the scored items and the response's token usage (or None).
+    """
     system_prompt = _build_system_prompt(context)
     user_prompt = _build_user_prompt(items)
 
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        response_format={"type": "json_object"},
-        temperature=0.3,
-    )
+    with span("openai", items=len(items)):
+        response = client.chat.completions.create(
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.3,
+        )
 
     # Track token usage
     if tracker and response.usage:
-        tracker.add_openai_usage(response.usage.prompt_tokens, response.usage.completion_tokens)
+        with _tracker_lock:
+            tracker.add_openai_usage(response.usage.prompt_tokens, response.usage.completion_tokens)
         logger.debug(f"OpenAI tokens: {response.usage.prompt_tokens} prompt + {response.usage.completion_tokens} completion")
 
-    content = response.choices[0].message.content
-    result = json.loads(content)
-    scores = result.get("scores", [])
+    try:
+        result = json.loads(response.choices[0].message.content)
+        scores = result.get("scores", [])
+        scored_items: list[ScoredItem] = []
+        for idx, item in enumerate(items):
+            if idx < len(scores):
+                s = scores[idx]
+                score = max(0.0, min(10.0, float(s.get("score", 0))))
+                justification = s.get("justification", "")
+            else:
+                score = 0.0
+                justification = NO_SCORE_RETURNED
 
-    scored_items: list[ScoredItem] = []
-    for idx, item in enumerate(items):
-        if idx < len(scores):
-            s = scores[idx]
-            score = max(0.0, min(10.0, float(s.get("score", 0))))
-            justification = s.get("justification", "")
-        else:
-            score = 0.0
-            justification = "No score returned"
-
-        scored_items.append(ScoredItem(
-            source=item.source,
-            title=item.title,
-            url=item.url,
-            author=item.author,
-            content_snippet=item.content_snippet,
-            score=score,
-            justification=justification,
-        ))
-
-    return scored_items
+            scored_items.append(ScoredItem.from_item(item, score, justification))
+    except (TypeError, AttributeError, KeyError, ValueError) as e:
+        raise MalformedResponse(f"unexpected scoring response: {e}") from e
+
+    return scored_items, response.usage
 
 
 def _build_system_prompt(context: LearningContext) -> str:
@@ -121,10 +394,21 @@ The array must have exactly one entry per input item, in the same order."""
 def _build_user_prompt(items: list[ContentItem]) -> str:
     lines = ["Score the following content items:\n"]
     for idx, item in enumerate(items):
-        lines.append(f"### Item {idx + 1}")
-        lines.append(f"- **Source**: {item.source.value}")
-        lines.append(f"- **Title**: {item.title}")
-        lines.append(f"- **Author**: {item.author}")
-        lines.append(f"- **Snippet**: {item.content_snippet}")
-        lines.append("")
+        lines.append(_format_item(idx, item))
     return "\n".join(lines)
+
+
+def _format_item(idx: int, item: ContentItem) -> str:
+    return "\n".join([
+        f"### Item {idx + 1}",
+        f"- **Source**: {item.source.value}",
+        f"- **Title**: {item.title}",
+        f"- **Author**: {item.author}",
+        f"- **Snippet**: {item.content_snippet}",
+        "",
+    ])
+
+
+def _item_chars(item: ContentItem) -> int:
+    """Characters an item adds to the user prompt."""
+    return len(_format_item(0, item)) + 1
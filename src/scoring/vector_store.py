@@ -0,0 +1,317 @@
+import json
+import logging
+import time
+import uuid
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from src.config import get_settings
+from src.dedup.canonical import canonicalize_url
+from src.models import ContentItem
+
+logger = logging.getLogger(__name__)
+
+USEFUL = 1
+NOT_USEFUL = -1
+LABELS = {"useful": USEFUL, "not_useful": NOT_USEFUL}
+
+# Stored rows compared per matrix product, so large queries stay within a few tens of MB
+_QUERY_CHUNK_ROWS = 16384
+_MIN_CAPACITY = 1024
+
+
+def item_keys(items: list[ContentItem]) -> list[str]:
+    """Store keys for items: their canonical URLs (the items keep their original ones)."""
+    return [canonicalize_url(item.url) for item in items]
+
+
+class VectorStore:
+    """Flat on-disk index of item embeddings keyed by canonical URL.
+
+    Vectors live in a float32 memmap (`vectors*.f32`) that grows by doubling,
+    so a run only pages in what it touches. URLs and per-row columns (first
+    and last seen time, latest score, feedback label) are kept in
+    `index.json` / `columns*.npz`. Queries are exact: normalized vectors, one
+    matrix product per chunk of stored rows.
+
+    `index.json` names the vectors and columns files it was saved with and is
+    replaced atomically by `save()`, so that is the commit point. The
+    committed vectors file is only ever mapped read-only: the first write
+    after a load or save (an add, refresh or eviction) copies the live rows
+    into a new working file, which the next save commits. If a run fails
+    first, the next load sees the last saved store unchanged.
+
+    Rows are refreshed whenever an item is seen again and evicted once unseen
+    for `max_age_days`. The store belongs to one embedding model; opening it
+    with another model starts it empty. Not thread-safe.
+    """
+
+    def __init__(self, directory: Path, model: str, max_age_days: float = 30.0):
+        self.directory = directory
+        self.model = model
+        self.max_age_seconds = max_age_days * 86400
+        self.dim: int | None = None
+        self.urls: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._added = np.zeros(0, dtype=np.float64)
+        self._seen = np.zeros(0, dtype=np.float64)
+        self._scores = np.zeros(0, dtype=np.float32)
+        self._labels = np.zeros(0, dtype=np.int8)
+        self._vectors: np.memmap | None = None
+        # The committed file (read-only) until the first write, then this run's working copy
+        self._vectors_file: str | None = None
+        self._writable = False
+        self._load()
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.directory / self._vectors_file
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._rows
+
+    def _load(self) -> None:
+        index_path = self.directory / "index.json"
+        if not index_path.exists():
+            return
+        try:
+            index = json.loads(index_path.read_text())
+            columns = dict(np.load(self.directory / index.get("columns", "columns.npz")))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable vector store {self.directory}: {e}")
+            return
+        if index["model"] != self.model:
+            logger.info(f"Vector store was built with {index['model']}, starting empty for {self.model}")
+            return
+        vectors_file = index.get("vectors", "vectors.f32")
+        vectors_path = self.directory / vectors_file if vectors_file else None
+        capacity = vectors_path.stat().st_size // (index["dim"] * 4) if vectors_path and vectors_path.exists() else 0
+        if capacity < len(index["urls"]) or any(len(c) != len(index["urls"]) for c in columns.values()):
+            logger.warning(f"Ignoring vector store {self.directory}: vectors or columns do not match its index")
+            return
+        self.dim = index["dim"]
+        self.urls = index["urls"]
+        self._rows = {url: row for row, url in enumerate(self.urls)}
+        self._added, self._seen = columns["added"], columns["seen"]
+        self._scores, self._labels = columns["scores"], columns["labels"]
+        if capacity:
+            self._vectors_file = vectors_file
+            self._vectors = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(capacity, self.dim))
+        evicted = self.evict()
+        logger.info(f"Loaded vector store: {len(self)} items ({evicted} expired)")
+
+    def save(self) -> None:
+        """Commit the store: new columns file, then an atomic swap of the index that names it."""
+        if self.dim is None:
+            return
+        if self._vectors is not None and self._writable:
+            self._vectors.flush()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        columns_file = f"columns-{uuid.uuid4().hex[:12]}.npz"
+        np.savez(self.directory / columns_file, added=self._added, seen=self._seen, scores=self._scores, labels=self._labels)
+        index = {"model": self.model, "dim": self.dim, "vectors": self._vectors_file, "columns": columns_file, "urls": self.urls}
+        tmp = self.directory / "index.tmp.json"
+        tmp.write_text(json.dumps(index))
+        tmp.replace(self.directory / "index.json")
+        # Files from earlier saves, or compactions of runs that never saved, are no longer referenced
+        for path in [*self.directory.glob("vectors*.f32"), *self.directory.glob("columns*.npz")]:
+            if path.name not in (self._vectors_file, columns_file):
+                path.unlink(missing_ok=True)
+        # The working file is now the committed one; the next write copies it again
+        if self._vectors is not None and self._writable:
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=self._vectors.shape)
+            self._writable = False
+
+    def _reserve(self, rows: int) -> None:
+        """Make the memmap writable with room for at least `rows` rows.
+
+        The first call after a load or save copies the live rows into a new
+        working file rather than writing to the committed one.
+        """
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if self._writable and rows <= capacity:
+            return
+        if rows > capacity:
+            capacity = max(rows, capacity * 2, _MIN_CAPACITY)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self._writable:
+            # Our own working file: grow it in place
+            self._vectors.flush()
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(capacity * self.dim * 4)
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+            return
+        committed = self._vectors
+        self._vectors_file = f"vectors-{uuid.uuid4().hex[:12]}.f32"
+        with open(self._vectors_path, "wb") as f:
+            f.truncate(capacity * self.dim * 4)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        self._writable = True
+        if committed is not None and len(self):
+            self._vectors[:len(self)] = committed[:len(self)]
+
+    def add(self, urls: list[str], vectors: np.ndarray, scores: np.ndarray | None = None) -> int:
+        """Insert or refresh rows; `vectors` must be L2-normalized. Returns how many were new."""
+        if not urls:
+            return 0
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Vector store holds {self.dim}-d vectors, got {vectors.shape[1]}-d")
+
+        now = time.time()
+        rows = np.empty(len(urls), dtype=np.intp)
+        new = 0
+        for i, url in enumerate(urls):
+            row = self._rows.get(url)
+            if row is None:
+                row = self._rows[url] = len(self.urls) + new
+                new += 1
+            rows[i] = row
+        self._reserve(len(self.urls) + new)
+        if new:
+            self.urls.extend([None] * new)
+            self._added = np.concatenate([self._added, np.full(new, now)])
+            self._seen = np.concatenate([self._seen, np.zeros(new)])
+            self._scores = np.concatenate([self._scores, np.full(new, np.nan, dtype=np.float32)])
+            self._labels = np.concatenate([self._labels, np.zeros(new, dtype=np.int8)])
+            for url, row in zip(urls, rows):
+                self.urls[row] = url
+
+        self._vectors[rows] = vectors
+        self._seen[rows] = now
+        if scores is not None:
+            self._scores[rows] = scores
+        return new
+
+    def get(self, urls: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Stored vectors for `urls` (zeros where missing) and a mask of which were found."""
+        rows = np.array([self._rows.get(url, -1) for url in urls], dtype=np.intp)
+        found = rows >= 0
+        vectors = np.zeros((len(urls), self.dim or 0), dtype=np.float32)
+        if found.any():
+            vectors[found] = self._vectors[rows[found]]
+        return vectors, found
+
+    def set_scores(self, urls: list[str], scores: list[float]) -> None:
+        for url, score in zip(urls, scores):
+            row = self._rows.get(url)
+            if row is not None:
+                self._scores[row] = score
+
+    def set_labels(self, labels: dict[str, str]) -> int:
+        """Record feedback ("useful"/"not_useful") by URL. Returns how many stored items it matched."""
+        matched = 0
+        for url, response in labels.items():
+            row = self._rows.get(url)
+            if row is not None and response in LABELS:
+                self._labels[row] = LABELS[response]
+                matched += 1
+        return matched
+
+    def nearest(
+        self,
+        vectors: np.ndarray,
+        label: int | None = None,
+        added_before: float | None = None,
+        exclude: list[str] | None = None,
+    ) -> tuple[np.ndarray, list[str | None]]:
+        """Best cosine similarity and URL among stored rows for each query vector.
+
+        Restrict the candidates to one feedback `label` and/or rows first added
+        before a timestamp; `exclude[i]` is a URL query row i may not match
+        (usually its own). Rows with no candidate get similarity 0 and None.
+        """
+        best = np.zeros(len(vectors), dtype=np.float32)
+        best_rows = np.full(len(vectors), -1, dtype=np.intp)
+        if not len(self) or not len(vectors):
+            return best, [None] * len(vectors)
+
+        eligible = np.ones(len(self), dtype=bool)
+        if label is not None:
+            eligible &= self._labels == label
+        if added_before is not None:
+            eligible &= self._added < added_before
+        candidates = np.flatnonzero(eligible)
+        own = np.array([self._rows.get(url, -1) for url in exclude], dtype=np.intp) if exclude else None
+
+        for start in range(0, len(candidates), _QUERY_CHUNK_ROWS):
+            chunk = candidates[start:start + _QUERY_CHUNK_ROWS]
+            # Contiguous slices read straight from the memmap; filtered rows need a gather
+            rows = self._vectors[chunk[0]:chunk[-1] + 1] if chunk[-1] - chunk[0] == len(chunk) - 1 else self._vectors[chunk]
+            sims = vectors @ rows.T
+            if own is not None:
+                hit = np.flatnonzero((own >= chunk[0]) & (own <= chunk[-1]))
+                for i in hit:
+                    pos = np.searchsorted(chunk, own[i])
+                    if pos < len(chunk) and chunk[pos] == own[i]:
+                        sims[i, pos] = -np.inf
+            top = sims.argmax(axis=1)
+            top_sims = sims[np.arange(len(vectors)), top]
+            better = top_sims > best
+            best[better] = top_sims[better]
+            best_rows[better] = chunk[top[better]]
+        return best, [self.urls[row] if row >= 0 else None for row in best_rows]
+
+    def search(self, vector: np.ndarray, k: int = 10, label: int | None = None) -> list[tuple[str, float]]:
+        """The `k` stored URLs most similar to one query vector, best first."""
+        if not len(self):
+            return []
+        if label is None:
+            candidates = np.arange(len(self))
+            sims = self._vectors[:len(self)] @ vector
+        else:
+            candidates = np.flatnonzero(self._labels == label)
+            sims = np.concatenate([
+                self._vectors[candidates[start:start + _QUERY_CHUNK_ROWS]] @ vector
+                for start in range(0, len(candidates), _QUERY_CHUNK_ROWS)
+            ]) if len(candidates) else np.zeros(0, dtype=np.float32)
+        k = min(k, len(sims))
+        top = np.argpartition(-sims, k - 1)[:k] if k else []
+        top = sorted(top, key=lambda i: -sims[i])
+        return [(self.urls[candidates[i]], float(sims[i])) for i in top]
+
+    def more_like_useful(self, k: int = 10) -> list[tuple[str, float]]:
+        """Unlabelled stored items closest to the centroid of the items marked useful."""
+        useful = np.flatnonzero(self._labels == USEFUL)
+        if not len(useful):
+            return []
+        centroid = self._vectors[useful].mean(axis=0)
+        centroid /= np.linalg.norm(centroid) or 1.0
+        return self.search(centroid, k, label=0)
+
+    def evict(self, max_age_seconds: float | None = None) -> int:
+        """Drop rows not seen within the max age, compacting into a new vectors file. Returns count removed."""
+        max_age = self.max_age_seconds if max_age_seconds is None else max_age_seconds
+        keep = np.flatnonzero(self._seen >= time.time() - max_age)
+        removed = len(self) - len(keep)
+        if not removed:
+            return 0
+        kept_vectors = np.array(self._vectors[keep])
+        self.urls = [self.urls[row] for row in keep]
+        self._rows = {url: row for row, url in enumerate(self.urls)}
+        self._added, self._seen = self._added[keep], self._seen[keep]
+        self._scores, self._labels = self._scores[keep], self._labels[keep]
+        # Compact into a new file so evicted rows stop taking disk space; the
+        # committed file stays valid for its index until save() replaces both
+        self._vectors, self._vectors_file, self._writable = None, None, False
+        if len(keep):
+            self._reserve(len(keep))
+            self._vectors[:len(keep)] = kept_vectors
+        return removed
+
+    def stats(self) -> str:
+        labelled = int(np.count_nonzero(self._labels))
+        size_mb = self._vectors_path.stat().st_size / 1e6 if self._vectors is not None else 0.0
+        return f"vector store: {len(self)} items ({labelled} with feedback), {size_mb:.0f} MB on disk"
+
+
+@lru_cache
+def get_vector_store() -> VectorStore:
+    s = get_settings()
+    return VectorStore(Path(s.cache_dir) / "vectors", s.embedding_model, s.vector_store_max_age_days)
@@ -12,27 +12,57 @@ def get_supabase():
     return create_client(url, key)
 
 
-def load_context():
+def list_users():
     client = get_supabase()
-    result = client.table("learning_context").select("*").eq("id", 1).single().execute()
+    result = client.table("learning_context").select("id, email, active").order("id").execute()
     return result.data
 
 
-def save_context(data: dict):
+def add_user(email: str) -> int:
     client = get_supabase()
-    current = load_context()
+    result = client.table("learning_context").insert({"email": email}).execute()
+    return result.data[0]["id"]
+
+
+def load_context(user_id: int):
+    client = get_supabase()
+    result = client.table("learning_context").select("*").eq("id", user_id).single().execute()
+    return result.data
+
+
+def save_context(user_id: int, data: dict):
+    client = get_supabase()
+    current = load_context(user_id)
     client.table("learning_context_history").insert({
+        "user_id": user_id,
         "snapshot": current,
     }).execute()
     data["updated_at"] = datetime.utcnow().isoformat()
-    client.table("learning_context").update(data).eq("id", 1).execute()
+    client.table("learning_context").update(data).eq("id", user_id).execute()
+
+
+def select_user():
+    """Sidebar user picker; each user has their own context and digest."""
+    users = list_users()
+    with st.sidebar:
+        st.header("👤 User")
+        labels = {u["id"]: u.get("email") or f"User {u['id']} (default recipient)" for u in users}
+        user_id = st.selectbox("Editing context for", list(labels), format_func=labels.get) if users else None
+
+        with st.form("add_user_form", clear_on_submit=True):
+            new_email = st.text_input("Add a team member", placeholder="name@example.com")
+            if st.form_submit_button("➕ Add user") and new_email.strip():
+                add_user(new_email.strip())
+                st.rerun()
+    return user_id
 
 
 def main():
     st.title("📚 Learning Context")
     st.caption("Configure what you want to learn. The AI uses this to score and curate your daily digest.")
 
-    ctx = load_context()
+    user_id = select_user()
+    ctx = load_context(user_id) if user_id is not None else None
     if not ctx:
         st.error("No learning context found. Run seed_context.py first.")
         return
@@ -50,7 +80,7 @@ def main():
             with col_r:
                 if st.button("🗑️", key=f"remove_{skill}"):
                     del skill_levels[skill]
-                    save_context({
+                    save_context(user_id, {
                         "goals": ctx["goals"],
                         "digest_format": ctx["digest_format"],
                         "methodology": ctx["methodology"],
@@ -112,7 +142,7 @@ def main():
             if new_skill.strip():
                 updated_skills[new_skill.strip()] = new_level
 
-            save_context({
+            save_context(user_id, {
                 "goals": goals,
                 "digest_format": digest_format,
                 "methodology": {"style": style, "depth": depth, "consumption": consumption},
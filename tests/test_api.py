@@ -0,0 +1,51 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from src.feedback import api
+from src.feedback.jobs import JobRunner
+
+
+def _wait_for(client, job_id, status, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job never reached {status}: {job}")
+
+
+def test_trigger_runs_pipeline_in_background_without_overlap(monkeypatch):
+    release = threading.Event()
+    runs = []
+
+    def fake_pipeline():
+        runs.append(1)
+        release.wait(2)
+        if len(runs) > 1:
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(api, "jobs", JobRunner())
+    monkeypatch.setattr(api, "run_pipeline", fake_pipeline)
+    client = TestClient(api.app)
+
+    response = client.post("/trigger")
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    _wait_for(client, job_id, "running")
+
+    # The event loop stays free and a second run is refused while the first is in progress
+    assert client.get("/health").json() == {"status": "ok"}
+    conflict = client.post("/trigger")
+    assert conflict.status_code == 409
+    assert conflict.json()["job"]["id"] == job_id
+
+    release.set()
+    assert _wait_for(client, job_id, "completed")["finished_at"]
+
+    second = client.post("/trigger").json()["job_id"]
+    failed = _wait_for(client, second, "failed")
+    assert failed["error"] == "boom"
+    assert client.get("/jobs/unknown").status_code == 404
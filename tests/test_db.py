@@ -0,0 +1,98 @@
+from datetime import date
+from unittest.mock import MagicMock
+
+from src.db import UPDATE_CHUNK_SIZE, get_active_users, get_precision_by_date, mark_items_emailed, update_precision_rates
+
+
+def test_mark_items_emailed_uses_one_request_per_chunk():
+    client = MagicMock()
+    query = client.table.return_value.update.return_value.in_
+
+    mark_items_emailed([f"id-{i}" for i in range(5)], client=client)
+    assert query.call_count == 1
+    assert query.call_args.args == ("id", [f"id-{i}" for i in range(5)])
+
+    query.reset_mock()
+    mark_items_emailed([f"id-{i}" for i in range(UPDATE_CHUNK_SIZE * 2 + 1)], client=client)
+    assert query.call_count == 3
+    assert query.return_value.execute.call_count == 3
+
+
+def test_mark_items_emailed_skips_empty_list():
+    client = MagicMock()
+    mark_items_emailed([], client=client)
+    client.table.assert_not_called()
+
+
+def test_precision_window_is_one_query_and_one_upsert():
+    client = MagicMock()
+    query = client.table.return_value.select.return_value.gte.return_value.lte.return_value
+    query.execute.return_value.data = [
+        {"digest_date": "2026-01-01", "precision_rate": "75.00"},
+        {"digest_date": "2026-01-02", "precision_rate": None},
+    ]
+
+    rates = get_precision_by_date(date(2025, 12, 3), date(2026, 1, 2), client=client)
+    assert rates == {date(2026, 1, 1): 75.0}
+    client.table.assert_called_once_with("daily_precision")
+
+    client.reset_mock()
+    update_precision_rates(rates, client=client)
+    upsert = client.table.return_value.upsert
+    upsert.assert_called_once_with([{"digest_date": "2026-01-01", "precision_rate": 75.0}], on_conflict="digest_date")
+
+
+def _context_row(user_id, email, goals):
+    return {
+        "id": user_id, "email": email, "goals": goals, "digest_format": "daily", "methodology": {},
+        "skill_levels": {}, "time_availability": "30 minutes per day", "project_context": "",
+    }
+
+
+def test_get_active_users_falls_back_to_default_recipient(monkeypatch):
+    monkeypatch.setattr("src.db.get_settings", lambda: MagicMock(digest_recipient_email="owner@example.com"))
+    client = MagicMock()
+    query = client.table.return_value.select.return_value.eq.return_value.order.return_value
+    query.execute.return_value.data = [_context_row(1, None, "Rust"), _context_row(2, "b@example.com", "Go")]
+
+    users = get_active_users(client)
+
+    assert [(u.user_id, u.email, u.context.goals) for u in users] == [
+        (1, "owner@example.com", "Rust"), (2, "b@example.com", "Go"),
+    ]
+
+
+def test_shared_client_reuses_connections(monkeypatch):
+    import asyncio
+    import threading
+
+    import src.db as db
+    from scripts.bench_db_writes import FAKE_KEY, PostgrestStub
+
+    server = PostgrestStub(latency_s=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings = MagicMock(supabase_url=server.url, supabase_service_role_key=FAKE_KEY)
+    monkeypatch.setattr(db, "get_settings", lambda: settings)
+    db.get_client.cache_clear()
+    try:
+        db.reset_connection_stats()
+        assert db.get_client() is db.get_client()
+        for _ in range(5):
+            db.get_daily_cost(date(2025, 1, 1))
+        stats = db.get_connection_stats()
+        assert stats.requests == 5
+        assert stats.connections == 1
+
+        async def use_async_client():
+            db.reset_connection_stats()
+            for _ in range(3):
+                await db.aget_precision_stats()
+            await db.close_async_client()
+            return db.get_connection_stats()
+
+        stats = asyncio.run(use_async_client())
+        assert stats.requests == 3
+        assert stats.connections == 1
+    finally:
+        db.get_client.cache_clear()
+        server.shutdown()
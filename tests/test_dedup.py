@@ -0,0 +1,65 @@
+from src.dedup.canonical import canonicalize_url
+from src.dedup.near_dup import dedup_items, dedup_stream, jaccard, near_duplicate_groups, sketch
+from src.models import ContentItem, ContentSource
+
+SNIPPET = (
+    "We benchmarked five vector databases for retrieval augmented generation workloads "
+    "and found that index build time matters more than query latency for most teams"
+)
+
+
+def test_canonicalize_url_strips_tracking_and_normalizes_hosts():
+    assert canonicalize_url("https://www.Example.com/post/?utm_source=x&b=2&a=1#top") == "https://example.com/post?a=1&b=2"
+    assert canonicalize_url("http://twitter.com/Karpathy/status/123?s=20") == "https://x.com/i/status/123"
+    assert canonicalize_url("https://x.com/karpathy/status/123") == "https://x.com/i/status/123"
+    assert canonicalize_url("https://youtu.be/abc123?si=share") == "https://youtube.com/watch?v=abc123"
+    assert canonicalize_url("https://www.youtube.com/watch?v=abc123&feature=shared") == "https://youtube.com/watch?v=abc123"
+    assert canonicalize_url("https://x.com/i/lists/42") == "https://x.com/i/lists/42"
+
+
+def test_minhash_groups_near_duplicates():
+    a = sketch(SNIPPET)
+    b = sketch(SNIPPET.replace("five", "six") + " today")
+    c = sketch("A recipe for sourdough bread with a long cold fermentation and a very hot oven")
+    assert jaccard(a, b) >= 0.5
+    assert jaccard(a, c) == 0.0
+    assert sketch("too short") is None
+
+    groups = near_duplicate_groups([a, b, c, None])
+    assert groups[0] == groups[1]
+    assert len(set(groups)) == 3
+
+
+def test_dedup_items_collapses_url_variants_and_cross_posts():
+    items = [
+        ContentItem(source=ContentSource.NEWSLETTER, title="Vector DB benchmark", url="https://blog.com/vdb?utm_source=rss", content_snippet=SNIPPET),
+        ContentItem(source=ContentSource.NEWSLETTER, title="Vector DB benchmark", url="https://blog.com/vdb/", content_snippet=SNIPPET[:60]),
+        ContentItem(source=ContentSource.TWITTER, title="Vector DB benchmark", url="https://twitter.com/a/status/9", content_snippet=SNIPPET + " (via blog)"),
+        ContentItem(source=ContentSource.YOUTUBE, title="Sourdough at home", url="https://youtu.be/xyz", content_snippet="A recipe for sourdough bread with a long cold fermentation"),
+    ]
+    result = dedup_items(items)
+
+    assert result.url_duplicates == 1
+    assert result.near_duplicates == 1
+    # Canonical URLs only group items; the kept ones link where they were found
+    assert [i.url for i in result.items] == ["https://twitter.com/a/status/9", "https://youtu.be/xyz"]
+
+
+def test_dedup_stream_keeps_first_copy_as_items_arrive():
+    items = [
+        ContentItem(source=ContentSource.NEWSLETTER, title="Vector DB benchmark", url="https://blog.com/vdb?utm_source=rss", content_snippet=SNIPPET),
+        ContentItem(source=ContentSource.NEWSLETTER, title="Vector DB benchmark", url="https://blog.com/vdb/", content_snippet=SNIPPET[:60]),
+        ContentItem(source=ContentSource.TWITTER, title="Vector DB benchmark", url="https://twitter.com/a/status/9", content_snippet=SNIPPET + " (via blog)"),
+        ContentItem(source=ContentSource.YOUTUBE, title="Sourdough at home", url="https://youtu.be/xyz", content_snippet="A recipe for sourdough bread with a long cold fermentation"),
+    ]
+    consumed = []
+
+    def source():
+        for item in items:
+            consumed.append(item)
+            yield item
+
+    stream = dedup_stream(source())
+    assert next(stream).url == "https://blog.com/vdb?utm_source=rss"
+    assert len(consumed) == 1
+    assert [i.url for i in stream] == ["https://youtu.be/xyz"]
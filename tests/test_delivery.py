@@ -0,0 +1,122 @@
+import json
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+import pytest
+import resend
+
+from src.delivery import fanout
+from src.delivery.fanout import Recipient, deliver_digests
+from src.digest.builder import get_digest_template, get_template_environment
+from src.models import CostTracker
+
+
+class FakeResend(ThreadingHTTPServer):
+    """Local stand-in for the Resend API: records batch requests and can fail the first few."""
+
+    def __init__(self, fail_first: int = 0, fail_status: int = 429):
+        super().__init__(("127.0.0.1", 0), _ResendHandler)
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.batches: list[list[dict]] = []
+        self.idempotency_keys: list[str] = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _ResendHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["content-length"])))
+        with self.server.lock:
+            self.server.idempotency_keys.append(self.headers.get("Idempotency-Key"))
+            failing = self.server.fail_first > 0
+            if failing:
+                self.server.fail_first -= 1
+            else:
+                self.server.batches.append(payload)
+        if failing:
+            status, body = self.server.fail_status, {"statusCode": self.server.fail_status, "name": "rate_limit_exceeded", "message": "Too many requests"}
+        else:
+            status, body = 200, {"data": [{"id": f"email-{i}"} for i in range(len(payload))]}
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_resend(monkeypatch, tmp_path):
+    servers = []
+
+    def start(**kwargs):
+        server = FakeResend(**kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        monkeypatch.setattr(resend, "api_url", server.url)
+        servers.append(server)
+        return server
+
+    settings = MagicMock(
+        resend_api_key="re_test", digest_from_email="digest@example.com",
+        email_max_concurrency=4, email_max_retries=2,
+        feedback_api_url="http://localhost:8000", streamlit_app_url="", cache_dir=str(tmp_path),
+    )
+    monkeypatch.setattr(fanout, "get_settings", lambda: settings)
+    monkeypatch.setattr("src.digest.builder.get_settings", lambda: settings)
+    monkeypatch.setattr(fanout, "BACKOFF_BASE_SECONDS", 0.01)
+    get_template_environment.cache_clear()
+    get_digest_template.cache_clear()
+    yield start
+    for server in servers:
+        server.shutdown()
+    get_template_environment.cache_clear()
+    get_digest_template.cache_clear()
+
+
+def _recipients(n):
+    rows = [{"id": "1", "source": "newsletter", "title": "Article A", "url": "https://a.com", "score": 9.0, "justification": "Relevant"}]
+    return [Recipient(email=f"user{i}@example.com", items=rows) for i in range(n)]
+
+
+def test_deliver_digests_sends_in_batches(fake_resend):
+    server = fake_resend()
+    tracker = CostTracker()
+
+    with patch.object(fanout, "RESEND_BATCH_SIZE", 2):
+        report = deliver_digests(_recipients(5), date(2025, 1, 15), tracker)
+
+    assert sorted(len(b) for b in server.batches) == [1, 2, 2]
+    assert sorted(e["to"][0] for b in server.batches for e in b) == [f"user{i}@example.com" for i in range(5)]
+    assert all("Article A" in e["html"] for b in server.batches for e in b)
+    assert len(report.delivered) == 5 and not report.failed
+    assert tracker.resend_emails_sent == 5
+    assert all(send.seconds > 0 for send in report.sends)
+
+
+def test_deliver_digests_retries_rate_limits_with_same_key(fake_resend):
+    server = fake_resend(fail_first=2)
+
+    report = deliver_digests(_recipients(3), date(2025, 1, 15))
+
+    assert report.sends[0].ok and report.sends[0].attempts == 3
+    assert len(set(server.idempotency_keys)) == 1
+    assert len(server.batches) == 1
+
+
+def test_deliver_digests_gives_up_on_client_errors(fake_resend):
+    server = fake_resend(fail_first=5, fail_status=422)
+
+    report = deliver_digests(_recipients(2), date(2025, 1, 15))
+
+    assert report.failed == ["user0@example.com", "user1@example.com"]
+    assert report.sends[0].attempts == 1
+    assert server.batches == []
@@ -1,17 +1,31 @@
 from datetime import date
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock
 
-from src.digest.builder import build_digest
+import pytest
 
+from src.digest.builder import build_digest, get_digest_template, get_template_environment, stream_digest
 
-def _mock_settings():
-    s = MagicMock()
-    s.feedback_api_url = "http://localhost:8000"
-    s.streamlit_app_url = ""
-    return s
+
+@pytest.fixture(autouse=True)
+def digest_settings(monkeypatch, tmp_path):
+    """Settings with a per-test cache dir, and a template environment and template built against it."""
+    settings = MagicMock(feedback_api_url="http://localhost:8000", streamlit_app_url="", cache_dir=str(tmp_path))
+    monkeypatch.setattr("src.digest.builder.get_settings", lambda: settings)
+    get_template_environment.cache_clear()
+    get_digest_template.cache_clear()
+    yield settings
+    get_template_environment.cache_clear()
+    get_digest_template.cache_clear()
+
+
+def _digest_items(n):
+    return [
+        {"id": str(i), "source": "newsletter", "title": f"Article {i}", "url": f"https://a.com/{i}",
+         "score": 5.0 + (i % 50) / 10, "justification": "Relevant to your current project", "author": "Author"}
+        for i in range(n)
+    ]
 
 
-@patch("src.digest.builder.get_settings", _mock_settings)
 def test_build_digest_with_items():
     items = [
         {"id": "1", "source": "newsletter", "title": "Article A", "url": "https://a.com", "score": 9.0, "justification": "Very relevant", "author": "Author A"},
@@ -29,8 +43,36 @@ def test_build_digest_with_items():
     assert len(included_ids) == 3
 
 
-@patch("src.digest.builder.get_settings", _mock_settings)
 def test_build_digest_empty():
     html, included_ids = build_digest([], date(2025, 1, 15))
     assert "No items matched" in html
     assert len(included_ids) == 0
+
+
+def test_stream_digest_matches_build_digest():
+    items = _digest_items(20)
+    html, ids = build_digest([dict(i) for i in items], date(2025, 1, 15))
+    chunks, streamed_ids = stream_digest([dict(i) for i in items], date(2025, 1, 15))
+    assert "".join(chunks) == html
+    assert streamed_ids == ids
+    assert get_template_environment() is get_template_environment()
+
+
+
+def test_digest_ranks_ties_in_order_and_reports_sources():
+    from src.item_batch import ItemBatch
+
+    items = [
+        {"id": "a", "source": "twitter", "url": "https://a.com", "score": 6.0, "published_at": "2025-01-14T08:00:00+00:00"},
+        {"id": "b", "source": "youtube", "url": "https://b.com", "score": 8.0},
+        {"id": "c", "source": "twitter", "url": "https://c.com", "score": 6.0, "published_at": "2025-01-15T08:00:00+00:00"},
+        {"id": "d", "source": "newsletter", "url": "https://d.com", "score": 4.9},
+        {"id": "e", "source": "newsletter", "url": "https://e.com", "score": "9"},
+    ]
+    _, ids = build_digest([dict(i) for i in items], date(2025, 1, 15))
+    assert ids == ["e", "b", "a", "c"]
+
+    stats = ItemBatch.from_rows(items).source_stats()
+    assert stats["twitter"]["count"] == 2 and stats["twitter"]["mean_score"] == 6.0
+    assert stats["twitter"]["newest"].day == 15
+    assert stats["newsletter"] == {"count": 2, "mean_score": 6.95, "newest": None}
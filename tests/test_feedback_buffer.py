@@ -0,0 +1,152 @@
+import asyncio
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from src.feedback import api
+from src.feedback.buffer import FeedbackBuffer
+
+
+class ForeignKeyViolation(Exception):
+    code = "23503"
+
+
+class FakeWriter:
+    def __init__(self, fail: bool = False, bad_ids: set[str] = frozenset()):
+        self.fail = fail
+        self.bad_ids = bad_ids
+        self.batches = []
+
+    async def __call__(self, rows):
+        if self.fail:
+            raise RuntimeError("database down")
+        if any(r["item_id"] in self.bad_ids for r in rows):
+            raise ForeignKeyViolation("insert violates foreign key constraint")
+        self.batches.append(rows)
+
+
+def test_buffer_batches_and_drops_double_clicks():
+    writer = FakeWriter()
+
+    async def scenario():
+        buffer = FeedbackBuffer(writer, flush_interval_ms=10_000, max_rows=3)
+        await buffer.start()
+        assert await buffer.add("a", "useful")
+        assert not await buffer.add("a", "useful")  # double-click
+        assert await buffer.add("b", "useful")
+        assert await buffer.add("b", "not_useful")  # changed answer replaces the pending one
+        assert await buffer.add("c", "useful")  # reaches max_rows, wakes the flush loop
+        await asyncio.sleep(0.05)
+        assert len(writer.batches) == 1
+        await buffer.add("d", "useful")
+        await buffer.stop()
+        return buffer
+
+    buffer = asyncio.run(scenario())
+    assert writer.batches == [
+        [
+            {"item_id": "a", "response": "useful"},
+            {"item_id": "b", "response": "not_useful"},
+            {"item_id": "c", "response": "useful"},
+        ],
+        [{"item_id": "d", "response": "useful"}],
+    ]
+    assert buffer.flushed == 4
+    assert buffer.duplicates == 1
+
+
+def test_buffer_flushes_on_interval():
+    writer = FakeWriter()
+
+    async def scenario():
+        buffer = FeedbackBuffer(writer, flush_interval_ms=20, max_rows=100)
+        await buffer.start()
+        await buffer.add("a", "useful")
+        await asyncio.sleep(0.1)
+        flushed = len(writer.batches)
+        await buffer.stop()
+        return flushed
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_buffer_spills_unwritten_rows_and_replays_them(tmp_path):
+    spill = tmp_path / "feedback_spill.jsonl"
+    failing = FakeWriter(fail=True)
+
+    async def first_run():
+        buffer = FeedbackBuffer(failing, flush_interval_ms=10_000, spill_path=spill)
+        await buffer.start()
+        await buffer.add("a", "useful")
+        await buffer.add("b", "not_useful")
+        await buffer.stop()
+
+    asyncio.run(first_run())
+    assert spill.exists()
+
+    writer = FakeWriter()
+
+    async def second_run():
+        buffer = FeedbackBuffer(writer, flush_interval_ms=10_000, spill_path=spill)
+        await buffer.start()
+        await buffer.stop()
+
+    asyncio.run(second_run())
+    assert writer.batches == [[{"item_id": "a", "response": "useful"}, {"item_id": "b", "response": "not_useful"}]]
+    assert not spill.exists()
+
+
+def test_feedback_endpoint_writes_through_buffer(monkeypatch, tmp_path):
+    writer = FakeWriter()
+    settings = SimpleNamespace(feedback_flush_interval_ms=10_000, feedback_flush_max_rows=100, cache_dir=str(tmp_path))
+    monkeypatch.setattr(api, "get_settings", lambda: settings)
+    monkeypatch.setattr(api, "alog_feedback_batch", writer)
+
+    async def no_client():
+        pass
+
+    monkeypatch.setattr(api, "close_async_client", no_client)
+
+    item_id = "6f1c2a3e-8b4d-4c5e-9f60-718293a4b5c6"
+    with TestClient(api.app) as client:
+        assert client.get(f"/feedback/{item_id}?response=useful").status_code == 200
+        assert client.get(f"/feedback/{item_id}?response=useful").status_code == 200
+        assert client.get("/feedback/not-a-uuid?response=useful").status_code == 400
+        assert writer.batches == []
+    # Shutdown flushes what is still buffered
+    assert writer.batches == [[{"item_id": item_id, "response": "useful"}]]
+
+
+def test_buffer_drops_rows_the_database_rejects_and_keeps_writing():
+    writer = FakeWriter(bad_ids={"deleted"})
+
+    async def scenario():
+        buffer = FeedbackBuffer(writer, flush_interval_ms=10_000, max_rows=100)
+        await buffer.start()
+        await buffer.add("a", "useful")
+        await buffer.add("deleted", "useful")
+        await buffer.add("b", "not_useful")
+        assert await buffer.flush() == 2
+        await buffer.add("c", "useful")
+        assert await buffer.flush() == 1
+        await buffer.stop()
+        return buffer
+
+    buffer = asyncio.run(scenario())
+    assert [r["item_id"] for batch in writer.batches for r in batch] == ["a", "b", "c"]
+    assert buffer.dropped == 1 and buffer.flushed == 3
+
+
+def test_full_buffer_drops_clicks_instead_of_blocking(monkeypatch):
+    monkeypatch.setattr("src.feedback.buffer.BACKPRESSURE_TIMEOUT_SECONDS", 0.05)
+
+    async def scenario():
+        buffer = FeedbackBuffer(FakeWriter(fail=True), flush_interval_ms=10_000, max_rows=1)
+        await buffer.start()
+        accepted = [await asyncio.wait_for(buffer.add(str(i), "useful"), 1) for i in range(15)]
+        await buffer.stop()
+        return buffer, accepted
+
+    buffer, accepted = asyncio.run(scenario())
+    assert accepted.count(True) == 10
+    assert buffer.dropped == 5
@@ -0,0 +1,50 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# SDKs that only the stage using them may import
+DEFERRED = ("openai", "apify_client", "googleapiclient", "httplib2", "feedparser", "resend", "supabase", "numpy")
+
+# Cold-import budgets in ms (measured ~230 for the API, ~140 for the pipeline;
+# ~850 and ~710 before SDK imports were deferred)
+BUDGET_MS = {"src.feedback.api": 500, "src.pipeline": 350}
+
+
+def _importtime(module: str) -> tuple[set[str], float]:
+    """Modules imported by a fresh `import module`, and its cumulative import time in ms."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    modules, cumulative_us = set(), 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules.add(name.strip())
+        if name.strip() == module:
+            cumulative_us = int(cumulative)
+    return modules, cumulative_us / 1000
+
+
+@pytest.mark.parametrize("module", sorted(BUDGET_MS))
+def test_import_defers_sdks(module):
+    modules, _ = _importtime(module)
+    loaded = sorted(m for m in modules if m.split(".")[0] in DEFERRED)
+    assert not loaded, f"importing {module} pulled in {loaded}"
+
+
+def test_feedback_api_does_not_import_pipeline():
+    modules, _ = _importtime("src.feedback.api")
+    assert not {"src.pipeline", "src.ingestion.runner", "src.scoring.scorer"} & modules
+
+
+@pytest.mark.parametrize("module", sorted(BUDGET_MS))
+def test_import_time_budget(module):
+    # Best of three, so a busy machine does not fail the build
+    ms = min(_importtime(module)[1] for _ in range(3))
+    assert ms < BUDGET_MS[module], f"import {module} took {ms:.0f}ms (budget {BUDGET_MS[module]}ms)"
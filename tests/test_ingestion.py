@@ -1,4 +1,16 @@
-from src.models import ContentSource
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import feedparser
+
+from src.ingestion.feed_cache import FeedCache
+from src.ingestion.newsletters import fetch_feed_items
+from src.ingestion.runner import IngestionStream, gather_sources
+from src.ingestion.tweet_watermarks import TweetWatermarks
+from src.ingestion.twitter import fetch_twitter_items, twitter_jobs
+from src.ingestion.youtube import fetch_youtube_items, iter_channel_items
+from src.models import ContentItem, ContentSource, CostTracker
 
 
 def test_content_source_enum():
@@ -14,3 +26,360 @@ def test_sample_items_structure(sample_items):
     for item in sample_items:
         assert item.title
         assert item.url
+
+
+def test_gather_sources_runs_requests_concurrently():
+    def slow_job(url):
+        def job():
+            time.sleep(0.2)
+            return [ContentItem(source=ContentSource.NEWSLETTER, title=url, url=url)]
+        return job
+
+    sources = [
+        ("newsletters", [slow_job(f"https://n{i}.com") for i in range(5)], 5.0),
+        ("youtube", [slow_job(f"https://y{i}.com") for i in range(5)], 5.0),
+    ]
+    start = time.perf_counter()
+    report = gather_sources(sources, max_concurrency=10)
+    elapsed = time.perf_counter() - start
+
+    assert len(report.items) == 10
+    assert elapsed < 0.6  # ~one request, not the sum of ten
+    assert [t.source for t in report.timings] == ["newsletters", "youtube"]
+
+
+def test_gather_sources_isolates_failures_and_timeouts():
+    def ok():
+        return [ContentItem(source=ContentSource.NEWSLETTER, title="ok", url="https://ok.com")]
+
+    def broken():
+        raise RuntimeError("feed down")
+
+    def hung():
+        time.sleep(1.0)
+        return []
+
+    sources = [
+        ("newsletters", [ok, broken], 5.0),
+        ("youtube", [hung], 0.1),
+    ]
+    report = gather_sources(sources, max_concurrency=4)
+
+    timings = {t.source: t for t in report.timings}
+    assert [i.title for i in report.items] == ["ok"]
+    assert timings["newsletters"].failed == 1
+    assert timings["youtube"].timed_out == 1
+
+
+def test_ingestion_stream_starts_long_running_sources_first_and_times_requests_from_their_start():
+    started = []
+
+    def job(name, seconds):
+        def run():
+            started.append(name)
+            time.sleep(seconds)
+            return [ContentItem(source=ContentSource.NEWSLETTER, title=name, url=f"https://{name}.com")]
+        return run
+
+    sources = [
+        ("newsletters", [job(f"feed{i}", 0.05) for i in range(4)], 0.1),
+        ("twitter", [job("apify", 0.05)], 5.0),
+    ]
+    # One worker: the feeds queue for longer than their timeout but only their own fetch counts
+    report = gather_sources(sources, max_concurrency=1)
+    assert started[0] == "apify"
+    assert len(report.items) == 5
+    assert [t.timed_out for t in report.timings] == [0, 0]
+    assert [t.source for t in report.timings] == ["newsletters", "twitter"]
+
+
+def test_ingestion_stream_yields_items_before_slow_sources_finish():
+    def fast():
+        yield ContentItem(source=ContentSource.NEWSLETTER, title="fast", url="https://fast.com")
+
+    def slow():
+        time.sleep(0.5)
+        yield ContentItem(source=ContentSource.YOUTUBE, title="slow", url="https://slow.com")
+
+    stream = IngestionStream([("newsletters", [fast], 5.0), ("youtube", [slow], 5.0)], max_concurrency=4)
+    start = time.perf_counter()
+    items = iter(stream)
+    assert next(items).title == "fast"
+    assert time.perf_counter() - start < 0.3
+    assert [i.title for i in items] == ["slow"]
+    assert stream.report.total_items == 2
+
+
+def test_ingestion_stream_timeouts_ignore_time_spent_by_the_consumer(monkeypatch):
+    monkeypatch.setattr("src.ingestion.runner.STREAM_QUEUE_SIZE", 2)
+    commits = []
+
+    def job(n):
+        def run():
+            for i in range(n):
+                yield ContentItem(source=ContentSource.NEWSLETTER, title=f"{n}-{i}", url=f"https://n.com/{n}/{i}")
+            return lambda: commits.append(n)
+        return run
+
+    stream = IngestionStream([("newsletters", [job(10), job(3)], 0.2)], max_concurrency=2)
+    received = []
+    for item in stream:
+        # A slow consumer makes the workers wait, which does not count against their timeout
+        assert len(commits) < 2
+        received.append(item)
+        time.sleep(0.05)
+    assert len(received) == 13
+    assert sorted(commits) == [3, 10]
+    assert stream.report.timings[0].timed_out == 0
+
+
+def test_ingestion_stream_delivers_but_never_commits_a_timed_out_job(caplog):
+    commits = []
+
+    def hung():
+        yield ContentItem(source=ContentSource.YOUTUBE, title="early", url="https://y.com/1")
+        time.sleep(1.0)
+        yield ContentItem(source=ContentSource.YOUTUBE, title="late", url="https://y.com/2")
+        return lambda: commits.append("hung")
+
+    report = gather_sources([("youtube", [hung], 0.15)], max_concurrency=2)
+    assert [i.title for i in report.items] == ["early"]
+    assert report.timings[0].timed_out == 1
+    assert commits == []
+    assert "exceeded 0.15s timeout" in caplog.text
+
+
+def _fake_feed(status=200, etag=None, entries=()):
+    feed = feedparser.FeedParserDict(status=status, bozo=False, entries=list(entries))
+    if etag:
+        feed["etag"] = etag
+    return feed
+
+
+def test_fetch_feed_items_uses_conditional_get(tmp_path, monkeypatch):
+    cache = FeedCache(tmp_path / "rss_feeds.json")
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
+    entry = feedparser.FeedParserDict(id="post-1", title="Post", link="https://blog.com/post-1")
+    calls = []
+
+    def fake_parse(url, etag=None, modified=None):
+        calls.append(etag)
+        return _fake_feed(status=304) if etag else _fake_feed(etag='"v1"', entries=[entry])
+
+    monkeypatch.setattr("feedparser.parse", fake_parse)
+
+    assert len(fetch_feed_items("https://blog.com/feed", cutoff, cache)) == 1
+    cache.save()
+
+    reloaded = FeedCache(tmp_path / "rss_feeds.json")
+    assert fetch_feed_items("https://blog.com/feed", cutoff, reloaded) == []
+    assert calls == [None, '"v1"']
+    assert (reloaded.hits, reloaded.misses) == (1, 0)
+
+
+def test_fetch_feed_items_skips_seen_entries(tmp_path, monkeypatch):
+    cache = FeedCache(tmp_path / "rss_feeds.json")
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
+    old = feedparser.FeedParserDict(id="post-1", title="Old", link="https://blog.com/post-1")
+    new = feedparser.FeedParserDict(id="post-2", title="New", link="https://blog.com/post-2")
+    feeds = iter([_fake_feed(entries=[old]), _fake_feed(entries=[new, old])])
+    monkeypatch.setattr("feedparser.parse", lambda url, **kw: next(feeds))
+
+    fetch_feed_items("https://blog.com/feed", cutoff, cache)
+    cache.save()
+    items = fetch_feed_items("https://blog.com/feed", cutoff, cache)
+
+    assert [i.title for i in items] == ["New"]
+    assert cache.misses == 2
+    assert cache.entries_skipped == 1
+
+
+def test_feed_cache_changes_wait_for_save(tmp_path, monkeypatch):
+    cache = FeedCache(tmp_path / "rss_feeds.json")
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
+    entry = feedparser.FeedParserDict(id="post-1", title="Post", link="https://blog.com/post-1")
+    monkeypatch.setattr("feedparser.parse", lambda url, **kw: _fake_feed(etag='"v1"', entries=[entry]))
+
+    # A failed run's validators and seen IDs never reach the next run
+    assert len(fetch_feed_items("https://blog.com/feed", cutoff, cache)) == 1
+    assert cache.validators("https://blog.com/feed") == (None, None)
+    cache.discard()
+    cache.save()
+    assert len(fetch_feed_items("https://blog.com/feed", cutoff, cache)) == 1
+
+    cache.save()
+    assert cache.validators("https://blog.com/feed") == ('"v1"', None)
+    assert fetch_feed_items("https://blog.com/feed", cutoff, cache) == []
+
+
+def _twitter_settings(**overrides):
+    settings = dict(
+        twitter_lists=[], twitter_handle_list=[], apify_api_token="token",
+        twitter_handles_per_run=20, twitter_max_tweets_per_source=10,
+    )
+    settings.update(overrides)
+    return SimpleNamespace(**settings)
+
+
+class FakeApify:
+    """Stands in for ApifyClient: records each run's input and serves the next canned dataset."""
+
+    def __init__(self, datasets):
+        self.datasets = iter(datasets)
+        self.inputs = []
+        self._items = []
+
+    def __call__(self, token):
+        return self
+
+    def actor(self, name):
+        return self
+
+    def call(self, run_input):
+        self.inputs.append(run_input)
+        self._items = next(self.datasets)
+        return {"defaultDatasetId": "ds", "usageTotalUsd": 0.01}
+
+    def dataset(self, dataset_id):
+        return self
+
+    def iterate_items(self):
+        return iter(self._items)
+
+
+def _tweet(tweet_id, user="alice"):
+    created = datetime.now(timezone.utc).strftime("%a %b %d %H:%M:%S +0000 %Y")
+    return {"id": str(tweet_id), "text": f"Tweet {tweet_id}", "author": {"userName": user}, "createdAt": created}
+
+
+def test_twitter_jobs_shard_lists_and_handles(monkeypatch):
+    settings = _twitter_settings(
+        twitter_lists=["https://x.com/i/lists/1", "https://x.com/i/lists/2"],
+        twitter_handle_list=[f"user{i}" for i in range(45)],
+    )
+    monkeypatch.setattr("src.ingestion.twitter.get_settings", lambda: settings)
+    jobs = twitter_jobs()
+    assert [len(job.args[0]) for job in jobs] == [1, 1, 20, 20, 5]
+
+
+def test_twitter_runs_only_ask_for_tweets_after_watermarks(tmp_path, monkeypatch):
+    settings = _twitter_settings(twitter_handle_list=["Alice", "bob"])
+    monkeypatch.setattr("src.ingestion.twitter.get_settings", lambda: settings)
+    apify = FakeApify([
+        [_tweet(5), _tweet(7), _tweet(6, "bob")],
+        # An actor that ignores since_id still does not produce repeats
+        [_tweet(7), _tweet(9)],
+    ])
+    monkeypatch.setattr("apify_client.ApifyClient", apify)
+
+    marks = TweetWatermarks(tmp_path / "twitter_watermarks.json")
+    assert len(fetch_twitter_items(watermarks=marks)) == 3
+    assert not any("since_id" in term for term in apify.inputs[0]["searchTerms"])
+    marks.save()
+
+    reloaded = TweetWatermarks(tmp_path / "twitter_watermarks.json")
+    items = fetch_twitter_items(watermarks=reloaded)
+    assert [i.title for i in items] == ["Tweet 9"]
+    terms = apify.inputs[1]["searchTerms"]
+    assert terms[0].startswith("from:alice since:") and terms[0].endswith("since_id:7")
+    assert terms[1].endswith("since_id:6")
+    reloaded.save()
+    assert reloaded.get("handle:alice")[0] == 9
+    assert reloaded.skipped == 1
+
+
+def test_twitter_watermarks_only_move_once_a_dataset_is_fully_read(tmp_path, monkeypatch):
+    settings = _twitter_settings(twitter_handle_list=["alice"])
+    monkeypatch.setattr("src.ingestion.twitter.get_settings", lambda: settings)
+
+    class FailingDataset(FakeApify):
+        def iterate_items(self):
+            yield from self._items
+            raise ConnectionError("dataset page failed")
+
+    monkeypatch.setattr("apify_client.ApifyClient", FailingDataset([[_tweet(9), _tweet(8)], [_tweet(9), _tweet(8)]]))
+    marks = TweetWatermarks(tmp_path / "twitter_watermarks.json")
+    assert len(fetch_twitter_items(watermarks=marks)) == 2
+    marks.save()
+    assert marks.get("handle:alice") is None
+
+    # A consumer that stops early (e.g. the source timed out) leaves it unmoved too
+    stream = twitter_jobs(watermarks=marks)[0]()
+    next(stream)
+    stream.close()
+    marks.save()
+    assert marks.get("handle:alice") is None
+
+    # A fully read dataset is staged until the run is saved or discarded
+    monkeypatch.setattr("apify_client.ApifyClient", FakeApify([[_tweet(9)], [_tweet(9)]]))
+    fetch_twitter_items(watermarks=marks)
+    assert marks.get("handle:alice") is None
+    marks.discard()
+    marks.save()
+    assert marks.get("handle:alice") is None
+    fetch_twitter_items(watermarks=marks)
+    marks.save()
+    assert marks.get("handle:alice")[0] == 9
+
+
+class FakePlaylistItems:
+    """playlistItems() stand-in serving `videos` (newest first) in pages, after an optional delay."""
+
+    def __init__(self, videos, delay=0.0):
+        self.videos = videos
+        self.delay = delay
+        self.requests = []
+
+    def playlistItems(self):
+        return self
+
+    def list(self, **params):
+        self.requests.append(params)
+        self._params = params
+        return self
+
+    def execute(self):
+        time.sleep(self.delay)
+        offset, size = int(self._params.get("pageToken") or 0), self._params["maxResults"]
+        page = {"items": self.videos[offset:offset + size]}
+        if offset + size < len(self.videos):
+            page["nextPageToken"] = str(offset + size)
+        return page
+
+
+def _video(video_id, hours_ago):
+    published = datetime.now(timezone.utc) - timedelta(hours=hours_ago)
+    return {"snippet": {
+        "title": f"Video {video_id}", "publishedAt": published.isoformat().replace("+00:00", "Z"),
+        "resourceId": {"videoId": video_id}, "channelTitle": "Channel",
+    }}
+
+
+def test_youtube_pages_until_cutoff_and_counts_quota(monkeypatch):
+    videos = [_video(f"v{i}", hours_ago=i) for i in range(100)]
+    client = FakePlaylistItems(videos)
+    monkeypatch.setattr("src.ingestion.youtube.get_youtube_client", lambda key: client)
+    tracker = CostTracker()
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=30.5)
+
+    items = list(iter_channel_items("key", "UCabc", cutoff, tracker))
+
+    assert len(items) == 31
+    # A 10-video first page, then one 50-video page that reaches the cutoff
+    assert [r["maxResults"] for r in client.requests] == [10, 50]
+    assert client.requests[0]["playlistId"] == "UUabc"
+    assert tracker.youtube_quota_units == 2
+
+
+def test_fetch_youtube_items_runs_channels_concurrently(monkeypatch):
+    settings = SimpleNamespace(youtube_channels=[], youtube_api_key="key", ingestion_max_concurrency=20)
+    monkeypatch.setattr("src.ingestion.youtube.get_settings", lambda: settings)
+    monkeypatch.setattr("src.ingestion.youtube.get_youtube_client", lambda key: FakePlaylistItems([_video("v", 1)], delay=0.05))
+    tracker = CostTracker()
+
+    start = time.perf_counter()
+    items = fetch_youtube_items([f"UC{i}" for i in range(40)], tracker=tracker)
+
+    assert len(items) == 40
+    assert time.perf_counter() - start < 0.5
+    assert tracker.youtube_quota_units == 40
@@ -29,3 +29,19 @@ def test_scored_item_validation():
     )
     assert item.score == 8.5
     assert 0.0 <= item.score <= 10.0
+
+
+def test_pipeline_end_to_end_against_offline_fakes():
+    from scripts.bench_pipeline import run_once
+
+    result = run_once(120, users=2, latency_ms=0, openai_latency_ms=0, twitter=False)
+
+    assert result["status"] == "completed"
+    assert result["items_ingested"] == 120
+    # The two users' contexts differ, so each cluster scores the deduped items
+    assert 0 < result["items_scored"] <= 2 * 120
+    assert result["items_emailed"] > 0
+    # Both users' digests go out in one Resend batch request
+    assert result["calls"]["resend"] == 1
+    assert result["calls"]["openai"] >= 1
+    assert {"ingest", "score", "store", "deliver", "total"} <= set(result["stages"])
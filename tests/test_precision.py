@@ -0,0 +1,47 @@
+from datetime import date, timedelta
+
+from src.monitoring import precision
+
+
+def _patch(monkeypatch, rates):
+    calls = {"reads": [], "writes": [], "alerts": []}
+
+    def fake_read(since, until):
+        calls["reads"].append((since, until))
+        return rates
+
+    monkeypatch.setattr(precision, "get_precision_by_date", fake_read)
+    monkeypatch.setattr(precision, "update_precision_rates", lambda r: calls["writes"].append(r))
+    monkeypatch.setattr(precision, "send_alert_email", lambda subject, body: calls["alerts"].append(body))
+    return calls
+
+
+def test_alert_when_recent_days_are_all_low(monkeypatch):
+    today = date.today()
+    rates = {today - timedelta(days=d): 40.0 for d in range(1, 31)}
+    calls = _patch(monkeypatch, rates)
+
+    precision.check_precision_alert(window_days=30)
+
+    # A 30-day window is still one read and one write
+    assert calls["reads"] == [(today - timedelta(days=30), today - timedelta(days=1))]
+    assert calls["writes"] == [rates]
+    assert len(calls["alerts"]) == 1
+
+
+def test_no_alert_when_latest_day_recovers(monkeypatch):
+    today = date.today()
+    calls = _patch(monkeypatch, {
+        today - timedelta(days=1): 80.0,
+        today - timedelta(days=2): 40.0,
+        today - timedelta(days=3): 40.0,
+    })
+
+    precision.check_precision_alert()
+    assert calls["alerts"] == []
+
+
+def test_not_enough_data(monkeypatch):
+    calls = _patch(monkeypatch, {date.today() - timedelta(days=1): 10.0})
+    precision.check_precision_alert()
+    assert calls["alerts"] == []
@@ -1,4 +1,19 @@
-from src.scoring.scorer import _build_system_prompt, _build_user_prompt
+import time
+from dataclasses import replace
+from unittest.mock import patch, MagicMock
+
+import httpx
+import numpy as np
+import pytest
+from openai import AuthenticationError, RateLimitError
+
+from src.models import ContentItem, ContentSource, ScoredItem
+from src.scoring.embedding import EmbeddingScoringEngine, HashingEmbedder
+from src.scoring.cache import ScoreCache, content_key, context_fingerprint
+from src.scoring.prefilter import prefilter_items, prefilter_recall
+from src.scoring.rate_limit import TokenRateLimiter
+from src.scoring.batching import TokenEstimator, take_batch
+from src.scoring.scorer import MalformedResponse, _build_system_prompt, _build_user_prompt, _score_batch, cluster_contexts, score_items
 
 
 def test_build_system_prompt(sample_context):
@@ -16,3 +31,323 @@ def test_build_user_prompt(sample_items):
     assert "Item 3" in prompt
     assert "Building RAG Systems" in prompt
     assert "newsletter" in prompt
+
+
+BATCH_SIZE = 12
+
+
+def _mock_settings():
+    s = MagicMock()
+    s.openai_tpm_limit = 1_000_000
+    s.scoring_max_concurrency = 4
+    s.scoring_max_retries = 2
+    s.scoring_prompt_token_budget = 4000
+    s.scoring_completion_token_budget = 1500
+    s.scoring_max_batch_items = BATCH_SIZE
+    s.scoring_engine = "llm"
+    return s
+
+
+def _fake_score_batch(client, items, context, tracker=None):
+    return [
+        ScoredItem(source=i.source, title=i.title, url=i.url, score=7.0, justification="Relevant")
+        for i in items
+    ], None
+
+
+@patch("openai.OpenAI", MagicMock())
+@patch("src.scoring.scorer.get_settings", _mock_settings)
+def test_score_items_reuses_cached_scores(tmp_path, sample_items, sample_context):
+    cache = ScoreCache(tmp_path / "scores.json")
+    with patch("src.scoring.scorer._score_batch", side_effect=_fake_score_batch) as batch:
+        score_items(sample_items, sample_context, cache=cache)
+        assert batch.call_count == 1
+        cache.save()
+
+        reloaded = ScoreCache(tmp_path / "scores.json")
+        cross_post = replace(sample_items[0], source=ContentSource.TWITTER, url="https://x.com/a/status/1")
+        scored = score_items(sample_items + [cross_post], sample_context, cache=reloaded)
+
+    assert batch.call_count == 1
+    assert reloaded.hits == 3  # the cross-post reuses the in-run result
+    assert [s.url for s in scored][-1] == "https://x.com/a/status/1"
+    assert all(s.score == 7.0 for s in scored)
+
+
+def test_score_cache_keys_change_with_context(sample_items, sample_context):
+    other = sample_context.model_copy(update={"goals": "Learning Rust"})
+    assert context_fingerprint(sample_context) != context_fingerprint(other)
+    assert content_key(sample_items[0], context_fingerprint(sample_context)) != content_key(
+        sample_items[0], context_fingerprint(other)
+    )
+
+
+def test_score_cache_lru_and_ttl(tmp_path):
+    cache = ScoreCache(tmp_path / "scores.json", max_entries=2)
+    cache.put("a", 5.0, "A")
+    cache.put("b", 6.0, "B")
+    cache.get("a")
+    cache.put("c", 7.0, "C")
+    assert cache.get("b") is None  # least recently used was evicted
+    assert cache.get("a") == (5.0, "A")
+    assert cache.get("c") == (7.0, "C")
+
+    expired = ScoreCache(tmp_path / "scores.json", ttl_days=0)
+    expired.put("d", 1.0, "D")
+    assert expired.get("d") is None
+
+
+def _many_items(n):
+    return [
+        ContentItem(source=ContentSource.NEWSLETTER, title=f"Item {i}", url=f"https://a.com/{i}")
+        for i in range(n)
+    ]
+
+
+@patch("openai.OpenAI", MagicMock())
+@patch("src.scoring.scorer.get_settings", _mock_settings)
+def test_score_items_runs_batches_concurrently_in_order(sample_context):
+    items = _many_items(BATCH_SIZE * 4)
+
+    def slow_batch(client, batch, context, tracker=None):
+        # Later batches finish first
+        time.sleep(0.05 * (BATCH_SIZE * 4 - int(batch[0].url.rsplit("/", 1)[1])) / BATCH_SIZE)
+        return _fake_score_batch(client, batch, context)
+
+    start = time.perf_counter()
+    with patch("src.scoring.scorer._score_batch", side_effect=slow_batch):
+        scored = score_items(items, sample_context)
+
+    assert time.perf_counter() - start < 0.5
+    assert [s.url for s in scored] == [i.url for i in items]
+
+
+@patch("openai.OpenAI", MagicMock())
+@patch("src.scoring.scorer.get_settings", _mock_settings)
+def test_score_items_starts_full_batches_before_input_ends(sample_context):
+    items = _many_items(BATCH_SIZE + 3)
+    produced = []
+    batches = []
+
+    def slow_source():
+        for item in items:
+            produced.append(item)
+            time.sleep(0.005)
+            yield item
+
+    def record_batch(client, batch, context, tracker=None):
+        batches.append((len(batch), len(produced)))
+        return _fake_score_batch(client, batch, context)
+
+    with patch("src.scoring.scorer._score_batch", side_effect=record_batch):
+        scored = score_items(slow_source(), sample_context)
+
+    assert [s.url for s in scored] == [i.url for i in items]
+    assert sorted(n for n, _ in batches) == [3, BATCH_SIZE]
+    first_size, produced_then = min(batches, key=lambda b: b[1])
+    assert first_size == BATCH_SIZE
+    assert produced_then < len(items)
+
+
+@patch("openai.OpenAI", MagicMock())
+@patch("src.scoring.scorer.get_settings", _mock_settings)
+def test_score_items_retries_rate_limits_and_failed_batches(sample_context):
+    items = _many_items(3)
+    rate_limited = RateLimitError(
+        "rate limited",
+        response=httpx.Response(429, headers={"retry-after": "0.01"}, request=httpx.Request("POST", "https://api.openai.com")),
+        body=None,
+    )
+    calls = []
+
+    def flaky_batch(client, batch, context, tracker=None):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise rate_limited
+        if len(batch) > 1:
+            raise ValueError("malformed JSON")
+        if batch[0].url.endswith("/2"):
+            raise ValueError("still malformed")
+        return _fake_score_batch(client, batch, context)
+
+    with patch("src.scoring.scorer._score_batch", side_effect=flaky_batch):
+        scored = score_items(items, sample_context)
+
+    assert calls[:2] == [3, 3]  # 429 retried as a batch, then split after a hard failure
+    assert [s.score for s in scored] == [7.0, 7.0, 0.0]
+    assert scored[2].justification == "Scoring failed"
+
+
+@patch("openai.OpenAI", MagicMock())
+@patch("src.scoring.scorer.get_settings", _mock_settings)
+def test_score_items_fails_batches_on_api_errors_without_splitting(sample_context):
+    request = httpx.Request("POST", "https://api.openai.com")
+    calls = []
+
+    def rejected(client, batch, context, tracker=None):
+        calls.append(len(batch))
+        raise AuthenticationError("bad key", response=httpx.Response(401, request=request), body=None)
+
+    with patch("src.scoring.scorer._score_batch", side_effect=rejected):
+        scored = score_items(_many_items(3), sample_context)
+    assert calls == [3]
+    assert all(s.score == 0.0 and s.justification == "Scoring failed" for s in scored)
+
+    # A 429 that outlasts its retries is not split into more calls either
+    calls.clear()
+    limited = RateLimitError("rate limited", response=httpx.Response(429, headers={"retry-after": "0.01"}, request=request), body=None)
+    with patch("src.scoring.scorer._score_batch", side_effect=limited) as batch_call:
+        score_items(_many_items(3), sample_context)
+    assert {len(c.args[1]) for c in batch_call.call_args_list} == {3}
+
+
+def test_score_batch_reports_malformed_responses(sample_items, sample_context):
+    client = MagicMock()
+    client.chat.completions.create.return_value.choices[0].message.content = '{"scores": [{"score": null}]}'
+    with pytest.raises(MalformedResponse):
+        _score_batch(client, sample_items, sample_context)
+
+
+def test_token_rate_limiter_waits_for_window():
+    limiter = TokenRateLimiter(tokens_per_minute=100, window_seconds=0.2)
+    start = time.perf_counter()
+    limiter.acquire(80)
+    limiter.acquire(80)
+    assert time.perf_counter() - start >= 0.15
+
+
+def test_take_batch_packs_to_token_budget():
+    estimator = TokenEstimator(chars_per_token=4.0, completion_tokens_per_item=10)
+    tweets = [40] * 30
+    snippets = [2000] * 30
+
+    assert take_batch(tweets, 0, 400, estimator, prompt_budget=1000, completion_budget=1000, max_items=25) == 25
+    assert take_batch(snippets, 0, 400, estimator, prompt_budget=1000, completion_budget=1000, max_items=25) == 1
+    assert take_batch(snippets[:1] + tweets, 0, 400, estimator, prompt_budget=1000, completion_budget=1000, max_items=25) == 25
+    # The completion budget also caps the batch
+    assert take_batch(tweets, 0, 400, estimator, prompt_budget=10000, completion_budget=100, max_items=25) == 10
+
+
+def test_token_estimator_calibrates_from_usage():
+    estimator = TokenEstimator()
+    for _ in range(20):
+        estimator.observe(prompt_chars=3000, prompt_tokens=1000, completion_tokens=400, n_items=10)
+    assert abs(estimator.chars_per_token - 3.0) < 0.05
+    assert abs(estimator.completion_tokens_per_item - 40) < 1
+
+
+def test_prefilter_drops_irrelevant_items(sample_items, sample_context):
+    noise = ContentItem(source=ContentSource.TWITTER, title="Look at my lunch", url="https://x.com/u/1", content_snippet="Tacos again today")
+    result = prefilter_items(sample_items + [noise], sample_context, min_relevance=0.01)
+
+    assert noise in result.dropped
+    assert sample_items[0] in result.kept  # "Building RAG Systems" shares "building" + context terms
+    assert [i.url for i in result.kept] == [i.url for i in sample_items if i in result.kept]
+
+    capped = prefilter_items(sample_items + [noise], sample_context, top_k=1)
+    assert len(capped.kept) == 1
+
+
+def test_prefilter_recall_against_history(sample_context):
+    rows = [
+        {"digest_date": "2025-01-14", "title": "Python AI applications guide", "content_snippet": "", "score": 8.0},
+        {"digest_date": "2025-01-14", "title": "Celebrity gossip", "content_snippet": "", "score": 1.0},
+        {"digest_date": "2025-01-15", "title": "Content curation SaaS lessons", "content_snippet": "", "score": 6.0},
+    ]
+    recall, removed = prefilter_recall(rows, sample_context, min_relevance=0.01, top_k=0, min_score=5.0)
+    assert recall == 1.0
+    assert removed == 1 / 3
+
+
+def test_cluster_contexts_groups_identical_and_similar_users(sample_context):
+    same = sample_context.model_copy()
+    reworded = sample_context.model_copy(update={"goals": "Building AI-powered applications, improving my Python skills"})
+    other = sample_context.model_copy(update={
+        "goals": "Learning Rust for embedded firmware", "skill_levels": {"C": "advanced"}, "project_context": "Drone flight controller",
+    })
+
+    clusters = cluster_contexts([sample_context, other, same, reworded], min_similarity=0.9)
+    assert [c.members for c in clusters] == [[0, 2, 3], [1]]
+    assert clusters[0].context == sample_context
+
+    exact_only = cluster_contexts([sample_context, other, same, reworded], min_similarity=1.1)
+    assert [c.members for c in exact_only] == [[0, 2], [1], [3]]
+
+
+def test_cluster_contexts_keeps_apart_users_the_prompt_treats_differently(sample_context):
+    beginner = sample_context.model_copy(update={"skill_levels": {"Python": "beginner", "ML": "intermediate"}})
+    busier = sample_context.model_copy(update={"time_availability": "10 minutes per day"})
+    theory = sample_context.model_copy(update={"methodology": {**sample_context.methodology, "style": "theoretical"}})
+    clusters = cluster_contexts([sample_context, beginner, busier, theory], min_similarity=0.0)
+    assert [c.members for c in clusters] == [[0], [1], [2], [3]]
+
+
+def test_hashing_embedder_ranks_on_topic_items_first(sample_items, sample_context):
+    engine = EmbeddingScoringEngine(HashingEmbedder(), batch_size=2, justify_top_n=0)
+    off_topic = ContentItem(source=ContentSource.NEWSLETTER, title="Sourdough baking tips", url="https://a.com/bread")
+    scored = engine.score(iter(sample_items + [off_topic]), sample_context)
+
+    assert [s.url for s in scored] == [i.url for i in sample_items + [off_topic]]
+    assert all(0.0 <= s.score <= 10.0 for s in scored)
+    assert scored[0].score > scored[-1].score
+    assert scored[-1].justification.startswith("Embedding similarity")
+
+
+def test_embedding_scores_are_calibrated_to_0_10():
+    engine = EmbeddingScoringEngine(HashingEmbedder())
+    floor, ceiling = HashingEmbedder.score_floor, HashingEmbedder.score_ceiling
+    sims = np.array([-0.5, floor, (floor + ceiling) / 2, ceiling, 0.9])
+    assert engine.calibrate(sims).tolist() == [0.0, 0.0, 5.0, 10.0, 10.0]
+
+
+def test_embedding_engine_only_justifies_top_items(sample_items, sample_context):
+    response = MagicMock()
+    response.choices[0].message.content = '{"justifications": ["Matches the RAG project"]}'
+    response.usage.prompt_tokens, response.usage.completion_tokens = 100, 20
+    client = MagicMock()
+    client.chat.completions.create.return_value = response
+
+    engine = EmbeddingScoringEngine(HashingEmbedder(), justify_top_n=1, openai_api_key="sk-test")
+    with patch("openai.OpenAI", return_value=client):
+        scored = engine.score(sample_items, sample_context)
+
+    assert client.chat.completions.create.call_count == 1
+    top = max(scored, key=lambda s: s.score)
+    assert top.justification == "Matches the RAG project"
+    assert sum(s.justification.startswith("Embedding similarity") for s in scored) == len(sample_items) - 1
+
+
+@pytest.mark.parametrize("content", ["not json", '["a list"]', '{"justifications": "one string"}', '{"justifications": [null]}'])
+def test_embedding_engine_keeps_similarity_text_for_malformed_justifications(sample_items, sample_context, content):
+    response = MagicMock()
+    response.choices[0].message.content = content
+    client = MagicMock()
+    client.chat.completions.create.return_value = response
+
+    engine = EmbeddingScoringEngine(HashingEmbedder(), justify_top_n=2, openai_api_key="sk-test")
+    with patch("openai.OpenAI", return_value=client):
+        scored = engine.score(sample_items, sample_context)
+
+    assert all(s.justification.startswith("Embedding similarity") for s in scored)
+
+
+@patch("src.scoring.scorer.get_settings", _mock_settings)
+def test_score_cache_is_kept_per_engine(tmp_path, sample_items, sample_context):
+    cache = ScoreCache(tmp_path / "scores.json")
+    embedding = EmbeddingScoringEngine(HashingEmbedder(), justify_top_n=0)
+    score_items(sample_items, sample_context, cache=cache, engine=embedding)
+
+    with patch("src.scoring.scorer._score_batch", side_effect=_fake_score_batch) as batch, \
+            patch("openai.OpenAI", MagicMock()):
+        scored = score_items(sample_items, sample_context, cache=cache)
+    assert batch.call_count == 1
+    assert all(s.justification == "Relevant" for s in scored)
+    assert cache.stats().endswith(f"{2 * len(sample_items)} entries")
+
+
+def test_scored_item_is_slotted_copy_of_item():
+    item = ContentItem(source=ContentSource.YOUTUBE, title="Talk", url="https://youtube.com/watch?v=1", author="Conf")
+    scored = ScoredItem.from_item(item, 7.5, "Relevant")
+    assert (scored.source, scored.url, scored.author, scored.score, scored.justification) == \
+        (ContentSource.YOUTUBE, item.url, "Conf", 7.5, "Relevant")
+    assert not hasattr(scored, "__dict__") and not hasattr(item, "__dict__")
@@ -0,0 +1,50 @@
+import threading
+import time
+
+import pytest
+
+from src.monitoring import timing
+
+
+def test_spans_accumulate_time_items_and_errors():
+    timings = timing.reset_run_timings()
+
+    with timing.span("score") as s:
+        time.sleep(0.01)
+        s.items = 20
+    with timing.span("score", items=5):
+        pass
+    with pytest.raises(RuntimeError):
+        with timing.span("resend"):
+            raise RuntimeError("boom")
+
+    stages = timings.to_dict()
+    assert stages["score"]["calls"] == 2
+    assert stages["score"]["items"] == 25
+    assert stages["score"]["seconds"] >= 0.01
+    assert stages["score"]["items_per_second"] > 0
+    assert stages["resend"]["errors"] == 1
+    assert stages["resend"]["peak_rss_mb"] > 0
+    assert "score=" in timings.summary()
+
+
+def test_spans_from_worker_threads():
+    timings = timing.reset_run_timings()
+
+    def work():
+        for _ in range(100):
+            with timing.span("openai", items=1):
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert timings.to_dict()["openai"]["calls"] == 800
+    assert timings.to_dict()["openai"]["items"] == 800
+
+
+def test_tracing_is_off_unless_enabled():
+    assert timing.configure_tracing(False) is False
@@ -0,0 +1,142 @@
+import time
+
+import numpy as np
+
+from src.dedup.history import history_dedup_stream
+from src.models import ContentItem, ContentSource, ScoredItem
+from src.scoring.embedding import HashingEmbedder, embed_items
+from src.scoring.rerank import rerank_by_feedback
+from src.scoring.vector_store import VectorStore
+
+
+def _unit(rng, n, dim=16):
+    v = rng.standard_normal((n, dim)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def _item(url, title, snippet=""):
+    return ContentItem(source=ContentSource.NEWSLETTER, title=title, url=url, content_snippet=snippet)
+
+
+def test_store_persists_and_refreshes_rows(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = _unit(rng, 3000)
+    store = VectorStore(tmp_path, model="test")
+    assert store.add([f"https://a.com/{i}" for i in range(3000)], vectors) == 3000
+    assert store.add(["https://a.com/0", "https://a.com/new"], vectors[:2]) == 1
+    store.save()
+
+    reopened = VectorStore(tmp_path, model="test")
+    assert len(reopened) == 3001
+    got, found = reopened.get(["https://a.com/2999", "https://a.com/missing"])
+    assert found.tolist() == [True, False]
+    np.testing.assert_allclose(got[0], vectors[2999])
+    assert reopened.search(vectors[42], k=1)[0][0] == "https://a.com/42"
+
+    assert len(VectorStore(tmp_path, model="other-model")) == 0
+
+
+def test_store_evicts_old_rows_and_compacts(tmp_path):
+    rng = np.random.default_rng(1)
+    store = VectorStore(tmp_path, model="test", max_age_days=1)
+    vectors = _unit(rng, 2000)
+    store.add([f"https://a.com/{i}" for i in range(2000)], vectors)
+    store._seen[:1500] = time.time() - 2 * 86400
+    store.save()
+    size_before = sum(p.stat().st_size for p in tmp_path.glob("vectors*.f32"))
+
+    assert store.evict() == 1500
+    assert len(store) == 500
+    store.save()
+    assert sum(p.stat().st_size for p in tmp_path.glob("vectors*.f32")) < size_before
+    reopened = VectorStore(tmp_path, model="test", max_age_days=1)
+    got, found = reopened.get(["https://a.com/1999", "https://a.com/0"])
+    assert found.tolist() == [True, False]
+    np.testing.assert_allclose(got[0], vectors[1999])
+
+
+def test_eviction_on_load_keeps_the_saved_store_until_the_next_save(tmp_path):
+    rng = np.random.default_rng(2)
+    vectors = _unit(rng, 8)
+    urls = [f"https://a.com/{i}" for i in range(8)]
+    store = VectorStore(tmp_path, model="test", max_age_days=1)
+    store.add(urls, vectors)
+    store._seen[:4] = time.time() - 2 * 86400
+    store.save()
+
+    # Loading evicts the expired half; the run then fails before save()
+    assert len(VectorStore(tmp_path, model="test", max_age_days=1)) == 4
+
+    reopened = VectorStore(tmp_path, model="test", max_age_days=1000)
+    got, found = reopened.get(urls)
+    assert found.all()
+    np.testing.assert_allclose(got, vectors)
+
+
+def test_writes_never_touch_the_committed_vectors_file(tmp_path):
+    rng = np.random.default_rng(3)
+    vectors = _unit(rng, 4)
+    urls = [f"https://a.com/{i}" for i in range(4)]
+    store = VectorStore(tmp_path, model="test")
+    store.add(urls, vectors)
+    store.save()
+
+    # Refresh an existing row and add a new one, then fail before save()
+    run = VectorStore(tmp_path, model="test")
+    run.add([urls[0], "https://a.com/new"], _unit(rng, 2))
+    del run
+    reopened = VectorStore(tmp_path, model="test")
+    np.testing.assert_allclose(reopened.get(urls)[0], vectors)
+    assert "https://a.com/new" not in reopened
+
+    # A long-lived store keeps working after a save: the next write copies again
+    refreshed = _unit(rng, 1)
+    reopened.add([urls[1]], refreshed)
+    reopened.save()
+    reopened.add([urls[2]], _unit(rng, 1))
+    final = VectorStore(tmp_path, model="test")
+    np.testing.assert_allclose(final.get([urls[1], urls[2]])[0], np.vstack([refreshed, vectors[2:3]]))
+    assert len(list(tmp_path.glob("vectors*.f32"))) == 2
+
+
+def test_history_dedup_drops_content_seen_in_earlier_runs(tmp_path):
+    store = VectorStore(tmp_path, model="local")
+    embedder = HashingEmbedder()
+    snippet = "a long walkthrough of building retrieval augmented generation pipelines in python"
+    embed_items(embedder, [_item("https://a.com/rag", "RAG in practice", snippet)], store=store)
+    time.sleep(0.01)
+
+    run = [
+        _item("https://a.com/rag", "RAG in practice", snippet),  # same URL again
+        _item("https://b.com/repost", "RAG in practice", snippet),  # cross-post from an earlier run
+        _item("https://c.com/rust", "Rust GPU kernels", "writing compute shaders"),
+    ]
+    kept = list(history_dedup_stream(run, store, embedder, min_similarity=0.95, batch_size=2))
+    assert [i.url for i in kept] == ["https://a.com/rag", "https://c.com/rust"]
+    assert "https://c.com/rust" in store
+
+    # Items keep their own URL; the store is keyed by the canonical one
+    rows = len(store)
+    embed_items(embedder, [_item("https://www.a.com/rag/?utm_source=rss", "RAG in practice", snippet)], store=store)
+    assert len(store) == rows and "https://www.a.com/rag/?utm_source=rss" not in store
+
+
+def test_feedback_rerank_and_more_like_this(tmp_path):
+    store = VectorStore(tmp_path, model="local")
+    embedder = HashingEmbedder()
+    past = [
+        _item("https://a.com/agents", "Building LLM agents with tool calling"),
+        _item("https://a.com/bread", "Sourdough bread baking for beginners"),
+        _item("https://a.com/agents2", "Evaluating LLM agents with tool calling"),
+    ]
+    embed_items(embedder, past, store=store)
+    store.set_labels({"https://a.com/agents": "useful", "https://a.com/bread": "not_useful"})
+    assert store.more_like_useful(k=1)[0][0] == "https://a.com/agents2"
+
+    today = [
+        ScoredItem(source=ContentSource.NEWSLETTER, title="Debugging LLM agents with tool calling", url="https://b.com/1", score=5.0),
+        ScoredItem(source=ContentSource.NEWSLETTER, title="Sourdough bread baking at altitude", url="https://b.com/2", score=5.0),
+    ]
+    vectors = embed_items(embedder, today, store=store)
+    reranked = rerank_by_feedback(today, vectors, store, weight=2.0)
+    assert reranked[0].score > 5.0 > reranked[1].score